@@ -4,8 +4,9 @@ Aplicação principal Flask - Sistema de Chamados
 from flask import Flask, jsonify
 from config import FlaskConfig, settings
 from extensions import init_extensions, close_mongodb
-from routes import incident_bp, change_bp, user_bp, dashboard_bp
+from routes import incident_bp, change_bp, user_bp, dashboard_bp, legacy_bp, stream_bp
 from utils.error_handler import ErrorHandler
+from utils.json_provider import create_json_provider
 import atexit
 import logging
 
@@ -18,6 +19,9 @@ def create_app():
     # Configurar aplicação
     app.config.from_object(FlaskConfig)
     
+    # Serialização JSON das respostas (orjson quando disponível)
+    app.json = create_json_provider(app)
+    
     # Inicializar extensões
     init_extensions(app)
     
@@ -26,6 +30,10 @@ def create_app():
     app.register_blueprint(change_bp)
     app.register_blueprint(user_bp)
     app.register_blueprint(dashboard_bp)
+    # Contratos antigos do front-end (chamados, changes e dashboard legados)
+    app.register_blueprint(legacy_bp)
+    # Eventos de escrita por Server-Sent Events
+    app.register_blueprint(stream_bp)
     
     # Registrar handlers de erro
     ErrorHandler.register_error_handlers(app)
@@ -42,7 +50,9 @@ def create_app():
                 "incidentes": "/api/incidentes",
                 "changes": "/api/changes",
                 "usuarios": "/api/usuarios",
-                "dashboard": "/api/dashboard"
+                "dashboard": "/api/dashboard",
+                "legacy": "/api/legacy",
+                "stream": "/api/stream"
             },
             "documentation": "Consulte a documentação da API para mais detalhes"
         })
@@ -85,6 +95,16 @@ def create_app():
                     "base_url": "/api/dashboard",
                     "methods": ["GET"],
                     "description": "Métricas e estatísticas do sistema"
+                },
+                "legacy": {
+                    "base_url": "/api/legacy",
+                    "methods": ["GET", "POST", "PUT", "DELETE"],
+                    "description": "Contratos legados do front-end (chamados, changes e dashboard)"
+                },
+                "stream": {
+                    "base_url": "/api/stream",
+                    "methods": ["GET"],
+                    "description": "Eventos de incidentes e changes (Server-Sent Events)"
                 }
             },
             "authentication": "Será implementado em versões futuras",
@@ -105,7 +125,9 @@ def create_app():
                 "/api/incidentes",
                 "/api/changes",
                 "/api/usuarios",
-                "/api/dashboard"
+                "/api/dashboard",
+                "/api/legacy",
+                "/api/stream"
             ]
         }), 404
     
@@ -137,9 +159,10 @@ def main():
         atexit.register(close_mongodb)
         
         # Executar aplicação
+        # Servidor de desenvolvimento; em produção use: gunicorn -c gunicorn.conf.py wsgi:app
         app.run(
-            host='0.0.0.0',
-            port=5000,
+            host=settings.SERVER_HOST,
+            port=settings.SERVER_PORT,
             debug=settings.DEBUG,
             use_reloader=False  # Desabilitar reloader para evitar problemas com MongoDB
         )
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark de criação em lote: create_incident item a item vs create_incidents_bulk
+
+Simula uma tempestade de alarmes: os mesmos payloads são validados com
+IncidentCreate e gravados um por vez (caminho do POST /api/incidentes/) ou
+em lotes (caminho do POST /api/incidentes/bulk), com numeração automática.
+
+Uso:
+    python benchmarks/bench_bulk_create.py --count 5000 --batch-size 500
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+
+from common import connect_bench_db, make_incident
+from models.incident_model import IncidentCreate
+from services.incident_service import IncidentService
+from services.sequence import SEQUENCE_COLLECTION
+from services.stats_counters import STATS_COUNTERS_COLLECTION
+
+
+def alarm_payloads(count: int, seed: int = 11):
+    """Payloads brutos (como chegam no JSON) sem número"""
+    rng = random.Random(seed)
+    base_date = datetime.utcnow()
+    payloads = []
+    for index in range(count):
+        data = make_incident(index, base_date, rng)
+        for field in ("numero", "created_at", "updated_at"):
+            data.pop(field)
+        data["local_problema"] = rng.choice(["alarmes", "fila_p2k"])
+        payloads.append(data)
+    return payloads
+
+
+def reset(db) -> IncidentService:
+    db.chamados.drop()
+    db.chamados.create_index("numero", unique=True)
+    db[SEQUENCE_COLLECTION].delete_one({"_id": "incidentes"})
+    db[STATS_COUNTERS_COLLECTION].delete_one({"_id": "incidentes"})
+    service = IncidentService(db)
+    service.counters.rebuild()
+    return service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=5000, help="Incidentes criados por caminho")
+    parser.add_argument("--batch-size", type=int, default=500, help="Itens por lote no caminho bulk")
+    args = parser.parse_args()
+
+    client, db = connect_bench_db()
+    payloads = alarm_payloads(args.count)
+    results = {}
+
+    print(f"🚨 Criando {args.count} incidentes item a item em {db.name}.chamados...")
+    service = reset(db)
+    start = time.perf_counter()
+    for data in payloads:
+        service.create_incident(IncidentCreate(**{"numero": "", **data}))
+    results["item a item"] = args.count / (time.perf_counter() - start)
+
+    print(f"🚨 Criando {args.count} incidentes em lotes de {args.batch_size}...")
+    service = reset(db)
+    start = time.perf_counter()
+    for offset in range(0, args.count, args.batch_size):
+        batch = payloads[offset:offset + args.batch_size]
+        service.create_incidents_bulk([IncidentCreate(**{"numero": "", **data}) for data in batch])
+    results[f"lote ({args.batch_size})"] = args.count / (time.perf_counter() - start)
+
+    assert db.chamados.count_documents({}) == args.count, "lote incompleto"
+
+    print(f"\n📊 Vazão de criação ({args.count} incidentes)")
+    print("=" * 48)
+    print(f"{'caminho':<28}{'criações/s':>20}")
+    for name, ops in results.items():
+        print(f"{name:<28}{ops:>20.0f}")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark do GET condicional: resposta completa vs 304 (If-None-Match)
+
+Sobe a aplicação com o banco em memória e, pelo cliente de teste do Flask, mede
+cada rota sem e com If-None-Match igual à ETag da primeira resposta. O 304 lê
+apenas as versões em stats_counters, sem executar a listagem, a contagem
+ou as estatísticas; os bytes transferidos vão a zero.
+
+Uso:
+    python benchmarks/bench_conditional.py --size 200000
+"""
+import argparse
+import os
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200000, help="Incidentes no banco em memória")
+    parser.add_argument("--repeat", type=int, default=20, help="Requisições medidas por caminho")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Configurações lidas na importação da aplicação
+    os.environ["DATA_BACKEND"] = "memory"
+    os.environ["MOCK_DATA_INCIDENTS"] = str(args.size)
+    os.environ["DAILY_STATS_REFRESH_SECONDS"] = "0"
+    os.environ["STATS_CACHE_TTL_SECONDS"] = "0"
+    from common import measure, print_results
+    from app import create_app
+
+    print(f"🌱 Gerando {args.size} incidentes em memória...")
+    client = create_app().test_client()
+
+    paths = [
+        "/api/incidentes/?per_page=50&status=Aberto",
+        "/api/incidentes/?per_page=50&count=exact",
+        "/api/dashboard/overview",
+        "/api/dashboard/trends?periods=30"
+    ]
+    for path in paths:
+        response = client.get(path)
+        etag = response.headers["ETag"]
+        size = len(response.data)
+        results = {
+            f"200 ({size} bytes)": measure(lambda: client.get(path), args.repeat),
+            "304 (If-None-Match)": measure(lambda: client.get(path, headers={"If-None-Match": etag}), args.repeat)
+        }
+        print_results(path, results)
+
+
+if __name__ == "__main__":
+    main()
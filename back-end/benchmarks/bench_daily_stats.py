@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark do controle diário: contagens por requisição vs daily_stats
+
+Semeia incidentes distribuídos nos últimos dias (com closed_at nos fechados),
+materializa daily_stats (manage.py refresh-daily-stats) e compara as três
+count_documents que o /api/dashboard/controle legado faz a cada requisição com
+a leitura dos documentos materializados (/api/dashboard/daily). Mede também a atualização completa e a
+incremental (apenas os dias desde a anterior).
+
+Com --mongo usa o MongoDB (banco de benchmark, pipeline $merge); sem ele, o
+banco em memória (cálculo em Python).
+
+Uso:
+    python benchmarks/bench_daily_stats.py --mongo --size 1000000
+    python benchmarks/bench_daily_stats.py --size 200000
+"""
+import argparse
+import time
+from datetime import datetime
+
+from bench_trends import seed_spread
+from common import connect_bench_db, measure, print_results
+from services.incident_service import IncidentService, INCIDENT_CLOSED_STATUS
+from utils.memory_store import MemoryDatabase
+
+
+def count_today(collection):
+    """As três contagens do controle antes da materialização"""
+    start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return (
+        collection.count_documents({"created_at": {"$gte": start}}),
+        collection.count_documents({"closed_at": {"$gte": start}}),
+        collection.count_documents({"status": {"$nin": list(INCIDENT_CLOSED_STATUS)}})
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200000, help="Incidentes semeados")
+    parser.add_argument("--days", type=int, default=90, help="Dias cobertos pelos incidentes")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções medidas por caminho")
+    parser.add_argument("--mongo", action="store_true", help="Usar MongoDB em vez do banco em memória")
+    args = parser.parse_args()
+
+    client = None
+    if args.mongo:
+        client, db = connect_bench_db()
+    else:
+        db = MemoryDatabase("bench_daily_stats")
+    print(f"🌱 Semeando {args.size} incidentes nos últimos {args.days} dias...")
+    seed_spread(db, args.size, args.days)
+
+    service = IncidentService(db=db)
+    start = time.perf_counter()
+    report = service.daily_stats.refresh(full=True)
+    print(f"📅 Materialização completa via {report['engine']}: {time.perf_counter() - start:.2f}s")
+
+    results = {
+        "3 count_documents": measure(lambda: count_today(db.chamados), args.repeat),
+        "daily_stats (hoje)": measure(lambda: service.get_daily_stats(1), args.repeat),
+        "daily_stats (30 dias)": measure(lambda: service.get_daily_stats(30), args.repeat),
+        "atualização incremental": measure(service.daily_stats.refresh, args.repeat)
+    }
+    print_results(f"Controle diário ({args.size} incidentes)", results)
+
+    if client is not None:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
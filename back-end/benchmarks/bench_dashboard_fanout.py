@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark do overview do dashboard: módulos consultados em sequência vs em paralelo
+
+Com MongoDB real, compara os serviços síncronos consultados um após o outro, o
+fan-out em threads do processo (services/dashboard_fanout.py) e as variantes
+assíncronas com asyncio.gather sobre o Motor (services/async_services.py, se o
+pacote motor estiver instalado). Com --recompute, os contadores incrementais
+são removidos antes de cada medição para medir as consultas de recomputação.
+
+Com --stand-in, cada módulo apenas espera uma latência fixa (time.sleep nas
+threads, asyncio.sleep no event loop), útil para observar o efeito sem servidor.
+
+Uso:
+    python benchmarks/bench_dashboard_fanout.py --size 100000
+    python benchmarks/bench_dashboard_fanout.py --stand-in --latency-ms 5
+"""
+import argparse
+import asyncio
+import time
+
+from common import connect_bench_db, measure, print_results, seed_incidents
+from services.async_runtime import AsyncIOMotorClient, AsyncRuntime
+from services.dashboard_fanout import DashboardFanOut
+from services.stats_counters import STATS_COUNTERS_COLLECTION
+
+
+def run_stand_in(args, fanout: DashboardFanOut, runtime: AsyncRuntime):
+    latency = args.latency_ms / 1000
+    readers = [lambda: time.sleep(latency)] * 3
+
+    async def gathered():
+        return await asyncio.gather(*(asyncio.sleep(latency) for _ in readers))
+
+    results = {
+        "em sequência": measure(lambda: [reader() for reader in readers], repeat=args.repeat),
+        f"fan-out ({fanout.workers} threads)": measure(lambda: fanout.run(readers), repeat=args.repeat),
+        "asyncio.gather": measure(lambda: runtime.run(gathered()), repeat=args.repeat)
+    }
+    print_results(f"Overview do dashboard (simulado, {args.latency_ms:.1f} ms por módulo)", results)
+
+
+def run_real(args, fanout: DashboardFanOut, runtime: AsyncRuntime):
+    from services.incident_service import IncidentService
+    from services.change_service import ChangeService
+    from services.user_service import UserService
+    from services.async_services import AsyncIncidentService, AsyncChangeService, AsyncUserService
+
+    client, db = connect_bench_db()
+    if args.size:
+        print(f"🌱 Semeando {args.size} incidentes em {db.name}.chamados...")
+        seed_incidents(db.chamados, args.size)
+
+    services = (IncidentService(db), ChangeService(db), UserService(db))
+    method = "compute_dashboard_stats" if args.recompute else "get_dashboard_stats"
+    readers = [getattr(service, method) for service in services]
+
+    def reset_counters():
+        if args.recompute:
+            for service in services:
+                db[STATS_COUNTERS_COLLECTION].delete_one({"_id": service.module_key})
+
+    def sequential():
+        reset_counters()
+        return [reader() for reader in readers]
+
+    def fanned_out():
+        reset_counters()
+        return fanout.run(readers)
+
+    results = {
+        "em sequência": measure(sequential, repeat=args.repeat),
+        f"fan-out ({fanout.workers} threads)": measure(fanned_out, repeat=args.repeat)
+    }
+
+    if AsyncIOMotorClient is not None:
+        # Mesmo banco de benchmark, pelo cliente Motor do runtime
+        async_db = runtime.database().client[db.name]
+        async_services = [
+            AsyncIncidentService(async_db, services[0].get_dashboard_stats),
+            AsyncChangeService(async_db, services[1].get_dashboard_stats),
+            AsyncUserService(async_db, services[2].get_dashboard_stats)
+        ]
+
+        async def gathered():
+            return await asyncio.gather(*(service.get_dashboard_stats() for service in async_services))
+
+        def motor_gather():
+            reset_counters()
+            return runtime.run(gathered())
+
+        results["Motor + asyncio.gather"] = measure(motor_gather, repeat=args.repeat)
+    else:
+        print("⚠️ Pacote motor não instalado: caminho assíncrono não medido")
+
+    print_results(f"Overview do dashboard ({db.chamados.estimated_document_count()} incidentes)", results)
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000, help="Incidentes semeados (0 mantém a coleção)")
+    parser.add_argument("--repeat", type=int, default=10, help="Repetições por caminho")
+    parser.add_argument("--threads", type=int, default=2, help="Threads do fan-out")
+    parser.add_argument("--recompute", action=argparse.BooleanOptionalAction, default=True,
+                        help="Medir a recomputação (sem contadores incrementais)")
+    parser.add_argument("--stand-in", action="store_true", help="Simular a latência de cada módulo sem MongoDB")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Latência simulada por módulo (--stand-in)")
+    args = parser.parse_args()
+
+    fanout = DashboardFanOut(args.threads)
+    runtime = AsyncRuntime()
+    try:
+        if args.stand_in:
+            run_stand_in(args, fanout, runtime)
+        else:
+            run_real(args, fanout, runtime)
+    finally:
+        fanout.close()
+        runtime.close()
+
+
+if __name__ == "__main__":
+    main()
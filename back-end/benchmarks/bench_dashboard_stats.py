@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark das estatísticas do dashboard de incidentes
+
+Compara as 18 chamadas de count_documents originais com o pipeline $facet
+e com o fallback em Python (um único cursor com projeção).
+
+Uso:
+    python benchmarks/bench_dashboard_stats.py --size 200000 --repeat 5
+"""
+import argparse
+
+from common import connect_bench_db, seed_incidents, measure, print_results
+from services.incident_service import (
+    IncidentService, DASHBOARD_FILAS, DASHBOARD_PRIORIDADES, DASHBOARD_STATUS
+)
+
+
+def legacy_dashboard_stats(collection):
+    """Implementação original: uma consulta count_documents por bucket"""
+    stats = {
+        "incidentes_vendas": collection.count_documents({"incidente_vendas": True}),
+        "filas": {},
+        "prioridades": {},
+        "status": {}
+    }
+    for fila in DASHBOARD_FILAS:
+        stats["filas"][fila] = collection.count_documents({"local_problema": fila})
+    for prioridade in DASHBOARD_PRIORIDADES:
+        stats["prioridades"][prioridade] = collection.count_documents({"prioridade": prioridade})
+    for status in DASHBOARD_STATUS:
+        stats["status"][status] = collection.count_documents({"status": status})
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200000, help="Quantidade de incidentes semeados")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções medidas por caminho")
+    parser.add_argument("--skip-seed", action="store_true", help="Reutilizar a coleção já semeada")
+    args = parser.parse_args()
+
+    client, db = connect_bench_db()
+    service = IncidentService(db=db)
+
+    if not args.skip_seed:
+        print(f"🌱 Semeando {args.size} incidentes em {db.name}.chamados...")
+        seed_incidents(db.chamados, args.size)
+
+    # Os três caminhos devem produzir exatamente os mesmos buckets
+    expected = legacy_dashboard_stats(db.chamados)
+    assert service._dashboard_stats_from_aggregation() == expected, "pipeline $facet divergente"
+    assert service._dashboard_stats_from_cursor() == expected, "fallback em Python divergente"
+
+    results = {
+        "count_documents x18": measure(lambda: legacy_dashboard_stats(db.chamados), args.repeat),
+        "$facet (1 agregação)": measure(service._dashboard_stats_from_aggregation, args.repeat),
+        "fallback Python (1 cursor)": measure(service._dashboard_stats_from_cursor, args.repeat)
+    }
+    print_results(f"get_dashboard_stats com {db.chamados.estimated_document_count()} incidentes", results)
+
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
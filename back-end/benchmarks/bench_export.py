@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark da exportação: lista inteira em memória vs streaming NDJSON/CSV
+
+Compara o padrão legado (todos os documentos em uma lista e um único array
+JSON) com a exportação em streaming de /api/incidentes/export (cursor em lotes
+de EXPORT_BATCH_SIZE, blocos NDJSON ou CSV). Para cada caminho mede tempo,
+linhas por segundo e pico de memória alocada (tracemalloc, em uma segunda
+execução para não distorcer o tempo).
+
+Com --mongo usa o MongoDB (banco de benchmark); sem ele, o banco em memória,
+onde a seleção ainda guarda as referências dos documentos selecionados.
+
+Uso:
+    python benchmarks/bench_export.py --mongo --size 1000000
+    python benchmarks/bench_export.py --size 200000
+"""
+import argparse
+import time
+import tracemalloc
+
+from flask import Flask
+
+from common import connect_bench_db, seed_incidents
+from config import settings
+from services.incident_service import IncidentService
+from utils.export import csv_chunks, ndjson_chunks
+from utils.json_provider import create_json_provider
+from utils.memory_store import create_memory_database
+
+
+def run(func):
+    """Executa func e retorna (segundos, bytes gerados)"""
+    start = time.perf_counter()
+    size = func()
+    return time.perf_counter() - start, size
+
+
+def peak_memory_mb(func) -> float:
+    """Pico de memória alocada pelo Python durante func (MB)"""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1000000, help="Incidentes exportados")
+    parser.add_argument("--mongo", action="store_true", help="Usar MongoDB em vez do banco em memória")
+    parser.add_argument("--skip-seed", action="store_true", help="Manter a coleção do MongoDB como está")
+    parser.add_argument("--no-memory", action="store_true", help="Não medir o pico de memória")
+    args = parser.parse_args()
+
+    client = None
+    if args.mongo:
+        client, db = connect_bench_db()
+        if not args.skip_seed:
+            print(f"🌱 Semeando {args.size} incidentes em {db.name}.chamados...")
+            seed_incidents(db.chamados, args.size)
+    else:
+        print(f"🌱 Gerando {args.size} incidentes em memória...")
+        db = create_memory_database("bench_export", incidents=args.size, changes=0, users=0)
+
+    service = IncidentService(db=db)
+    app = Flask(__name__)
+    app.json = create_json_provider(app)
+    columns = service.response_columns()
+
+    def legacy_array():
+        documents = [service.document_to_dict(document) for document in db.chamados.find({})]
+        return len(app.json.dumps(documents))
+
+    def stream_ndjson():
+        return sum(len(chunk) for chunk in ndjson_chunks(service.iter_incident_rows()))
+
+    def stream_csv():
+        return sum(len(chunk) for chunk in csv_chunks(service.iter_incident_rows(), columns))
+
+    paths = {
+        "lista + array JSON": legacy_array,
+        "streaming NDJSON": stream_ndjson,
+        "streaming CSV": stream_csv
+    }
+
+    print(f"\n📊 Exportação de {args.size} incidentes ({'MongoDB' if args.mongo else 'memória'}, "
+          f"lotes de {settings.EXPORT_BATCH_SIZE}, JSON via {app.json.name})")
+    print("=" * 72)
+    print(f"{'caminho':<22}{'tempo (s)':>10}{'linhas/s':>12}{'saída (MB)':>12}{'pico (MB)':>12}")
+    with app.app_context():
+        for name, func in paths.items():
+            seconds, size = run(func)
+            peak = "-" if args.no_memory else f"{peak_memory_mb(func):.1f}"
+            print(f"{name:<22}{seconds:>10.2f}{args.size / seconds:>12.0f}{size / (1024 * 1024):>12.1f}{peak:>12}")
+
+    if client is not None:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos provedores JSON nas respostas da API
+
+Serializa uma listagem de incidentes (dicionários da resposta, como os de
+get_incident_page) com o provedor padrão do Flask, com o provedor da biblioteca
+padrão desta aplicação e com o provedor orjson, nos formatos de data http e iso.
+Não precisa de MongoDB.
+
+Uso:
+    python benchmarks/bench_json_provider.py --size 10000
+"""
+import argparse
+import random
+from datetime import datetime
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from common import make_incident, measure, print_results
+from services.incident_service import incident_to_dict
+from utils.json_provider import OrjsonJSONProvider, StdlibJSONProvider, orjson
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10000, help="Incidentes na resposta")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetições por provedor")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    base_date = datetime.utcnow()
+    payload = {
+        "data": [incident_to_dict({"_id": ObjectId(), **make_incident(index, base_date, rng)})
+                 for index in range(args.size)],
+        "pagination": {"page": 1, "per_page": args.size, "total": args.size}
+    }
+
+    app = Flask(__name__)
+    providers = {
+        "Flask (padrão)": DefaultJSONProvider(app),
+        "stdlib (http)": StdlibJSONProvider(app, "http"),
+        "stdlib (iso)": StdlibJSONProvider(app, "iso")
+    }
+    if orjson is not None:
+        providers["orjson (http)"] = OrjsonJSONProvider(app, "http")
+        providers["orjson (iso)"] = OrjsonJSONProvider(app, "iso")
+    else:
+        print("⚠️ orjson não instalado: medindo apenas a biblioteca padrão")
+
+    results = {}
+    with app.app_context():
+        for name, provider in providers.items():
+            size_kb = len(provider.response(payload).get_data()) / 1024
+            results[f"{name} {size_kb:.0f}KB"] = measure(lambda: provider.response(payload), repeat=args.repeat)
+    print_results(f"Resposta com {args.size} incidentes", results)
+
+
+if __name__ == "__main__":
+    main()
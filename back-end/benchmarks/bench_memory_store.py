@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark do banco em memória: consultas com índices vs varredura completa
+
+Popula um MemoryDatabase com registros sintéticos e mede, para as consultas das
+listagens de incidentes, o caminho indexado (índices hash + índice ordenado por
+created_at) contra uma varredura de todos os documentos seguida de ordenação.
+Não precisa de MongoDB.
+
+Uso:
+    python benchmarks/bench_memory_store.py --size 200000
+"""
+import argparse
+import time
+
+from common import measure, print_results
+from services.incident_service import IncidentService
+from utils.memory_store import create_memory_database, get_path, matches, sort_key
+from utils.pagination import KEYSET_SORT, apply_keyset
+
+
+def full_scan(collection, query, limit):
+    """Referência: filtra todos os documentos e ordena como KEYSET_SORT"""
+    selected = [document for document in collection._documents.values() if matches(document, query)]
+    selected.sort(key=lambda document: (sort_key(get_path(document, "created_at")), sort_key(document["_id"])),
+                  reverse=True)
+    return selected[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200000, help="Incidentes sintéticos")
+    parser.add_argument("--per-page", type=int, default=50, help="Itens por página")
+    parser.add_argument("--repeat", type=int, default=10, help="Repetições por caminho")
+    args = parser.parse_args()
+
+    print(f"🌱 Gerando {args.size} incidentes em memória...")
+    start = time.perf_counter()
+    db = create_memory_database("bench_memory", incidents=args.size)
+    print(f"   pronto em {time.perf_counter() - start:.1f}s")
+
+    collection = db.chamados
+    service = IncidentService(db=db)
+    queries = {
+        "sem filtro": {},
+        "fila": {"local_problema": "alarmes"},
+        "fila + prioridade": {"local_problema": "alarmes", "prioridade": "critica"},
+        "atribuido": {"atribuido": "analista7"}
+    }
+
+    # Posição no meio da coleção, para a página por cursor
+    middle = list(collection.find({}).sort(KEYSET_SORT).skip(args.size // 2).limit(1))[0]
+    position = (middle["created_at"], middle["_id"])
+
+    for name, query in queries.items():
+        results = {
+            "varredura": measure(lambda: full_scan(collection, query, args.per_page), repeat=args.repeat),
+            "índices": measure(lambda: list(collection.find(query).sort(KEYSET_SORT).limit(args.per_page)),
+                               repeat=args.repeat),
+            "índices (cursor)": measure(
+                lambda: list(collection.find(apply_keyset(query, position)).sort(KEYSET_SORT).limit(args.per_page)),
+                repeat=args.repeat
+            ),
+            "count (índices)": measure(lambda: collection.count_documents(query), repeat=args.repeat)
+        }
+        print_results(f"Página de {args.per_page} — {name} ({args.size} incidentes)", results)
+
+    results = {
+        "get_incidents (página 1)": measure(lambda: service.get_incidents({"fila": "ALARMES"}, args.per_page),
+                                            repeat=args.repeat),
+        "get_incident_count": measure(lambda: service.get_incident_count({"fila": "ALARMES"}), repeat=args.repeat)
+    }
+    print_results("Serviço de incidentes sobre o banco em memória", results)
+
+
+if __name__ == "__main__":
+    main()
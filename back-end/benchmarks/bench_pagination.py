@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark de paginação: skip/limit vs cursor (keyset)
+
+Mede a latência da página 1 e de uma página profunda (padrão: 10.000) nos
+dois modos. A paginação por cursor usa o índice composto (created_at, _id).
+
+Uso:
+    python benchmarks/bench_pagination.py --size 1000000 --deep-page 10000
+"""
+import argparse
+
+from common import connect_bench_db, seed_incidents, measure, print_results
+from utils.pagination import KEYSET_SORT, keyset_filter
+
+
+def fetch_by_skip(collection, page: int, per_page: int):
+    skip = (page - 1) * per_page
+    return list(collection.find({}).sort(KEYSET_SORT).skip(skip).limit(per_page))
+
+
+def fetch_by_cursor(collection, position, per_page: int):
+    query = keyset_filter(position) if position else {}
+    return list(collection.find(query).sort(KEYSET_SORT).limit(per_page))
+
+
+def position_before_page(collection, page: int, per_page: int):
+    """Posição (created_at, _id) do último item da página anterior"""
+    if page == 1:
+        return None
+    last = collection.find({}, {"created_at": 1}).sort(KEYSET_SORT).skip((page - 1) * per_page - 1).limit(1).next()
+    return last["created_at"], last["_id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1000000, help="Quantidade de incidentes semeados")
+    parser.add_argument("--per-page", type=int, default=100, help="Itens por página")
+    parser.add_argument("--deep-page", type=int, default=10000, help="Página profunda a medir")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções medidas por caminho")
+    parser.add_argument("--skip-seed", action="store_true", help="Reutilizar a coleção já semeada")
+    args = parser.parse_args()
+
+    if args.deep_page * args.per_page > args.size:
+        parser.error("--size precisa comportar --deep-page * --per-page documentos")
+
+    client, db = connect_bench_db()
+    collection = db.chamados
+
+    if not args.skip_seed:
+        print(f"🌱 Semeando {args.size} incidentes em {db.name}.chamados...")
+        seed_incidents(collection, args.size)
+    collection.create_index([("created_at", -1), ("_id", -1)])
+
+    deep_position = position_before_page(collection, args.deep_page, args.per_page)
+
+    # Os dois modos devem retornar exatamente a mesma página
+    by_skip = fetch_by_skip(collection, args.deep_page, args.per_page)
+    by_cursor = fetch_by_cursor(collection, deep_position, args.per_page)
+    assert [d["_id"] for d in by_skip] == [d["_id"] for d in by_cursor], "páginas divergentes"
+
+    results = {
+        "skip: página 1": measure(lambda: fetch_by_skip(collection, 1, args.per_page), args.repeat),
+        f"skip: página {args.deep_page}": measure(
+            lambda: fetch_by_skip(collection, args.deep_page, args.per_page), args.repeat),
+        "cursor: página 1": measure(lambda: fetch_by_cursor(collection, None, args.per_page), args.repeat),
+        f"cursor: página {args.deep_page}": measure(
+            lambda: fetch_by_cursor(collection, deep_position, args.per_page), args.repeat)
+    }
+    print_results(f"Listagem de incidentes ({args.per_page} por página)", results)
+
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark da conversão documento -> JSON da listagem de incidentes
+
+Para cada 1.000 documentos compara:
+- incident_to_response + .dict() (modelo Pydantic validado por linha)
+- IncidentResponse.model_construct + .dict() (modelo sem validação)
+- incident_to_dict (dicionário montado direto do documento)
+todos seguidos da serialização JSON do Flask, como no jsonify da rota.
+
+Depois mede a página completa do serviço (get_incidents vs get_incident_page,
+este com projeção) sobre o banco em memória, ou sobre o MongoDB com --mongo.
+
+Uso:
+    python benchmarks/bench_serialization.py --docs 1000
+    python benchmarks/bench_serialization.py --mongo --size 100000 --per-page 100
+"""
+import argparse
+import random
+from datetime import datetime
+
+from bson import ObjectId
+from flask import Flask
+
+from common import connect_bench_db, make_incident, measure, print_results, seed_incidents
+from models.incident_model import IncidentResponse
+from services.incident_service import IncidentService, incident_to_dict, incident_to_response
+from utils.memory_store import create_memory_database
+
+
+def constructed(incident):
+    """Modelo montado com model_construct (sem validação) a partir do documento"""
+    return IncidentResponse.model_construct(**incident_to_dict(incident))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=1000, help="Documentos convertidos por medição")
+    parser.add_argument("--size", type=int, default=100000, help="Incidentes no banco (página do serviço)")
+    parser.add_argument("--per-page", type=int, default=100, help="Itens por página do serviço")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetições por caminho")
+    parser.add_argument("--mongo", action="store_true", help="Usar MongoDB em vez do banco em memória")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    base_date = datetime.utcnow()
+    documents = [{"_id": ObjectId(), **make_incident(index, base_date, rng)} for index in range(args.docs)]
+    dumps = Flask(__name__).json.dumps
+
+    results = {
+        "Pydantic + .dict()": measure(
+            lambda: dumps([incident_to_response(doc).dict() for doc in documents]), repeat=args.repeat),
+        "model_construct + .dict()": measure(
+            lambda: dumps([constructed(doc).dict() for doc in documents]), repeat=args.repeat),
+        "incident_to_dict": measure(
+            lambda: dumps([incident_to_dict(doc) for doc in documents]), repeat=args.repeat)
+    }
+    print_results(f"Conversão + JSON de {args.docs} documentos", results)
+
+    if args.mongo:
+        client, db = connect_bench_db()
+        print(f"🌱 Semeando {args.size} incidentes em {db.name}.chamados...")
+        seed_incidents(db.chamados, args.size)
+    else:
+        client = None
+        print(f"🌱 Gerando {args.size} incidentes em memória...")
+        db = create_memory_database("bench_serialization", incidents=args.size)
+
+    service = IncidentService(db=db)
+    results = {
+        "get_incidents + .dict()": measure(
+            lambda: dumps([incident.dict() for incident in service.get_incidents(None, args.per_page)]),
+            repeat=args.repeat),
+        "get_incident_page": measure(
+            lambda: dumps(service.get_incident_page(None, args.per_page)), repeat=args.repeat)
+    }
+    print_results(f"Página de {args.per_page} incidentes ({'MongoDB' if args.mongo else 'memória'})", results)
+
+    if client is not None:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark das tendências do dashboard: rollups vs varredura da coleção
+
+Semeia incidentes distribuídos nos últimos 90 dias, executa o backfill dos
+rollups (manage.py backfill-trends) e compara a série diária de 90 dias lida
+dos rollups (NumPy e Python puro) com a mesma contagem de abertos e fechados
+feita varrendo os incidentes do período.
+
+Com --mongo usa o MongoDB (banco de benchmark); sem ele, o banco em memória.
+
+Uso:
+    python benchmarks/bench_trends.py --mongo --size 1000000
+    python benchmarks/bench_trends.py --size 200000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from common import connect_bench_db, make_incident, measure, print_results
+from services import trends
+from services.incident_service import IncidentService, INCIDENT_CLOSED_STATUS
+from utils.memory_store import MemoryDatabase
+
+
+def seed_spread(db, size: int, days: int, batch_size: int = 10000, seed: int = 42) -> None:
+    """Recria a coleção chamados com incidentes abertos ao longo dos últimos `days` dias"""
+    db.chamados.drop()
+    collection = db.chamados
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    step = timedelta(days=days) / size
+
+    batch = []
+    for index in range(size):
+        incident = make_incident(index, now, rng)
+        incident["created_at"] = now - timedelta(days=days) + step * index
+        if incident["status"] in INCIDENT_CLOSED_STATUS:
+            incident["updated_at"] = incident["created_at"] + timedelta(hours=rng.randint(1, 72))
+            incident["closed_at"] = incident["updated_at"]
+        batch.append(incident)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+
+
+def scan_daily_counts(collection, days: int):
+    """Abertos e fechados por dia varrendo os incidentes do período"""
+    start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    opened, closed = Counter(), Counter()
+    projection = {"_id": 0, "created_at": 1, "updated_at": 1, "status": 1}
+    for incident in collection.find({"created_at": {"$gte": start}}, projection):
+        opened[incident["created_at"].date()] += 1
+        if incident["status"] in INCIDENT_CLOSED_STATUS:
+            closed[(incident.get("updated_at") or incident["created_at"]).date()] += 1
+    return opened, closed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200000, help="Incidentes semeados")
+    parser.add_argument("--days", type=int, default=90, help="Dias cobertos pelos incidentes e pela série")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções medidas por caminho")
+    parser.add_argument("--mongo", action="store_true", help="Usar MongoDB em vez do banco em memória")
+    args = parser.parse_args()
+
+    client = None
+    if args.mongo:
+        client, db = connect_bench_db()
+    else:
+        db = MemoryDatabase("bench_trends")
+    print(f"🌱 Semeando {args.size} incidentes nos últimos {args.days} dias...")
+    seed_spread(db, args.size, args.days)
+
+    service = IncidentService(db=db)
+    start = time.perf_counter()
+    report = service.trends.rebuild()
+    print(f"📈 Backfill: {time.perf_counter() - start:.2f}s, {report['buckets']['day']} buckets por dia, "
+          f"{report['buckets']['hour']} por hora")
+
+    def rollups_python():
+        numpy, trends.numpy = trends.numpy, None
+        try:
+            return service.get_trends("day", args.days, 7, "filas")
+        finally:
+            trends.numpy = numpy
+
+    results = {
+        "varredura da coleção": measure(lambda: scan_daily_counts(db.chamados, args.days), args.repeat),
+        "rollups + Python": measure(rollups_python, args.repeat)
+    }
+    if trends.numpy is not None:
+        results["rollups + NumPy"] = measure(lambda: service.get_trends("day", args.days, 7, "filas"), args.repeat)
+    else:
+        print("⚠️ NumPy não instalado: medindo apenas o cálculo em Python")
+    print_results(f"Tendência diária de {args.days} dias ({args.size} incidentes)", results)
+
+    if client is not None:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
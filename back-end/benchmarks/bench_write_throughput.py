@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escrita: criações e atualizações por segundo
+
+Compara o caminho antigo (pré-consulta de número duplicado + insert_one +
+find_one de releitura; update + get_incident_by_id) com o caminho atual do
+IncidentService, que monta a resposta a partir do próprio documento escrito.
+
+Uso:
+    python benchmarks/bench_write_throughput.py --count 5000
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+
+from common import connect_bench_db, make_incident
+from models.incident_model import IncidentCreate, IncidentUpdate
+from services.incident_service import IncidentService, incident_to_response
+from services.stats_counters import STATS_COUNTERS_COLLECTION
+
+
+def incident_payloads(count: int, offset: int, seed: int = 7):
+    """Payloads de criação com números explícitos (fora da sequência)"""
+    rng = random.Random(seed)
+    base_date = datetime.utcnow()
+    payloads = []
+    for index in range(count):
+        data = make_incident(offset + index, base_date, rng)
+        data.pop("created_at")
+        data.pop("updated_at")
+        payloads.append(IncidentCreate(**data))
+    return payloads
+
+
+def record_insert(service: IncidentService, incident_dict):
+    """Contadores, tendências e versão em um único bulk_write, como Repository._after_write"""
+    changes = [(None, incident_dict)]
+    operations = [*service.counters.operations(changes), *service.trends.operations(changes), service.version.operation()]
+    service.db[STATS_COUNTERS_COLLECTION].bulk_write(operations, ordered=False)
+
+
+def create_with_round_trips(service: IncidentService, incident_data: IncidentCreate):
+    """Caminho antigo: três idas ao banco por criação"""
+    if service.collection.find_one({"numero": incident_data.numero}):
+        raise ValueError(f"Incidente com número {incident_data.numero} já existe")
+    incident_dict = incident_data.dict()
+    incident_dict["created_at"] = datetime.utcnow()
+    incident_dict["updated_at"] = None
+    result = service.collection.insert_one(incident_dict)
+    record_insert(service, incident_dict)
+    return incident_to_response(service.collection.find_one({"_id": result.inserted_id}))
+
+
+def update_with_round_trips(service: IncidentService, incident_id: str, update_data: IncidentUpdate):
+    """Caminho antigo: atualização seguida de releitura"""
+    service.update_incident(incident_id, update_data)
+    return service.get_incident_by_id(incident_id)
+
+
+def throughput(operation, items) -> float:
+    """Executa `operation` para cada item e retorna operações por segundo"""
+    start = time.perf_counter()
+    for item in items:
+        operation(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=5000, help="Operações medidas por caminho")
+    args = parser.parse_args()
+
+    client, db = connect_bench_db()
+    db.chamados.drop()
+    db[STATS_COUNTERS_COLLECTION].delete_one({"_id": "incidentes"})
+    db.chamados.create_index("numero", unique=True)
+
+    service = IncidentService(db)
+    service.counters.rebuild()
+
+    print(f"✍️ Executando {args.count} criações e atualizações por caminho em {db.name}.chamados...")
+    before = incident_payloads(args.count, 0)
+    after = incident_payloads(args.count, args.count)
+
+    results = {
+        "criação (antes)": throughput(lambda data: create_with_round_trips(service, data), before),
+        "criação (depois)": throughput(service.create_incident, after)
+    }
+
+    ids = [str(doc["_id"]) for doc in db.chamados.find({}, {"_id": 1}).limit(args.count)]
+    update = IncidentUpdate(status="em_andamento")
+    results["atualização (antes)"] = throughput(lambda i: update_with_round_trips(service, i, update), ids)
+    results["atualização (depois)"] = throughput(lambda i: service.update_incident(i, update), ids)
+
+    print(f"\n📊 Vazão de escrita ({args.count} operações por caminho)")
+    print("=" * 48)
+    print(f"{'caminho':<28}{'ops/s':>20}")
+    for name, ops in results.items():
+        print(f"{name:<28}{ops:>20.0f}")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
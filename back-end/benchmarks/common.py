@@ -0,0 +1,91 @@
+"""
+Utilitários compartilhados pelos benchmarks do back-end
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+# Permitir importar os módulos da aplicação (config, services, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+from config import settings
+
+
+FILAS = ["fila_p2k", "fila_crivo", "sg5_ura", "alarmes", "tsk_vendas", "sr", "rit"]
+PRIORIDADES = ["critica", "alta", "media", "baixa"]
+STATUS = ["em_andamento", "em_espera", "tks_remoto", "aberto", "resolvido", "fechado"]
+TIPOS_TAREFA = ["manutencao", "suporte", "configuracao", "atualizacao", "investigacao"]
+GRUPOS = ["TI Infraestrutura", "TI Sistemas", "TI Vendas", "TI Monitoramento", "TI Dados"]
+
+
+def connect_bench_db(db_name: str = None):
+    """Conecta ao MongoDB e retorna (client, db) do banco de benchmark"""
+    client = MongoClient(settings.MONGODB_URI, serverSelectionTimeoutMS=5000)
+    client.admin.command('ping')
+    return client, client[db_name or f"{settings.MONGODB_DB}_bench"]
+
+
+def make_incident(index: int, base_date: datetime, rng: random.Random) -> Dict[str, Any]:
+    """Gera um incidente sintético"""
+    return {
+        "numero": f"INC-{index + 1:07d}",
+        "titulo": f"Incidente sintético {index + 1}",
+        "descricao": "Incidente gerado para benchmark " * rng.randint(1, 20),
+        "prioridade": rng.choice(PRIORIDADES),
+        "status": rng.choice(STATUS),
+        "atribuido": f"analista{rng.randint(1, 50)}",
+        "tipo_tarefa": rng.choice(TIPOS_TAREFA),
+        "grupo_designado": rng.choice(GRUPOS),
+        "local_problema": rng.choice(FILAS),
+        "incidente_vendas": rng.random() < 0.2,
+        "created_at": base_date + timedelta(seconds=index),
+        "updated_at": None
+    }
+
+
+def seed_incidents(collection, size: int, batch_size: int = 10000, seed: int = 42) -> None:
+    """Recria a coleção com `size` incidentes sintéticos"""
+    collection.drop()
+    rng = random.Random(seed)
+    base_date = datetime.utcnow() - timedelta(seconds=size)
+
+    batch: List[Dict[str, Any]] = []
+    for index in range(size):
+        batch.append(make_incident(index, base_date, rng))
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """Executa `func` várias vezes e retorna estatísticas de tempo em milissegundos"""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "max_ms": max(samples)
+    }
+
+
+def print_results(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    """Imprime uma tabela simples com os resultados"""
+    print(f"\n📊 {title}")
+    print("=" * 64)
+    print(f"{'caminho':<28}{'min (ms)':>12}{'mediana (ms)':>14}{'max (ms)':>10}")
+    for name, result in results.items():
+        print(f"{name:<28}{result['min_ms']:>12.1f}{result['median_ms']:>14.1f}{result['max_ms']:>10.1f}")
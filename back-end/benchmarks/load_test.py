@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Teste de carga: req/s em /api/incidentes/ com 1 vs N workers do gunicorn
+
+Para cada quantidade de workers, sobe `gunicorn -c gunicorn.conf.py wsgi:app`
+apontando para o banco de benchmark, dispara requisições concorrentes com
+keep-alive durante --duration segundos e encerra o servidor com SIGTERM.
+
+Uso:
+    python benchmarks/load_test.py --workers 1 4 --concurrency 32 --duration 15
+"""
+import argparse
+import http.client
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from common import connect_bench_db, seed_incidents
+from config import settings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, threads: int, port: int, db_name: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WEB_WORKERS": str(workers),
+        "WEB_THREADS": str(threads),
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(port),
+        "MONGODB_DB": db_name,
+        "LOG_LEVEL": "WARNING"
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--access-logfile", os.devnull, "wsgi:app"],
+        cwd=BACKEND_DIR, env=env
+    )
+
+
+def wait_until_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"servidor não respondeu na porta {port}")
+
+
+def run_load(port: int, path: str, concurrency: int, duration: float) -> dict:
+    """Dispara requisições com `concurrency` clientes keep-alive e retorna as métricas"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, failed = [], 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status == 200:
+                    local.append(time.perf_counter() - start)
+                else:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+        "errors": errors[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, settings.WEB_WORKERS],
+                        help="Quantidades de workers a comparar")
+    parser.add_argument("--threads", type=int, default=settings.WEB_THREADS, help="Threads por worker")
+    parser.add_argument("--concurrency", type=int, default=32, help="Clientes simultâneos")
+    parser.add_argument("--duration", type=float, default=15.0, help="Duração (s) de cada rodada")
+    parser.add_argument("--path", default="/api/incidentes/?per_page=50", help="Rota medida")
+    parser.add_argument("--port", type=int, default=5055, help="Porta usada pelo servidor de teste")
+    parser.add_argument("--size", type=int, default=10000, help="Incidentes semeados (0 mantém a coleção)")
+    args = parser.parse_args()
+
+    client, db = connect_bench_db()
+    if args.size:
+        print(f"🌱 Semeando {args.size} incidentes em {db.name}.chamados...")
+        seed_incidents(db.chamados, args.size)
+    client.close()
+
+    results = {}
+    for workers in args.workers:
+        print(f"🚀 Subindo gunicorn com {workers} worker(s) x {args.threads} thread(s)...")
+        server = start_server(workers, args.threads, args.port, db.name)
+        try:
+            wait_until_ready(args.port)
+            run_load(args.port, args.path, args.concurrency, min(args.duration, 3.0))  # aquecimento
+            results[workers] = run_load(args.port, args.path, args.concurrency, args.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=settings.WEB_GRACEFUL_TIMEOUT + 5)
+
+    print(f"\n📊 GET {args.path} ({args.concurrency} clientes, {args.duration:.0f}s por rodada)")
+    print("=" * 64)
+    print(f"{'workers':<12}{'req/s':>12}{'p50 (ms)':>14}{'p99 (ms)':>14}{'erros':>12}")
+    for workers, result in results.items():
+        print(f"{workers:<12}{result['rps']:>12.0f}{result['p50_ms']:>14.1f}{result['p99_ms']:>14.1f}{result['errors']:>12}")
+
+
+if __name__ == "__main__":
+    main()
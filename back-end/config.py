@@ -19,6 +19,71 @@ class Settings(BaseSettings):
         default="sistema_chamados",
         description="Nome do banco de dados"
     )
+    MONGODB_MAX_POOL_SIZE: int = Field(
+        default=10,
+        description="Conexões máximas do pool por processo (cada worker tem o seu)"
+    )
+    MONGODB_MIN_POOL_SIZE: int = Field(
+        default=0,
+        description="Conexões mantidas abertas no pool mesmo ociosas"
+    )
+    MONGODB_MAX_IDLE_TIME_MS: Optional[int] = Field(
+        default=None,
+        description="Tempo (ms) que uma conexão ociosa permanece no pool (vazio = sem limite)"
+    )
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = Field(
+        default=None,
+        description="Espera máxima (ms) por uma conexão livre do pool (vazio = até o timeout de seleção)"
+    )
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = Field(
+        default=5000,
+        description="Tempo (ms) para encontrar um servidor disponível"
+    )
+    MONGODB_CONNECT_TIMEOUT_MS: int = Field(
+        default=2000,
+        description="Tempo (ms) para abrir uma conexão"
+    )
+    MONGODB_SOCKET_TIMEOUT_MS: int = Field(
+        default=2000,
+        description="Tempo (ms) de espera por uma resposta do servidor"
+    )
+    MONGODB_COMPRESSORS: str = Field(
+        default="",
+        description="Compressores de rede em ordem de preferência (ex: zstd,snappy,zlib)"
+    )
+    MONGODB_READ_PREFERENCE: str = Field(
+        default="primary",
+        description="Read preference (primary, primaryPreferred, secondary, secondaryPreferred, nearest)"
+    )
+    MONGODB_WRITE_CONCERN: str = Field(
+        default="1",
+        description="Write concern w (número de membros ou 'majority')"
+    )
+    MONGODB_WRITE_CONCERN_JOURNAL: Optional[bool] = Field(
+        default=None,
+        description="Aguardar o journal nas escritas (vazio = padrão do servidor)"
+    )
+    DATA_BACKEND: str = Field(
+        default="mongodb",
+        description="Backend de dados: mongodb, memory (desenvolvimento) ou auto (memória se o MongoDB "
+                    "estiver indisponível, somente com DEBUG)"
+    )
+    MOCK_DATA_INCIDENTS: int = Field(
+        default=1000,
+        description="Incidentes sintéticos gerados no banco em memória"
+    )
+    MOCK_DATA_CHANGES: int = Field(
+        default=200,
+        description="Changes sintéticas geradas no banco em memória"
+    )
+    MOCK_DATA_USERS: int = Field(
+        default=50,
+        description="Usuários sintéticos gerados no banco em memória"
+    )
+    MONGODB_RECONNECT_INTERVAL_SECONDS: float = Field(
+        default=30.0,
+        description="Intervalo (s) entre tentativas de reconexão em segundo plano enquanto o banco estiver indisponível (0 desativa)"
+    )
     
     # Configurações da aplicação
     APP_NAME: str = Field(
@@ -34,12 +99,187 @@ class Settings(BaseSettings):
         description="Chave secreta da aplicação"
     )
     
+    # Configurações do servidor
+    SERVER_HOST: str = Field(
+        default="0.0.0.0",
+        description="Endereço de escuta do servidor"
+    )
+    SERVER_PORT: int = Field(
+        default=5000,
+        description="Porta de escuta do servidor"
+    )
+    WEB_WORKERS: int = Field(
+        default=4,
+        description="Processos worker do gunicorn"
+    )
+    WEB_THREADS: int = Field(
+        default=4,
+        description="Threads por worker do gunicorn (worker gthread)"
+    )
+    WEB_TIMEOUT: int = Field(
+        default=30,
+        description="Tempo máximo (s) de uma requisição antes do worker ser reiniciado"
+    )
+    WEB_GRACEFUL_TIMEOUT: int = Field(
+        default=30,
+        description="Tempo (s) para concluir requisições em andamento no desligamento"
+    )
+    WEB_KEEPALIVE: int = Field(
+        default=5,
+        description="Tempo (s) de keep-alive das conexões HTTP"
+    )
+    WEB_MAX_REQUESTS: int = Field(
+        default=0,
+        description="Requisições por worker antes de reciclá-lo (0 desativa)"
+    )
+    
     # Configurações de CORS
     CORS_ORIGINS: list[str] = Field(
         default=["http://localhost:3000", "http://localhost:5173"],
         description="Origens permitidas para CORS"
     )
     
+    # Configurações de índices
+    INDEX_SYNC_ON_STARTUP: bool = Field(
+        default=True,
+        description="Criar em segundo plano os índices ausentes ao iniciar a aplicação"
+    )
+    
+    # Configurações de cache
+    STATS_CACHE_TTL_SECONDS: float = Field(
+        default=5.0,
+        description="Tempo de vida (s) dos snapshots de estatísticas do dashboard (0 desativa)"
+    )
+    COUNT_CACHE_TTL_SECONDS: float = Field(
+        default=10.0,
+        description="Tempo de vida (s) dos totais estimados das listagens (count=estimated)"
+    )
+    
+    # Configurações de GET condicional (ETag / If-None-Match)
+    CONDITIONAL_GET_ENABLED: bool = Field(
+        default=True,
+        description="Enviar ETag e responder 304 nas listagens, detalhes e rotas do dashboard"
+    )
+    CACHE_CONTROL_DEFAULT: str = Field(
+        default="no-cache",
+        description="Cache-Control das respostas com ETag (no-cache: revalida sempre, com 304 quando nada mudou)"
+    )
+    CACHE_CONTROL_ROUTES: dict[str, str] = Field(
+        default={"/api/dashboard/health": "no-store", "/api/dashboard/cache": "no-store"},
+        description="Cache-Control por rota (regra do Flask, ex: /api/incidentes/<incident_id>), em JSON"
+    )
+    
+    # Consulta paralela dos módulos do dashboard: Motor/asyncio (services/async_runtime.py)
+    # ou, sem o pacote motor ou no banco em memória, threads (services/dashboard_fanout.py)
+    ASYNC_DASHBOARD_ENABLED: bool = Field(
+        default=True,
+        description="Consultar os módulos do dashboard em paralelo via Motor (se instalado)"
+    )
+    ASYNC_MONGODB_MAX_POOL_SIZE: int = Field(
+        default=3,
+        description="Conexões máximas do cliente Motor por processo (uma por módulo do overview)"
+    )
+    ASYNC_TIMEOUT_SECONDS: float = Field(
+        default=10.0,
+        description="Tempo máximo (s) de espera por uma operação assíncrona"
+    )
+    DASHBOARD_FANOUT_THREADS: int = Field(
+        default=2,
+        description="Threads por worker para consultar os módulos do dashboard em paralelo sem o Motor (0 desativa); "
+                    "cada consulta usa uma conexão de MONGODB_MAX_POOL_SIZE"
+    )
+    
+    # Configurações de serialização JSON das respostas
+    JSON_ENCODER: str = Field(
+        default="auto",
+        description="Codificador JSON: auto (orjson se instalado), orjson ou stdlib"
+    )
+    JSON_DATETIME_FORMAT: str = Field(
+        default="http",
+        description="Formato das datas nas respostas: http (RFC 822, padrão do Flask) ou iso (ISO 8601)"
+    )
+    JSON_SORT_KEYS: bool = Field(
+        default=True,
+        description="Ordenar as chaves dos objetos JSON (padrão do Flask)"
+    )
+    
+    # Configurações de operações em lote
+    BULK_MAX_ITEMS: int = Field(
+        default=1000,
+        description="Quantidade máxima de itens por requisição nas rotas /bulk"
+    )
+    
+    # Configurações de exportação
+    EXPORT_BATCH_SIZE: int = Field(
+        default=1000,
+        description="Documentos por lote do cursor nas exportações em streaming (/export)"
+    )
+    
+    # Configurações de tendências (/api/dashboard/trends)
+    TREND_MAX_PERIODS: int = Field(
+        default=2160,
+        description="Quantidade máxima de buckets por consulta de tendência (2160 = 90 dias por hora)"
+    )
+    TREND_STABLE_PERCENT: float = Field(
+        default=5.0,
+        description="Variação percentual de abertos até a qual a tendência é considerada estável"
+    )
+
+    # Configurações das estatísticas diárias materializadas (daily_stats)
+    DAILY_STATS_REFRESH_SECONDS: float = Field(
+        default=60.0,
+        description="Intervalo (s) entre atualizações agendadas de daily_stats (0 desativa; use manage.py refresh-daily-stats)"
+    )
+    DAILY_STATS_MAX_DAYS: int = Field(
+        default=366,
+        description="Quantidade máxima de dias por consulta de /api/dashboard/daily"
+    )
+
+    # Configurações do canal de eventos (/api/stream, Server-Sent Events)
+    STREAM_CHANGE_STREAMS_ENABLED: bool = Field(
+        default=True,
+        description="Alimentar o canal com change streams do MongoDB (false usa apenas as escritas do processo)"
+    )
+    # Cada conexão SSE prende uma thread gthread do worker enquanto está aberta;
+    # o gunicorn.conf.py usa threads = WEB_THREADS + STREAM_MAX_CLIENTS para que
+    # os streams não ocupem as threads das requisições comuns
+    STREAM_MAX_CLIENTS: int = Field(
+        default=2,
+        description="Conexões SSE simultâneas por processo (cada uma ocupa uma thread além de WEB_THREADS)"
+    )
+    STREAM_QUEUE_SIZE: int = Field(
+        default=256,
+        description="Eventos pendentes por cliente (e escritas guardadas durante a reconexão) antes de um reset"
+    )
+    STREAM_HEARTBEAT_SECONDS: float = Field(
+        default=15.0,
+        description="Intervalo (s) dos comentários keep-alive enviados sem eventos"
+    )
+    STREAM_STATS_INTERVAL_SECONDS: float = Field(
+        default=1.0,
+        description="Intervalo mínimo (s) entre publicações das estatísticas de um módulo"
+    )
+    STREAM_RETRY_SECONDS: float = Field(
+        default=3.0,
+        description="Espera (s) para retomar o change stream e reconexão sugerida ao EventSource"
+    )
+
+    # Listagens legadas (/api/legacy/chamados e /api/legacy/changes do front-end)
+    LEGACY_LIST_DEFAULT_LIMIT: int = Field(
+        default=500,
+        description="Itens por página das listagens legadas com cursor e sem limit (sem os dois, a listagem é completa)"
+    )
+    LEGACY_LIST_MAX_LIMIT: int = Field(
+        default=1000,
+        description="Teto de limit nas listagens legadas (stream=true não tem teto)"
+    )
+    
+    # Configurações de numeração
+    SEQUENCE_BLOCK_SIZE: int = Field(
+        default=1,
+        description="Números INC-/CHG- reservados por worker a cada ida ao banco (1 desativa a pré-alocação)"
+    )
+    
     # Configurações de Log
     LOG_LEVEL: str = Field(
         default="INFO",
@@ -50,6 +290,28 @@ class Settings(BaseSettings):
         description="Formato dos logs"
     )
     
+    def mongo_client_options(self) -> dict:
+        """Opções do MongoClient derivadas das configurações de pool e conexão"""
+        write_concern = self.MONGODB_WRITE_CONCERN
+        options = {
+            "maxPoolSize": self.MONGODB_MAX_POOL_SIZE,
+            "minPoolSize": self.MONGODB_MIN_POOL_SIZE,
+            "serverSelectionTimeoutMS": self.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            "connectTimeoutMS": self.MONGODB_CONNECT_TIMEOUT_MS,
+            "socketTimeoutMS": self.MONGODB_SOCKET_TIMEOUT_MS,
+            "readPreference": self.MONGODB_READ_PREFERENCE,
+            "w": int(write_concern) if write_concern.isdigit() else write_concern
+        }
+        if self.MONGODB_MAX_IDLE_TIME_MS is not None:
+            options["maxIdleTimeMS"] = self.MONGODB_MAX_IDLE_TIME_MS
+        if self.MONGODB_WAIT_QUEUE_TIMEOUT_MS is not None:
+            options["waitQueueTimeoutMS"] = self.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+        if self.MONGODB_COMPRESSORS:
+            options["compressors"] = self.MONGODB_COMPRESSORS
+        if self.MONGODB_WRITE_CONCERN_JOURNAL is not None:
+            options["journal"] = self.MONGODB_WRITE_CONCERN_JOURNAL
+        return options
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -71,10 +333,7 @@ class FlaskConfig:
         'host': settings.MONGODB_URI,
         'db': settings.MONGODB_DB,
         'connect': False,  # Conexão lazy
-        'maxPoolSize': 10,
-        'serverSelectionTimeoutMS': 5000,
-        'socketTimeoutMS': 2000,
-        'connectTimeoutMS': 2000,
+        **settings.mongo_client_options()
     }
     
     # Configurações de CORS
@@ -6,12 +6,17 @@ from flask_cors import CORS
 from pymongo import MongoClient
 from config import settings
 import logging
+import threading
+import time
 
 
 # Cliente MongoDB
 mongo_client = None
 db = None
 use_mock_data = False
+memory_db = None
+_reconnect_lock = threading.Lock()
+_reconnect_thread = None
 
 
 def init_extensions(app: Flask):
@@ -23,6 +28,12 @@ def init_extensions(app: Flask):
     # Configurar MongoDB
     init_mongodb(app)
     
+    # Atualizar periodicamente as estatísticas diárias materializadas
+    start_daily_stats_scheduler(app)
+    
+    # Tentar reconectar em segundo plano enquanto o banco estiver indisponível
+    start_reconnect_thread(app)
+    
     # Configurar Logging
     init_logging(app)
 
@@ -30,60 +41,143 @@ def init_extensions(app: Flask):
 def init_mongodb(app: Flask):
     """Inicializa conexão com MongoDB"""
     global mongo_client, db, use_mock_data
+    from services.pool_metrics import pool_metrics
     
-    try:
-        # Criar cliente MongoDB
-        mongo_client = MongoClient(
-            settings.MONGODB_URI,
-            maxPoolSize=10,
-            serverSelectionTimeoutMS=5000,
-            socketTimeoutMS=2000,
-            connectTimeoutMS=2000
-        )
-        
-        # Testar conexão
-        mongo_client.admin.command('ping')
-        
-        # Selecionar banco de dados
-        db = mongo_client[settings.MONGODB_DB]
-        
-        # Configurar índices
-        setup_database_indexes()
-        
-        app.logger.info(f"✅ MongoDB conectado com sucesso: {settings.MONGODB_DB}")
-        use_mock_data = False
-        
-    except Exception as e:
-        app.logger.warning(f"⚠️ MongoDB não disponível: {e}")
-        app.logger.info("🔄 Usando dados mockados para desenvolvimento")
+    if settings.DATA_BACKEND == "memory":
+        app.logger.warning("🧪 Usando banco em memória (DATA_BACKEND=memory): apenas para desenvolvimento, "
+                           "os dados não são persistidos")
         use_mock_data = True
-        db = None
+        db = get_memory_db()
+    else:
+        try:
+            # Criar cliente MongoDB (pool e timeouts vêm de config.Settings)
+            pool_metrics.reset()
+            mongo_client = MongoClient(
+                settings.MONGODB_URI,
+                event_listeners=[pool_metrics],
+                **settings.mongo_client_options()
+            )
+            
+            # Testar conexão
+            mongo_client.admin.command('ping')
+            
+            # Selecionar banco de dados
+            db = mongo_client[settings.MONGODB_DB]
+            
+            # Configurar índices
+            setup_database_indexes()
+            
+            app.logger.info(f"✅ MongoDB conectado com sucesso: {settings.MONGODB_DB}")
+            use_mock_data = False
+            
+        except Exception as e:
+            app.logger.warning(f"⚠️ MongoDB não disponível: {e}")
+            use_mock_data = True
+            if memory_fallback_allowed():
+                app.logger.info("🔄 Usando banco em memória com dados sintéticos (DATA_BACKEND=auto, DEBUG)")
+                db = get_memory_db()
+            else:
+                # Produção: sem troca de backend, o health check responde 503 até a reconexão
+                db = None
+    
+    # Serviços construídos com o banco anterior são descartados
+    from services.registry import services
+    services.reset()
+
+
+def memory_fallback_allowed() -> bool:
+    """DATA_BACKEND=auto só troca para o banco em memória em desenvolvimento (DEBUG)"""
+    return settings.DATA_BACKEND == "auto" and settings.DEBUG
+
+
+def reconnect_mongodb(app: Flask) -> bool:
+    """Recria o cliente MongoDB; retorna se o banco está disponível"""
+    with _reconnect_lock:
+        close_mongodb()
+        init_mongodb(app)
+        return not use_mock_data
+
+
+def start_reconnect_thread(app: Flask):
+    """Reconecta em uma thread do processo, fora das requisições, até o banco voltar
+
+    Cada tentativa pode levar até MONGODB_SERVER_SELECTION_TIMEOUT_MS; enquanto
+    isso, as requisições continuam atendidas com o estado atual (banco em
+    memória em desenvolvimento, 503 no health check em produção).
+    """
+    global _reconnect_thread
+    interval = settings.MONGODB_RECONNECT_INTERVAL_SECONDS
+    if not use_mock_data or settings.DATA_BACKEND == "memory" or interval <= 0:
+        return
+    if _reconnect_thread is not None and _reconnect_thread.is_alive():
+        return
+    
+    def run():
+        while use_mock_data:
+            time.sleep(interval)
+            try:
+                if reconnect_mongodb(app):
+                    app.logger.info("✅ MongoDB reconectado")
+            except Exception as e:
+                app.logger.warning(f"⚠️ Aviso ao reconectar ao MongoDB: {e}")
+    
+    _reconnect_thread = threading.Thread(target=run, name="mongodb-reconnect", daemon=True)
+    _reconnect_thread.start()
+
+
+def get_memory_db():
+    """Banco em memória do processo, criado e populado na primeira utilização
+
+    É reaproveitado entre tentativas de reconexão para não perder os dados gravados.
+    """
+    global memory_db
+    if memory_db is None:
+        from utils.memory_store import create_memory_database
+        memory_db = create_memory_database(
+            settings.MONGODB_DB,
+            incidents=settings.MOCK_DATA_INCIDENTS,
+            changes=settings.MOCK_DATA_CHANGES,
+            users=settings.MOCK_DATA_USERS
+        )
+        # Equivalente ao manage.py backfill-trends, que não alcança o banco do processo
+        from services.incident_service import IncidentService
+        from services.change_service import ChangeService
+        IncidentService(memory_db).trends.rebuild()
+        ChangeService(memory_db).trends.rebuild()
+    return memory_db
 
 
 def setup_database_indexes():
-    """Configura índices do banco de dados"""
-    try:
-        # Índices para incidentes
-        db.incidentes.create_index("numero", unique=True)
-        db.incidentes.create_index("status")
-        db.incidentes.create_index("prioridade")
-        db.incidentes.create_index("grupo_designado")
-        db.incidentes.create_index("created_at")
-        
-        # Índices para changes
-        db.changes.create_index("numero", unique=True)
-        db.changes.create_index("status")
-        db.changes.create_index("data_programada")
-        db.changes.create_index("created_at")
-        
-        # Índices para usuários
-        db.usuarios.create_index("email", unique=True)
-        db.usuarios.create_index("username", unique=True)
-        
-        print("✅ Índices do banco de dados configurados com sucesso")
-        
-    except Exception as e:
-        print(f"⚠️ Aviso ao configurar índices: {e}")
+    """Reconcilia em segundo plano os índices declarados pelos serviços"""
+    from services.indexes import check_unique_indexes, sync_indexes_in_background, unique_index_check
+    
+    unique_index_check.reset()
+    if not settings.INDEX_SYNC_ON_STARTUP:
+        # Sem reconciliação, apenas confere se os índices únicos existem
+        try:
+            check_unique_indexes(db, logging.getLogger(__name__))
+        except Exception as e:
+            logging.warning(f"⚠️ Aviso ao verificar índices únicos: {e}")
+        return
+    
+    sync_indexes_in_background(db, logging.getLogger(__name__))
+
+
+def start_daily_stats_scheduler(app: Flask):
+    """Inicia a atualização agendada de daily_stats (DAILY_STATS_REFRESH_SECONDS)"""
+    if settings.DAILY_STATS_REFRESH_SECONDS <= 0:
+        return
+    
+    from services.daily_stats import daily_stats_scheduler
+    from services.registry import incident_service, change_service
+    
+    def targets():
+        # Sem banco conectado, nada a atualizar neste ciclo
+        if db is None:
+            return []
+        return [incident_service.daily_stats, change_service.daily_stats]
+    
+    daily_stats_scheduler.start(settings.DAILY_STATS_REFRESH_SECONDS, targets, app.logger)
 
 
 def get_db():
@@ -106,6 +200,7 @@ def close_mongodb():
     global mongo_client
     if mongo_client:
         mongo_client.close()
+        mongo_client = None
         print("🔌 Conexão com MongoDB fechada")
 
 
@@ -0,0 +1,50 @@
+"""
+Configuração do gunicorn (pre-fork, workers gthread)
+
+Os valores vêm de config.Settings e podem ser sobrescritos por variáveis de
+ambiente (WEB_WORKERS, WEB_THREADS, ...) ou pelo arquivo .env.
+
+Uso:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from config import settings
+
+bind = f"{settings.SERVER_HOST}:{settings.SERVER_PORT}"
+
+# Processos e threads: cada worker atende até WEB_THREADS requisições simultâneas,
+# mais uma thread por conexão SSE (/api/stream), que fica presa enquanto aberta
+workers = settings.WEB_WORKERS
+threads = settings.WEB_THREADS + settings.STREAM_MAX_CLIENTS
+worker_class = "gthread"
+
+timeout = settings.WEB_TIMEOUT
+graceful_timeout = settings.WEB_GRACEFUL_TIMEOUT
+keepalive = settings.WEB_KEEPALIVE
+
+# Reciclagem periódica de workers (0 desativa)
+max_requests = settings.WEB_MAX_REQUESTS
+max_requests_jitter = settings.WEB_MAX_REQUESTS // 10
+
+# MongoClient não é fork-safe: a aplicação é carregada em cada worker, depois do
+# fork, para que cada processo abra o próprio pool de conexões
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
+loglevel = settings.LOG_LEVEL.lower()
+
+
+def post_fork(server, worker):
+    server.log.info(f"👷 Worker {worker.pid} iniciado ({threads} threads, pool MongoDB de "
+                    f"{settings.MONGODB_MAX_POOL_SIZE} conexões, mais {settings.ASYNC_MONGODB_MAX_POOL_SIZE} "
+                    f"do Motor no dashboard)")
+
+
+def worker_exit(server, worker):
+    """Encerra o event loop e as threads do dashboard e os pools do MongoDB do worker no desligamento gracioso"""
+    from extensions import close_mongodb
+    from services.async_runtime import async_runtime
+    from services.dashboard_fanout import dashboard_fanout
+    async_runtime.close()
+    dashboard_fanout.close()
+    close_mongodb()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Comandos administrativos do back-end
+
+Uso:
+    python manage.py reconcile-stats [--dry-run]
+    python manage.py backfill-trends [--dry-run] [--module incidentes|changes]
+    python manage.py refresh-daily-stats [--full] [--module incidentes|changes]
+    python manage.py sync-indexes [--dry-run] [--drop-extra]
+    python manage.py index-usage
+"""
+import argparse
+import sys
+from typing import Optional
+from pymongo import MongoClient
+from config import settings
+
+
+def connect_database():
+    """Conecta ao MongoDB configurado e retorna (client, db)"""
+    try:
+        client = MongoClient(settings.MONGODB_URI, serverSelectionTimeoutMS=5000)
+        client.admin.command('ping')
+        return client, client[settings.MONGODB_DB]
+    except Exception as e:
+        print(f"❌ Erro ao conectar ao MongoDB: {e}")
+        sys.exit(1)
+
+
+def reconcile_stats(db, dry_run: bool = False) -> int:
+    """Recalcula os contadores de stats_counters e reporta o drift encontrado"""
+    from services.incident_service import IncidentService
+    from services.change_service import ChangeService
+    from services.user_service import UserService
+
+    total_drift = 0
+    for service in (IncidentService(db=db), ChangeService(db=db), UserService(db=db)):
+        report = service.counters.rebuild(dry_run=dry_run)
+        if not dry_run:
+            # Escritas fora da API não mudam as versões: renova as ETags do módulo
+            service.version.bump()
+
+        if not report["initialized"]:
+            print(f"🆕 {report['key']}: contadores ainda não existiam")
+        elif not report["drift"]:
+            print(f"✅ {report['key']}: sem drift")
+        else:
+            print(f"⚠️ {report['key']}: {len(report['drift'])} bucket(s) com drift")
+            for path, diff in report["drift"].items():
+                print(f"    {path}: {diff:+d}")
+            total_drift += len(report["drift"])
+
+    if dry_run:
+        print("\n💡 Execução em modo --dry-run: nenhum contador foi alterado")
+    else:
+        print("\n✅ Contadores reconstruídos a partir das coleções de origem (ETags renovadas)")
+
+    return total_drift
+
+
+def backfill_trends(db, dry_run: bool = False, module: Optional[str] = None) -> None:
+    """Recalcula os rollups de tendência (por hora e por dia) e o backlog a partir das coleções"""
+    from services.incident_service import IncidentService
+    from services.change_service import ChangeService
+
+    for service in (IncidentService(db=db), ChangeService(db=db)):
+        if module and service.trends.key != module:
+            continue
+        report = service.trends.rebuild(dry_run=dry_run)
+        if not dry_run:
+            service.version.bump()
+
+        status = "reconstruídos" if report["initialized"] else "criados"
+        print(f"📈 {report['key']}: {report['documents']} documento(s) -> "
+              f"{report['buckets']['hour']} bucket(s) por hora, {report['buckets']['day']} por dia, "
+              f"backlog {report['backlog']} ({'não gravados' if dry_run else status})")
+
+    if dry_run:
+        print("\n💡 Execução em modo --dry-run: nenhum rollup foi alterado")
+
+
+def refresh_daily_stats(db, full: bool = False, module: Optional[str] = None) -> None:
+    """Materializa em daily_stats os abertos, fechados e pendentes por dia (agendável via cron)"""
+    from services.incident_service import IncidentService
+    from services.change_service import ChangeService
+
+    for service in (IncidentService(db=db), ChangeService(db=db)):
+        if module and service.daily_stats.key != module:
+            continue
+        report = service.daily_stats.refresh(full=full)
+
+        since = f"desde {report['since']:%Y-%m-%d}" if report["since"] else "histórico completo"
+        print(f"📅 {report['key']}: {since} via {report['engine']}, "
+              f"{report['pending']} pendente(s) ({report['seconds']}s)")
+
+
+def sync_indexes(db, dry_run: bool = False, drop_extra: bool = False) -> int:
+    """Compara os índices existentes com os declarados pelos serviços e cria os ausentes"""
+    from services.indexes import sync_indexes as sync
+
+    report = sync(db, dry_run=dry_run, drop_extra=drop_extra)
+
+    pending = 0
+    for collection_name, result in report.items():
+        print(f"🗂️ {collection_name}")
+        if not (result["missing"] or result["conflicting"] or result["extra"]):
+            print("    ✅ índices em dia")
+        for name in result["missing"]:
+            status = "criado" if name in result["created"] else "ausente"
+            print(f"    ➕ {name} ({status})")
+        for name in result["conflicting"]:
+            print(f"    ⚠️ {name}: opções divergentes da declaração (ajuste manualmente)")
+        for name in result["extra"]:
+            status = "removido" if name in result["dropped"] else "não declarado"
+            print(f"    ➖ {name} ({status})")
+        pending += len(result["missing"]) - len(result["created"]) + len(result["conflicting"])
+
+    if dry_run:
+        print("\n💡 Execução em modo --dry-run: nenhum índice foi alterado")
+
+    return pending
+
+
+def index_usage(db) -> None:
+    """Reporta o uso de cada índice desde o último restart do servidor"""
+    from services.indexes import index_usage as usage
+
+    for collection_name, stats in usage(db).items():
+        print(f"\n📊 {collection_name}")
+        if not stats:
+            print("    (sem estatísticas: coleção vazia ou $indexStats indisponível)")
+        for stat in stats:
+            flag = "" if stat["declared"] else "  ⚠️ não declarado"
+            unused = "  💤 sem uso" if stat["ops"] == 0 else ""
+            print(f"    {stat['name']:<50}{stat['ops']:>12} ops{unused}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comandos administrativos do Sistema de Chamados")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reconcile = subparsers.add_parser("reconcile-stats", help="Reconstrói os contadores do dashboard e reporta drift")
+    reconcile.add_argument("--dry-run", action="store_true", help="Apenas reportar o drift, sem gravar")
+
+    trends = subparsers.add_parser("backfill-trends", help="Reconstrói os rollups de tendência do dashboard")
+    trends.add_argument("--dry-run", action="store_true", help="Apenas calcular, sem gravar")
+    trends.add_argument("--module", choices=["incidentes", "changes"], help="Somente um módulo")
+
+    daily = subparsers.add_parser("refresh-daily-stats", help="Atualiza as estatísticas diárias materializadas")
+    daily.add_argument("--full", action="store_true", help="Recalcular todos os dias, não só os desde a última atualização")
+    daily.add_argument("--module", choices=["incidentes", "changes"], help="Somente um módulo")
+
+    indexes = subparsers.add_parser("sync-indexes", help="Cria os índices declarados que estão ausentes")
+    indexes.add_argument("--dry-run", action="store_true", help="Apenas reportar as diferenças")
+    indexes.add_argument("--drop-extra", action="store_true", help="Remover índices não declarados")
+
+    subparsers.add_parser("index-usage", help="Reporta o uso dos índices ($indexStats)")
+
+    args = parser.parse_args()
+    client, db = connect_database()
+
+    try:
+        if args.command == "reconcile-stats":
+            drift = reconcile_stats(db, dry_run=args.dry_run)
+            sys.exit(1 if drift and args.dry_run else 0)
+        elif args.command == "backfill-trends":
+            backfill_trends(db, dry_run=args.dry_run, module=args.module)
+        elif args.command == "refresh-daily-stats":
+            refresh_daily_stats(db, full=args.full, module=args.module)
+        elif args.command == "sync-indexes":
+            pending = sync_indexes(db, dry_run=args.dry_run, drop_extra=args.drop_extra)
+            sys.exit(1 if pending and args.dry_run else 0)
+        elif args.command == "index-usage":
+            index_usage(db)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -153,7 +153,7 @@ class ChangeResponse(BaseModel):
     grupo_responsavel: str = Field(..., description="Grupo responsável")
     impacto: str = Field(..., description="Impacto")
     created_at: datetime = Field(..., description="Data de criação")
-    updated_at: datetime = Field(..., description="Data de atualização")
+    updated_at: Optional[datetime] = Field(None, description="Data de atualização")
     
     class Config:
         json_encoders = {
@@ -139,7 +139,7 @@ class IncidentResponse(BaseModel):
     local_problema: Optional[str] = Field(None, description="Local do problema")
     incidente_vendas: bool = Field(..., description="Se é incidente de vendas")
     created_at: datetime = Field(..., description="Data de criação")
-    updated_at: datetime = Field(..., description="Data de atualização")
+    updated_at: Optional[datetime] = Field(None, description="Data de atualização")
     
     class Config:
         json_encoders = {
@@ -108,7 +108,7 @@ class UserResponse(BaseModel):
     grupo: str = Field(..., description="Grupo/função")
     ativo: bool = Field(..., description="Se está ativo")
     created_at: datetime = Field(..., description="Data de criação")
-    updated_at: datetime = Field(..., description="Data de atualização")
+    updated_at: Optional[datetime] = Field(None, description="Data de atualização")
     last_login: Optional[datetime] = Field(None, description="Último login")
     
     class Config:
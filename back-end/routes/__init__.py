@@ -5,6 +5,8 @@ from .incident_routes import incident_bp
 from .change_routes import change_bp
 from .user_routes import user_bp
 from .dashboard_routes import dashboard_bp
+from .legacy_routes import legacy_bp
+from .stream_routes import stream_bp
 
-__all__ = ['incident_bp', 'change_bp', 'user_bp', 'dashboard_bp']
+__all__ = ['incident_bp', 'change_bp', 'user_bp', 'dashboard_bp', 'legacy_bp', 'stream_bp']
 
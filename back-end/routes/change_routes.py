@@ -2,45 +2,59 @@
 Rotas para gerenciamento de changes
 """
 from flask import Blueprint, request, jsonify
-from services.change_service import ChangeService
-from models.change_model import ChangeCreate, ChangeUpdate
+from services.registry import change_service
+from models.change_model import ChangeCreate, ChangeUpdate, ChangeResponse
 from utils.error_handler import ErrorHandler, ValidationError, NotFoundError
 from utils.validators import Validators
+from utils.bulk import parse_bulk_items, parse_bulk_status, status_item, validate_bulk_items, merge_bulk_results, bulk_status_code
+from utils.export import parse_export_format, export_response
+from utils.pagination import decode_cursor, next_cursor_for, parse_count_mode, build_pagination
+from utils.conditional import conditional_get
 import logging
 
 # Criar blueprint
 change_bp = Blueprint('changes', __name__, url_prefix='/api/changes')
 
-# Instanciar serviço
-change_service = ChangeService()
+
+def change_filters_from_request():
+    """Filtros da listagem a partir da query string (compartilhados com /export)"""
+    filters = {}
+    
+    # Filtros de tipo
+    if request.args.get('tipo'):
+        filters['tipo'] = request.args.get('tipo')
+    
+    # Filtros de prioridade
+    if request.args.get('prioridade'):
+        filters['prioridade'] = request.args.get('prioridade')
+    
+    # Filtros de status
+    if request.args.get('status'):
+        filters['status'] = request.args.get('status')
+    
+    # Filtros de grupo
+    if request.args.get('grupo_responsavel'):
+        filters['grupo_responsavel'] = request.args.get('grupo_responsavel')
+    
+    # Filtros de impacto
+    if request.args.get('impacto'):
+        filters['impacto'] = request.args.get('impacto')
+    
+    return filters
+
+
+def change_versions():
+    """Validador da ETag das consultas: versão da coleção de changes"""
+    return [change_service.version.current()]
 
 
 @change_bp.route('/', methods=['GET'])
+@conditional_get(change_versions)
 def list_changes():
     """Lista changes com filtros opcionais"""
     try:
         # Extrair parâmetros de query
-        filters = {}
-        
-        # Filtros de tipo
-        if request.args.get('tipo'):
-            filters['tipo'] = request.args.get('tipo')
-        
-        # Filtros de prioridade
-        if request.args.get('prioridade'):
-            filters['prioridade'] = request.args.get('prioridade')
-        
-        # Filtros de status
-        if request.args.get('status'):
-            filters['status'] = request.args.get('status')
-        
-        # Filtros de grupo
-        if request.args.get('grupo_responsavel'):
-            filters['grupo_responsavel'] = request.args.get('grupo_responsavel')
-        
-        # Filtros de impacto
-        if request.args.get('impacto'):
-            filters['impacto'] = request.args.get('impacto')
+        filters = change_filters_from_request()
         
         # Parâmetros de paginação
         page = int(request.args.get('page', 1))
@@ -52,31 +66,89 @@ def list_changes():
         # Calcular skip
         skip = (page - 1) * per_page
         
-        # Buscar changes
-        changes = change_service.get_changes(filters, per_page, skip)
-        
-        # Contar total de changes
-        total = change_service.get_change_count(filters)
+        # Cursor opaco (keyset) tem precedência sobre a página
+        cursor = request.args.get('cursor')
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError as e:
+                raise ValidationError(str(e))
+        
+        # Modo de contagem do total: exact, estimated ou none
+        try:
+            count_mode = parse_count_mode(request.args.get('count'))
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
+        # Projeção opcional (fields=numero,titulo,...); id e created_at sempre vêm (cursor)
+        try:
+            fields = Validators.validate_fields(request.args.get('fields'), ChangeResponse.model_fields,
+                                                required=("id", "created_at"))
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
+        # Query montada uma única vez para a página e para o total
+        query = change_service.build_query(filters)
+        
+        # Buscar changes (um item extra indica se há próxima página)
+        changes = change_service.get_change_page(filters, per_page + 1, skip, after, query=query, fields=fields)
+        has_more = len(changes) > per_page
+        changes = changes[:per_page]
+        
+        # Contar total de changes conforme o modo solicitado
+        total = None
+        if count_mode != "none":
+            total = change_service.get_change_count(filters, count_mode, query=query)
         
         # Log da operação
         logging.info(f"Listadas {len(changes)} changes com filtros: {filters}")
         
         return jsonify({
-            "data": [change.dict() for change in changes],
-            "pagination": {
-                "page": page,
-                "per_page": per_page,
-                "total": total,
-                "pages": (total + per_page - 1) // per_page
-            },
+            "data": changes,
+            "pagination": build_pagination(
+                page, per_page, total, count_mode, has_more,
+                cursor, next_cursor_for(changes, has_more)
+            ),
             "filters": filters
         }), 200
         
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
     except Exception as e:
         logging.error(f"Erro ao listar changes: {str(e)}")
         return jsonify(ErrorHandler.handle_generic_error(e)), 500
 
 
+@change_bp.route('/export', methods=['GET'])
+def export_changes():
+    """Exporta os changes filtrados em NDJSON ou CSV, em streaming"""
+    try:
+        # Mesmos filtros da listagem
+        filters = change_filters_from_request()
+        
+        # Formato (ndjson ou csv) e colunas opcionais (fields=...)
+        try:
+            export_format = parse_export_format(request.args.get('format'))
+            fields = Validators.validate_fields(request.args.get('fields'), ChangeResponse.model_fields)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
+        # Linhas lidas do cursor em lotes à medida que a resposta é enviada
+        rows = change_service.iter_change_rows(filters, fields)
+        
+        # Log da operação
+        logging.info(f"Exportação de changes ({export_format}) com filtros: {filters}")
+        
+        return export_response(rows, export_format, change_service.response_columns(fields), "changes")
+        
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
+    except Exception as e:
+        logging.error(f"Erro ao exportar changes: {str(e)}")
+        return jsonify(ErrorHandler.handle_generic_error(e)), 500
+
+
 @change_bp.route('/', methods=['POST'])
 def create_change():
     """Cria uma nova change"""
@@ -109,7 +181,70 @@ def create_change():
         return jsonify(ErrorHandler.handle_generic_error(e)), 500
 
 
+@change_bp.route('/bulk', methods=['POST'])
+def create_changes_bulk():
+    """Cria changes em lote"""
+    try:
+        items = parse_bulk_items(request.get_json(silent=True))
+        
+        # Validar todos os itens em uma passada (número é opcional no lote)
+        results, valid = validate_bulk_items(items, lambda item: ChangeCreate(**{"numero": "", **item}))
+        
+        # Criar os itens válidos
+        written = change_service.create_changes_bulk([model for _, model in valid])
+        summary = merge_bulk_results(results, valid, written)
+        
+        # Log da operação
+        logging.info(f"Lote de changes processado: {summary['succeeded']} criadas, {summary['failed']} com erro")
+        
+        return jsonify({
+            "message": "Lote de changes processado",
+            "data": summary
+        }), bulk_status_code(summary, 201)
+        
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
+    except Exception as e:
+        logging.error(f"Erro ao criar changes em lote: {str(e)}")
+        return jsonify(ErrorHandler.handle_generic_error(e)), 500
+
+
+@change_bp.route('/bulk/status', methods=['PATCH'])
+def update_changes_status_bulk():
+    """Atualiza o status de changes em lote"""
+    try:
+        items = parse_bulk_status(request.get_json(silent=True))
+        
+        def build(item):
+            change_id, new_status = status_item(item)
+            if not Validators.is_valid_change_status(new_status):
+                raise ValueError(f"Status inválido: {new_status}")
+            return change_id, ChangeUpdate(status=new_status)
+        
+        # Validar todos os itens em uma passada
+        results, valid = validate_bulk_items(items, build)
+        
+        # Atualizar os itens válidos
+        written = change_service.update_changes_bulk([update for _, update in valid])
+        summary = merge_bulk_results(results, valid, written)
+        
+        # Log da operação
+        logging.info(f"Status de changes alterado em lote: {summary['succeeded']} atualizadas, {summary['failed']} com erro")
+        
+        return jsonify({
+            "message": "Lote de status processado",
+            "data": summary
+        }), bulk_status_code(summary)
+        
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
+    except Exception as e:
+        logging.error(f"Erro ao atualizar status de changes em lote: {str(e)}")
+        return jsonify(ErrorHandler.handle_generic_error(e)), 500
+
+
 @change_bp.route('/<change_id>', methods=['GET'])
+@conditional_get(change_versions)
 def get_change(change_id):
     """Busca uma change específica por ID"""
     try:
@@ -117,17 +252,23 @@ def get_change(change_id):
         if not Validators.is_valid_object_id(change_id):
             raise ValidationError("ID de change inválido")
         
+        # Projeção opcional (fields=...); id sempre vem
+        try:
+            fields = Validators.validate_fields(request.args.get('fields'), ChangeResponse.model_fields)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
         # Buscar change
-        change = change_service.get_change_by_id(change_id)
+        change = change_service.get_change_data(change_id, fields)
         
         if not change:
             raise NotFoundError("Change não encontrada")
         
         # Log da operação
-        logging.info(f"Change consultada: {change.numero}")
+        logging.info(f"Change consultada: {change.get('numero', change_id)}")
         
         return jsonify({
-            "data": change.dict()
+            "data": change
         }), 200
         
     except ValidationError as e:
@@ -367,17 +508,25 @@ def get_upcoming_changes():
         if days < 1 or days > 30:
             days = 7
         
+        # Projeção opcional (fields=...); id sempre vem
+        try:
+            fields = Validators.validate_fields(request.args.get('fields'), ChangeResponse.model_fields)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
         # Buscar changes programadas
-        changes = change_service.get_upcoming_changes(days)
+        changes = change_service.get_upcoming_changes(days, fields)
         
         # Log da operação
         logging.info(f"Consultadas {len(changes)} changes programadas para os próximos {days} dias")
         
         return jsonify({
-            "data": [change.dict() for change in changes],
+            "data": changes,
             "days": days
         }), 200
         
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
     except Exception as e:
         logging.error(f"Erro ao buscar changes programadas: {str(e)}")
         return jsonify(ErrorHandler.handle_generic_error(e)), 500
@@ -1,30 +1,119 @@
 """
 Rotas para o dashboard da aplicação
 """
+from datetime import datetime
 from flask import Blueprint, request, jsonify
-from services.incident_service import IncidentService
-from services.change_service import ChangeService
-from services.user_service import UserService
-from utils.error_handler import ErrorHandler
+from config import settings
+from extensions import get_db, get_mongo_client, is_using_mock_data
+from services.registry import incident_service, change_service, user_service
+from services.stats_cache import stats_cache
+from services.pool_metrics import pool_metrics
+from services.async_runtime import async_runtime
+from services.async_services import gather_dashboard_stats
+from services.dashboard_fanout import dashboard_fanout
+from services.events import change_feed, event_bus
+from services.indexes import unique_index_check
+from services.trends import TREND_GRANULARITIES, bucket_start, numpy
+from services.versions import current_versions
+from utils.error_handler import ErrorHandler, ValidationError
+from utils.conditional import conditional_get
 import logging
+import time
 
 # Criar blueprint
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 
-# Instanciar serviços
-incident_service = IncidentService()
-change_service = ChangeService()
-user_service = UserService()
+# Módulos com rollups de tendência
+TREND_SERVICES = {"incidentes": incident_service, "changes": change_service}
+
+
+def get_incident_stats():
+    """Snapshot compartilhado das estatísticas de incidentes"""
+    return stats_cache.get_or_compute("incidentes", incident_service.get_dashboard_stats)
+
+
+def get_change_stats():
+    """Snapshot compartilhado das estatísticas de changes"""
+    return stats_cache.get_or_compute("changes", change_service.get_dashboard_stats)
+
+
+def get_user_stats():
+    """Snapshot compartilhado das estatísticas de usuários"""
+    return stats_cache.get_or_compute("usuarios", user_service.get_dashboard_stats)
+
+
+def parse_trend_params():
+    """module, granularity, periods, window e dimension da query string de /trends"""
+    module = request.args.get('module', 'incidentes')
+    if module not in TREND_SERVICES:
+        raise ValidationError(f"module deve ser um dos seguintes: {', '.join(TREND_SERVICES)}")
+    
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in TREND_GRANULARITIES:
+        raise ValidationError(f"granularity deve ser um dos seguintes: {', '.join(TREND_GRANULARITIES)}")
+    
+    try:
+        periods = int(request.args.get('periods', 30))
+        window = int(request.args.get('window', 7))
+    except ValueError:
+        raise ValidationError("periods e window devem ser números inteiros")
+    if not 1 <= periods <= settings.TREND_MAX_PERIODS:
+        raise ValidationError(f"periods deve estar entre 1 e {settings.TREND_MAX_PERIODS}")
+    if not 1 <= window <= periods:
+        raise ValidationError("window deve estar entre 1 e periods")
+    
+    dimension = request.args.get('dimension') or None
+    dimensions = TREND_SERVICES[module].trends.dimensions
+    if dimension is not None and dimension not in dimensions:
+        raise ValidationError(f"dimension deve ser um dos seguintes: {', '.join(dimensions)}")
+    
+    return module, granularity, periods, window, dimension
+
+
+def module_versions(*modules):
+    """Validador da ETag: versões dos módulos (uma única consulta em stats_counters)"""
+    def validators():
+        return list(current_versions(get_db(), modules).values()) or None
+    return validators
+
+
+def trend_validators():
+    """Validador da ETag de /trends: versões e bucket atual (a janela avança com o tempo)"""
+    granularity = request.args.get('granularity', 'day')
+    versions = module_versions(*TREND_SERVICES)()
+    if versions is None:
+        return None
+    return [*versions, bucket_start(datetime.utcnow(), granularity).isoformat()]
+
+
+def daily_validators():
+    """Validador da ETag de /daily: última materialização do módulo e dia atual"""
+    service = TREND_SERVICES.get(request.args.get('module', 'incidentes'))
+    meta = service.daily_stats.read_meta() if service is not None else None
+    if meta is None:
+        return None
+    return [meta["atualizado_em"].isoformat(), datetime.utcnow().date().isoformat()]
+
+
+def get_all_stats():
+    """Estatísticas dos três módulos, consultadas em paralelo
+
+    Com o Motor disponível, via asyncio.gather no event loop do processo; sem ele,
+    em threads (DASHBOARD_FANOUT_THREADS).
+    """
+    if async_runtime.available():
+        return async_runtime.run(gather_dashboard_stats(async_runtime.database(), incident_service,
+                                                        change_service, user_service))
+    return tuple(dashboard_fanout.run([get_incident_stats, get_change_stats, get_user_stats]))
 
 
 @dashboard_bp.route('/overview', methods=['GET'])
+@conditional_get(module_versions('incidentes', 'changes', 'usuarios'))
 def get_dashboard_overview():
     """Retorna visão geral do dashboard"""
     try:
         # Buscar estatísticas de todos os módulos
-        incident_stats = incident_service.get_dashboard_stats()
-        change_stats = change_service.get_dashboard_stats()
-        user_stats = user_service.get_dashboard_stats()
+        incident_stats, change_stats, user_stats = get_all_stats()
         
         # Calcular métricas agregadas
         total_incidents = sum(incident_stats['prioridades'].values())
@@ -59,11 +148,12 @@ def get_dashboard_overview():
 
 
 @dashboard_bp.route('/incidentes', methods=['GET'])
+@conditional_get(module_versions('incidentes'))
 def get_incident_dashboard():
     """Retorna dashboard específico de incidentes"""
     try:
         # Buscar estatísticas de incidentes
-        stats = incident_service.get_dashboard_stats()
+        stats = get_incident_stats()
         
         # Calcular métricas adicionais
         total_incidents = sum(stats['prioridades'].values())
@@ -100,11 +190,12 @@ def get_incident_dashboard():
 
 
 @dashboard_bp.route('/changes', methods=['GET'])
+@conditional_get(module_versions('changes'))
 def get_change_dashboard():
     """Retorna dashboard específico de changes"""
     try:
         # Buscar estatísticas de changes
-        stats = change_service.get_dashboard_stats()
+        stats = get_change_stats()
         
         # Calcular métricas adicionais
         total_changes = stats['total_changes']
@@ -142,11 +233,12 @@ def get_change_dashboard():
 
 
 @dashboard_bp.route('/usuarios', methods=['GET'])
+@conditional_get(module_versions('usuarios'))
 def get_user_dashboard():
     """Retorna dashboard específico de usuários"""
     try:
         # Buscar estatísticas de usuários
-        stats = user_service.get_dashboard_stats()
+        stats = get_user_stats()
         
         # Calcular métricas adicionais
         total_users = stats['total_usuarios']
@@ -177,38 +269,92 @@ def get_user_dashboard():
 
 
 @dashboard_bp.route('/trends', methods=['GET'])
+@conditional_get(trend_validators)
 def get_dashboard_trends():
-    """Retorna tendências do dashboard (placeholder para futuras implementações)"""
+    """Retorna tendências de abertos, fechados e backlog a partir dos rollups por hora/dia"""
     try:
-        # TODO: Implementar análise de tendências
-        # Por enquanto, retorna dados básicos
+        module, granularity, periods, window, dimension = parse_trend_params()
+        
+        # Série pedida (com o detalhamento da dimensão) e o total do outro módulo para o resumo
+        trends = {}
+        for name, service in TREND_SERVICES.items():
+            trends[name] = service.get_trends(granularity, periods, window, dimension if name == module else None)
+        selected = trends[module]
         
         # Log da operação
-        logging.info("Tendências do dashboard consultadas")
+        logging.info(f"Tendências do dashboard consultadas: módulo={module}, {periods} x {granularity}")
         
         return jsonify({
             "data": {
-                "message": "Análise de tendências será implementada em versões futuras",
+                "module": module,
+                "granularity": granularity,
+                "periods": periods,
+                "window": window,
+                "dimension": dimension,
+                "engine": "numpy" if numpy is not None else "python",
+                "buckets": selected["buckets"],
+                "total": selected["total"],
+                "breakdown": selected["breakdown"],
                 "trends": {
-                    "incidents_trend": "stable",
-                    "changes_trend": "increasing",
-                    "users_trend": "stable"
+                    "incidents_trend": trends["incidentes"]["total"]["trend"],
+                    "changes_trend": trends["changes"]["total"]["trend"]
                 }
             }
         }), 200
         
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
     except Exception as e:
         logging.error(f"Erro ao buscar tendências: {str(e)}")
         return jsonify(ErrorHandler.handle_generic_error(e)), 500
 
 
+@dashboard_bp.route('/daily', methods=['GET'])
+@conditional_get(daily_validators)
+def get_dashboard_daily():
+    """Retorna abertos e fechados por dia e os pendentes, lidos das estatísticas materializadas"""
+    try:
+        # Mesmos módulos das tendências
+        module = request.args.get('module', 'incidentes')
+        if module not in TREND_SERVICES:
+            raise ValidationError(f"module deve ser um dos seguintes: {', '.join(TREND_SERVICES)}")
+        try:
+            days = int(request.args.get('days', 7))
+        except ValueError:
+            raise ValidationError("days deve ser um número inteiro")
+        if not 1 <= days <= settings.DAILY_STATS_MAX_DAYS:
+            raise ValidationError(f"days deve estar entre 1 e {settings.DAILY_STATS_MAX_DAYS}")
+        
+        daily = TREND_SERVICES[module].get_daily_stats(days)
+        
+        # Log da operação
+        logging.info(f"Estatísticas diárias do dashboard consultadas: módulo={module}, {days} dia(s)")
+        
+        return jsonify({
+            "data": {
+                "module": module,
+                "days": daily["dias"],
+                "pending": daily["pendentes"],
+                "refreshed_at": daily["atualizado_em"],
+                "refresh_seconds": settings.DAILY_STATS_REFRESH_SECONDS
+            }
+        }), 200
+        
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
+    except Exception as e:
+        logging.error(f"Erro ao buscar estatísticas diárias: {str(e)}")
+        return jsonify(ErrorHandler.handle_generic_error(e)), 500
+
+
 @dashboard_bp.route('/alerts', methods=['GET'])
+@conditional_get(module_versions('incidentes', 'changes'))
 def get_dashboard_alerts():
     """Retorna alertas do dashboard"""
     try:
         # Buscar estatísticas para gerar alertas
-        incident_stats = incident_service.get_dashboard_stats()
-        change_stats = change_service.get_dashboard_stats()
+        incident_stats = get_incident_stats()
+        change_stats = get_change_stats()
         
         alerts = []
         
@@ -258,6 +404,7 @@ def get_dashboard_alerts():
 
 
 @dashboard_bp.route('/metrics', methods=['GET'])
+@conditional_get(module_versions('incidentes', 'changes', 'usuarios'))
 def get_dashboard_metrics():
     """Retorna métricas específicas do dashboard"""
     try:
@@ -266,20 +413,12 @@ def get_dashboard_metrics():
         time_range = request.args.get('range', 'today')
         
         # Buscar métricas baseadas no tipo
-        if metric_type in ['all', 'incidents']:
-            incident_stats = incident_service.get_dashboard_stats()
+        if metric_type == 'all':
+            incident_stats, change_stats, user_stats = get_all_stats()
         else:
-            incident_stats = {}
-        
-        if metric_type in ['all', 'changes']:
-            change_stats = change_service.get_dashboard_stats()
-        else:
-            change_stats = {}
-        
-        if metric_type in ['all', 'users']:
-            user_stats = user_service.get_dashboard_stats()
-        else:
-            user_stats = {}
+            incident_stats = get_incident_stats() if metric_type == 'incidents' else {}
+            change_stats = get_change_stats() if metric_type == 'changes' else {}
+            user_stats = get_user_stats() if metric_type == 'users' else {}
         
         # Log da operação
         logging.info(f"Métricas do dashboard consultadas: tipo={metric_type}, período={time_range}")
@@ -299,19 +438,77 @@ def get_dashboard_metrics():
         return jsonify(ErrorHandler.handle_generic_error(e)), 500
 
 
+@dashboard_bp.route('/cache', methods=['GET'])
+@conditional_get()
+def get_dashboard_cache_stats():
+    """Retorna os contadores do cache de estatísticas"""
+    try:
+        # Log da operação
+        logging.info("Contadores do cache do dashboard consultados")
+        
+        return jsonify({
+            "data": stats_cache.stats()
+        }), 200
+        
+    except Exception as e:
+        logging.error(f"Erro ao buscar contadores do cache: {str(e)}")
+        return jsonify(ErrorHandler.handle_generic_error(e)), 500
+
+
 @dashboard_bp.route('/health', methods=['GET'])
+@conditional_get()
 def get_dashboard_health():
-    """Retorna status de saúde do sistema"""
+    """Retorna status de saúde do sistema, uso do pool de conexões do MongoDB e do canal de eventos"""
     try:
-        # Verificar conectividade com serviços
+        # Verificar conectividade com o banco
+        database = {"status": "unavailable", "latency_ms": None}
+        client = get_mongo_client()
+        if is_using_mock_data() and get_db() is not None:
+            # MongoDB indisponível, atendendo pelo banco em memória
+            database = {"status": "memory", "latency_ms": None}
+        elif client is not None:
+            try:
+                start = time.perf_counter()
+                client.admin.command('ping')
+                database = {"status": "operational", "latency_ms": round((time.perf_counter() - start) * 1000, 3)}
+            except Exception as e:
+                database = {"status": "unavailable", "latency_ms": None, "error": str(e)}
+        
+        # Sem os índices únicos, números e logins duplicados seriam aceitos
+        missing_indexes = {}
+        if database["status"] in ("operational", "memory"):
+            try:
+                missing_indexes = unique_index_check.missing(get_db())
+            except Exception as e:
+                logging.warning(f"⚠️ Aviso ao verificar índices únicos: {e}")
+        
+        operational = database["status"] == "operational"
+        serving = (operational or database["status"] == "memory") and not missing_indexes
+        module_status = "operational" if serving else "degraded"
         health_status = {
-            "status": "healthy",
-            "timestamp": "2024-01-01T00:00:00Z",
+            "status": "healthy" if operational and serving else "degraded" if serving else "unhealthy",
+            "timestamp": datetime.utcnow().isoformat() + "Z",
             "services": {
-                "incidents": "operational",
-                "changes": "operational",
-                "users": "operational",
-                "database": "operational"
+                "incidents": module_status,
+                "changes": module_status,
+                "users": module_status,
+                "database": database["status"]
+            },
+            "database": database,
+            "indexes": {
+                "missing_unique": missing_indexes
+            },
+            "pool": {
+                **pool_metrics.snapshot(),
+                "max_pool_size": settings.MONGODB_MAX_POOL_SIZE,
+                "async_max_pool_size": async_runtime.max_pool_size,
+                "min_pool_size": settings.MONGODB_MIN_POOL_SIZE,
+                "wait_queue_timeout_ms": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+            },
+            "stream": {
+                **event_bus.stats(),
+                "mode": change_feed.mode,
+                "max_clients": settings.STREAM_MAX_CLIENTS
             },
             "version": "1.0.0"
         }
@@ -321,7 +518,7 @@ def get_dashboard_health():
         
         return jsonify({
             "data": health_status
-        }), 200
+        }), 200 if serving else 503
         
     except Exception as e:
         logging.error(f"Erro ao verificar saúde do sistema: {str(e)}")
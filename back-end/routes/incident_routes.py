@@ -2,45 +2,59 @@
 Rotas para gerenciamento de incidentes
 """
 from flask import Blueprint, request, jsonify
-from services.incident_service import IncidentService
-from models.incident_model import IncidentCreate, IncidentUpdate
+from services.registry import incident_service
+from models.incident_model import IncidentCreate, IncidentUpdate, IncidentResponse
 from utils.error_handler import ErrorHandler, ValidationError, NotFoundError
 from utils.validators import Validators
+from utils.bulk import parse_bulk_items, parse_bulk_status, status_item, validate_bulk_items, merge_bulk_results, bulk_status_code
+from utils.export import parse_export_format, export_response
+from utils.pagination import decode_cursor, next_cursor_for, parse_count_mode, build_pagination
+from utils.conditional import conditional_get
 import logging
 
 # Criar blueprint
 incident_bp = Blueprint('incidents', __name__, url_prefix='/api/incidentes')
 
-# Instanciar serviço
-incident_service = IncidentService()
+
+def incident_filters_from_request():
+    """Filtros da listagem a partir da query string (compartilhados com /export)"""
+    filters = {}
+    
+    # Filtros de fila
+    if request.args.get('fila'):
+        filters['fila'] = request.args.get('fila')
+    
+    # Filtros de prioridade
+    if request.args.get('prioridade'):
+        filters['prioridade'] = request.args.get('prioridade')
+    
+    # Filtros de status
+    if request.args.get('status'):
+        filters['status'] = request.args.get('status')
+    
+    # Filtros de grupo
+    if request.args.get('grupo_designado'):
+        filters['grupo_designado'] = request.args.get('grupo_designado')
+    
+    # Filtros de responsável
+    if request.args.get('atribuido'):
+        filters['atribuido'] = request.args.get('atribuido')
+    
+    return filters
+
+
+def incident_versions():
+    """Validador da ETag das consultas: versão da coleção de incidentes"""
+    return [incident_service.version.current()]
 
 
 @incident_bp.route('/', methods=['GET'])
+@conditional_get(incident_versions)
 def list_incidents():
     """Lista incidentes com filtros opcionais"""
     try:
         # Extrair parâmetros de query
-        filters = {}
-        
-        # Filtros de fila
-        if request.args.get('fila'):
-            filters['fila'] = request.args.get('fila')
-        
-        # Filtros de prioridade
-        if request.args.get('prioridade'):
-            filters['prioridade'] = request.args.get('prioridade')
-        
-        # Filtros de status
-        if request.args.get('status'):
-            filters['status'] = request.args.get('status')
-        
-        # Filtros de grupo
-        if request.args.get('grupo_designado'):
-            filters['grupo_designado'] = request.args.get('grupo_designado')
-        
-        # Filtros de responsável
-        if request.args.get('atribuido'):
-            filters['atribuido'] = request.args.get('atribuido')
+        filters = incident_filters_from_request()
         
         # Parâmetros de paginação
         page = int(request.args.get('page', 1))
@@ -52,31 +66,89 @@ def list_incidents():
         # Calcular skip
         skip = (page - 1) * per_page
         
-        # Buscar incidentes
-        incidents = incident_service.get_incidents(filters, per_page, skip)
-        
-        # Contar total de incidentes
-        total = incident_service.get_incident_count(filters)
+        # Cursor opaco (keyset) tem precedência sobre a página
+        cursor = request.args.get('cursor')
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError as e:
+                raise ValidationError(str(e))
+        
+        # Modo de contagem do total: exact, estimated ou none
+        try:
+            count_mode = parse_count_mode(request.args.get('count'))
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
+        # Projeção opcional (fields=numero,titulo,...); id e created_at sempre vêm (cursor)
+        try:
+            fields = Validators.validate_fields(request.args.get('fields'), IncidentResponse.model_fields,
+                                                required=("id", "created_at"))
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
+        # Query montada uma única vez para a página e para o total
+        query = incident_service.build_query(filters)
+        
+        # Buscar incidentes (um item extra indica se há próxima página)
+        incidents = incident_service.get_incident_page(filters, per_page + 1, skip, after, query=query, fields=fields)
+        has_more = len(incidents) > per_page
+        incidents = incidents[:per_page]
+        
+        # Contar total de incidentes conforme o modo solicitado
+        total = None
+        if count_mode != "none":
+            total = incident_service.get_incident_count(filters, count_mode, query=query)
         
         # Log da operação
         logging.info(f"Listados {len(incidents)} incidentes com filtros: {filters}")
         
         return jsonify({
-            "data": [incident.dict() for incident in incidents],
-            "pagination": {
-                "page": page,
-                "per_page": per_page,
-                "total": total,
-                "pages": (total + per_page - 1) // per_page
-            },
+            "data": incidents,
+            "pagination": build_pagination(
+                page, per_page, total, count_mode, has_more,
+                cursor, next_cursor_for(incidents, has_more)
+            ),
             "filters": filters
         }), 200
         
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
     except Exception as e:
         logging.error(f"Erro ao listar incidentes: {str(e)}")
         return jsonify(ErrorHandler.handle_generic_error(e)), 500
 
 
+@incident_bp.route('/export', methods=['GET'])
+def export_incidents():
+    """Exporta os incidentes filtrados em NDJSON ou CSV, em streaming"""
+    try:
+        # Mesmos filtros da listagem
+        filters = incident_filters_from_request()
+        
+        # Formato (ndjson ou csv) e colunas opcionais (fields=...)
+        try:
+            export_format = parse_export_format(request.args.get('format'))
+            fields = Validators.validate_fields(request.args.get('fields'), IncidentResponse.model_fields)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
+        # Linhas lidas do cursor em lotes à medida que a resposta é enviada
+        rows = incident_service.iter_incident_rows(filters, fields)
+        
+        # Log da operação
+        logging.info(f"Exportação de incidentes ({export_format}) com filtros: {filters}")
+        
+        return export_response(rows, export_format, incident_service.response_columns(fields), "incidentes")
+        
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
+    except Exception as e:
+        logging.error(f"Erro ao exportar incidentes: {str(e)}")
+        return jsonify(ErrorHandler.handle_generic_error(e)), 500
+
+
 @incident_bp.route('/', methods=['POST'])
 def create_incident():
     """Cria um novo incidente"""
@@ -109,7 +181,70 @@ def create_incident():
         return jsonify(ErrorHandler.handle_generic_error(e)), 500
 
 
+@incident_bp.route('/bulk', methods=['POST'])
+def create_incidents_bulk():
+    """Cria incidentes em lote"""
+    try:
+        items = parse_bulk_items(request.get_json(silent=True))
+        
+        # Validar todos os itens em uma passada (número é opcional no lote)
+        results, valid = validate_bulk_items(items, lambda item: IncidentCreate(**{"numero": "", **item}))
+        
+        # Criar os itens válidos
+        written = incident_service.create_incidents_bulk([model for _, model in valid])
+        summary = merge_bulk_results(results, valid, written)
+        
+        # Log da operação
+        logging.info(f"Lote de incidentes processado: {summary['succeeded']} criados, {summary['failed']} com erro")
+        
+        return jsonify({
+            "message": "Lote de incidentes processado",
+            "data": summary
+        }), bulk_status_code(summary, 201)
+        
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
+    except Exception as e:
+        logging.error(f"Erro ao criar incidentes em lote: {str(e)}")
+        return jsonify(ErrorHandler.handle_generic_error(e)), 500
+
+
+@incident_bp.route('/bulk/status', methods=['PATCH'])
+def update_incidents_status_bulk():
+    """Atualiza o status de incidentes em lote"""
+    try:
+        items = parse_bulk_status(request.get_json(silent=True))
+        
+        def build(item):
+            incident_id, new_status = status_item(item)
+            if not Validators.is_valid_status(new_status):
+                raise ValueError(f"Status inválido: {new_status}")
+            return incident_id, IncidentUpdate(status=new_status)
+        
+        # Validar todos os itens em uma passada
+        results, valid = validate_bulk_items(items, build)
+        
+        # Atualizar os itens válidos
+        written = incident_service.update_incidents_bulk([update for _, update in valid])
+        summary = merge_bulk_results(results, valid, written)
+        
+        # Log da operação
+        logging.info(f"Status de incidentes alterado em lote: {summary['succeeded']} atualizados, {summary['failed']} com erro")
+        
+        return jsonify({
+            "message": "Lote de status processado",
+            "data": summary
+        }), bulk_status_code(summary)
+        
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
+    except Exception as e:
+        logging.error(f"Erro ao atualizar status de incidentes em lote: {str(e)}")
+        return jsonify(ErrorHandler.handle_generic_error(e)), 500
+
+
 @incident_bp.route('/<incident_id>', methods=['GET'])
+@conditional_get(incident_versions)
 def get_incident(incident_id):
     """Busca um incidente específico por ID"""
     try:
@@ -117,17 +252,23 @@ def get_incident(incident_id):
         if not Validators.is_valid_object_id(incident_id):
             raise ValidationError("ID de incidente inválido")
         
+        # Projeção opcional (fields=...); id sempre vem
+        try:
+            fields = Validators.validate_fields(request.args.get('fields'), IncidentResponse.model_fields)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
         # Buscar incidente
-        incident = incident_service.get_incident_by_id(incident_id)
+        incident = incident_service.get_incident_data(incident_id, fields)
         
         if not incident:
             raise NotFoundError("Incidente não encontrado")
         
         # Log da operação
-        logging.info(f"Incidente consultado: {incident.numero}")
+        logging.info(f"Incidente consultado: {incident.get('numero', incident_id)}")
         
         return jsonify({
-            "data": incident.dict()
+            "data": incident
         }), 200
         
     except ValidationError as e:
@@ -0,0 +1,323 @@
+"""
+Rotas legadas do front-end (/api/legacy/chamados, /api/legacy/changes e /api/legacy/dashboard)
+
+Mesmos caminhos relativos e formatos de resposta do antigo server.py,
+registradas por create_app sob /api/legacy: /changes/<id> e
+/dashboard/{incidentes,changes} também existem nas rotas novas com outros
+contratos. As escritas passam pelos serviços do registro: os documentos ganham
+created_at, updated_at e closed_at, e os contadores, as tendências e o cache do
+dashboard são atualizados como nas rotas novas.
+"""
+from flask import Blueprint, request, jsonify
+from bson import ObjectId
+from config import settings
+from services.registry import incident_service, change_service
+from services.stats_cache import stats_cache
+from services.incident_service import INCIDENT_CLOSED_STATUS
+from routes.chamado import ChamadoModel
+from pydantic import BaseModel, ValidationError
+from typing import Optional
+from utils.legacy_list import parse_legacy_list_args, legacy_page_response, legacy_stream_response
+from utils.pagination import decode_cursor, encode_cursor, keyset_filter
+
+legacy_bp = Blueprint("legacy", __name__, url_prefix="/api/legacy")
+
+class ChangeModel(BaseModel):
+    titulo: str
+    descricao: str
+    tipo: str  # manutencao, atualizacao, configuracao
+    prioridade: str  # baixa, media, alta, critica
+    status: str  # pendente, execucao, concluida, cancelada
+    data_programada: Optional[str] = None
+    responsavel: Optional[str] = None
+    sistema_afetado: Optional[str] = None
+    tempo_estimado: Optional[str] = None
+    observacoes: Optional[str] = None
+
+# Ordem da listagem: mais recentes primeiro, _id desempata (cursor estável)
+CHAMADOS_SORT = [("data_criacao", -1), ("_id", -1)]
+
+# Valores contados pelos dashboards legados
+LEGACY_FILAS = ("fila_p2k", "fila_crivo", "sg5_ura", "alarmes", "tsk_vendas", "sr", "rit")
+LEGACY_PRIORIDADES = ("critica", "alta", "media", "baixa")
+LEGACY_CHAMADO_STATUS = ("aberto", "fechado", "em_andamento", "em_espera", "tks_remoto")
+LEGACY_CHANGE_TIPOS = ("manutencao", "atualizacao", "configuracao")
+
+# Campos usados por serialize_chamado
+CHAMADO_PROJECTION = ["numero", "titulo", "descricao", "local_problema", "prioridade", "status",
+                      "incidente_vendas", "imagens", "data_criacao"]
+
+# Campos usados por serialize_change
+CHANGE_PROJECTION = ["numero", "titulo", "descricao", "tipo", "prioridade", "status", "data_programada",
+                     "responsavel", "sistema_afetado", "tempo_estimado", "observacoes", "data_criacao"]
+
+
+def legacy_collection(service):
+    """Coleção do serviço compartilhado; sem banco conectado, erro em vez de AttributeError"""
+    collection = service.collection
+    if collection is None:
+        raise Exception("Banco de dados indisponível")
+    return collection
+
+
+# Função para converter ObjectId em string e incluir todos os campos
+
+def serialize_chamado(chamado):
+    return {
+        "_id": str(chamado["_id"]),
+        "numero": chamado.get("numero"),
+        "titulo": chamado["titulo"],
+        "descricao": chamado["descricao"],
+        "local": chamado.get("local_problema"),
+        "prioridade": chamado.get("prioridade"),
+        "status": chamado.get("status"),
+        "incidente_vendas": chamado.get("incidente_vendas"),
+        "imagens": chamado.get("imagens", [])
+    }
+
+# Função para converter ObjectId em string
+def serialize_change(change):
+    return {
+        "_id": str(change["_id"]),
+        "numero": change.get("numero"),
+        "titulo": change["titulo"],
+        "descricao": change["descricao"],
+        "tipo": change.get("tipo"),
+        "prioridade": change.get("prioridade"),
+        "status": change.get("status"),
+        "data_programada": change.get("data_programada"),
+        "responsavel": change.get("responsavel"),
+        "sistema_afetado": change.get("sistema_afetado"),
+        "tempo_estimado": change.get("tempo_estimado"),
+        "observacoes": change.get("observacoes"),
+        "data_criacao": change.get("data_criacao")
+    }
+
+# Criar chamado
+@legacy_bp.route("/chamados", methods=["POST"])
+def criar_chamado():
+    try:
+        data = request.get_json() or {}
+        # Suportar alias 'local' vindo do frontend
+        if "local" in data and "local_problema" not in data:
+            data["local_problema"] = data["local"]
+        chamado_data = ChamadoModel(**data)
+
+        # Número sequencial inteiro gerado pelo serviço
+        chamado = incident_service.create_legacy_incident({
+            "titulo": chamado_data.titulo,
+            "descricao": chamado_data.descricao,
+            "local_problema": chamado_data.local_problema,
+            "prioridade": chamado_data.prioridade,
+            "status": chamado_data.status,
+            "incidente_vendas": chamado_data.incidente_vendas,
+            "imagens": chamado_data.imagens
+        })
+
+        return jsonify({"msg": "Chamado criado com sucesso!", "_id": str(chamado["_id"]), "numero": chamado["numero"]}), 201
+    except ValidationError as e:
+        return jsonify({"erro": e.errors()}), 400
+    except Exception as e:
+        return jsonify({"erro": str(e)}), 500
+
+# Listar chamados (array completo em blocos; com limit/cursor, paginado por cursor)
+@legacy_bp.route("/chamados", methods=["GET"])
+def listar_chamados():
+    try:
+        limit, cursor, stream = parse_legacy_list_args()
+        query = keyset_filter(decode_cursor(cursor), field="data_criacao") if cursor else {}
+        docs = legacy_collection(incident_service).find(query, CHAMADO_PROJECTION).sort(CHAMADOS_SORT)
+
+        if stream:
+            docs = docs.batch_size(settings.EXPORT_BATCH_SIZE)
+            return legacy_stream_response(serialize_chamado(c) for c in docs)
+
+        # Um item extra indica se há próxima página
+        docs = list(docs.limit(limit + 1))
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1].get("data_criacao"), docs[-1]["_id"])
+        return legacy_page_response([serialize_chamado(c) for c in docs], next_cursor)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    except Exception as e:
+        return jsonify({"erro": str(e)}), 500
+
+# Buscar chamado por ID
+@legacy_bp.route("/chamados/<id>", methods=["GET"])
+def buscar_chamado(id):
+    try:
+        chamado = legacy_collection(incident_service).find_one({"_id": ObjectId(id)})
+        if not chamado:
+            return jsonify({"erro": "Chamado não encontrado"}), 404
+        return jsonify(serialize_chamado(chamado))
+    except Exception as e:
+        return jsonify({"erro": "ID inválido ou erro interno"}), 400
+
+# Atualizar chamado
+@legacy_bp.route("/chamados/<id>", methods=["PUT"])
+def atualizar_chamado(id):
+    try:
+        data = request.get_json() or {}
+        # Suportar alias 'local'
+        if "local" in data and "local_problema" not in data:
+            data["local_problema"] = data["local"]
+        update_data = ChamadoModel(**data).dict(exclude_unset=True)
+
+        if incident_service.update_legacy_incident(id, update_data) is None:
+            return jsonify({"erro": "Chamado não encontrado"}), 404
+        return jsonify({"msg": "Chamado atualizado com sucesso!"})
+    except ValidationError as e:
+        return jsonify({"erro": e.errors()}), 400
+    except Exception as e:
+        return jsonify({"erro": "ID inválido ou erro interno"}), 400
+
+# Deletar chamado
+@legacy_bp.route("/chamados/<id>", methods=["DELETE"])
+def deletar_chamado(id):
+    try:
+        if not incident_service.delete_incident(id):
+            return jsonify({"erro": "Chamado não encontrado"}), 404
+        return jsonify({"msg": "Chamado deletado com sucesso!"})
+    except Exception as e:
+        return jsonify({"erro": "ID inválido ou erro interno"}), 400
+
+# Criar change
+@legacy_bp.route("/changes", methods=["POST"])
+def criar_change():
+    try:
+        data = request.get_json()
+        change_data = ChangeModel(**data)
+
+        # Número sequencial inteiro gerado pelo serviço
+        change = change_service.create_legacy_change({
+            "titulo": change_data.titulo,
+            "descricao": change_data.descricao,
+            "tipo": change_data.tipo,
+            "prioridade": change_data.prioridade,
+            "status": change_data.status,
+            "data_programada": change_data.data_programada,
+            "responsavel": change_data.responsavel,
+            "sistema_afetado": change_data.sistema_afetado,
+            "tempo_estimado": change_data.tempo_estimado,
+            "observacoes": change_data.observacoes
+        })
+
+        return jsonify({"msg": "Change criada com sucesso!", "_id": str(change["_id"]), "numero": change["numero"]}), 201
+    except ValidationError as e:
+        return jsonify({"erro": e.errors()}), 400
+    except Exception as e:
+        return jsonify({"erro": str(e)}), 500
+
+# Listar changes (array completo em blocos; com limit/cursor, paginado por cursor)
+@legacy_bp.route("/changes", methods=["GET"])
+def listar_changes():
+    try:
+        limit, cursor, stream = parse_legacy_list_args()
+        # Ordem de inserção (_id crescente), como a listagem original sem sort
+        query = {"_id": {"$gt": decode_cursor(cursor)[1]}} if cursor else {}
+        docs = legacy_collection(change_service).find(query, CHANGE_PROJECTION).sort("_id", 1)
+
+        if stream:
+            docs = docs.batch_size(settings.EXPORT_BATCH_SIZE)
+            return legacy_stream_response(serialize_change(c) for c in docs)
+
+        # Um item extra indica se há próxima página
+        docs = list(docs.limit(limit + 1))
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(None, docs[-1]["_id"])
+        return legacy_page_response([serialize_change(c) for c in docs], next_cursor)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    except Exception as e:
+        return jsonify({"erro": str(e)}), 500
+
+# Buscar change por ID
+@legacy_bp.route("/changes/<id>", methods=["GET"])
+def buscar_change(id):
+    try:
+        change = legacy_collection(change_service).find_one({"_id": ObjectId(id)})
+        if not change:
+            return jsonify({"erro": "Change não encontrada"}), 404
+        return jsonify(serialize_change(change))
+    except Exception as e:
+        return jsonify({"erro": "ID inválido ou erro interno"}), 400
+
+# Atualizar change
+@legacy_bp.route("/changes/<id>", methods=["PUT"])
+def atualizar_change(id):
+    try:
+        data = request.get_json()
+        update_data = ChangeModel(**data).dict(exclude_unset=True)
+
+        if change_service.update_legacy_change(id, update_data) is None:
+            return jsonify({"erro": "Change não encontrada"}), 404
+        return jsonify({"msg": "Change atualizada com sucesso!"})
+    except ValidationError as e:
+        return jsonify({"erro": e.errors()}), 400
+    except Exception as e:
+        return jsonify({"erro": "ID inválido ou erro interno"}), 400
+
+# Deletar change
+@legacy_bp.route("/changes/<id>", methods=["DELETE"])
+def deletar_change(id):
+    try:
+        if not change_service.delete_change(id):
+            return jsonify({"erro": "Change não encontrada"}), 404
+        return jsonify({"msg": "Change deletada com sucesso!"})
+    except Exception as e:
+        return jsonify({"erro": "ID inválido ou erro interno"}), 400
+
+# Rotas para o Dashboard (snapshots de stats_counters compartilhados com /api/dashboard)
+@legacy_bp.route("/dashboard/incidentes", methods=["GET"])
+def get_incidentes_data():
+    try:
+        stats = stats_cache.get_or_compute("incidentes", incident_service.get_dashboard_stats)
+
+        return jsonify({
+            "incidentes_vendas": stats["incidentes_vendas"],
+            "filas": {fila: stats["filas"].get(fila, 0) for fila in LEGACY_FILAS},
+            "prioridades": {prioridade: stats["prioridades"].get(prioridade, 0) for prioridade in LEGACY_PRIORIDADES},
+            "status": {valor: stats["status"].get(valor, 0) for valor in LEGACY_CHAMADO_STATUS}
+        })
+    except Exception as e:
+        return jsonify({"erro": str(e)}), 500
+
+# Contagens da coleção changes; changes_execucao inclui em_execucao, das rotas novas
+@legacy_bp.route("/dashboard/changes", methods=["GET"])
+def get_changes_dashboard():
+    try:
+        stats = stats_cache.get_or_compute("changes", change_service.get_dashboard_stats)
+
+        return jsonify({
+            "changes_pendentes": stats["changes_pendentes"],
+            "changes_execucao": stats["changes_execucao"],
+            "changes_concluidas": stats["changes_concluidas"],
+            "changes_canceladas": stats["changes_canceladas"],
+            "tipos": {tipo: stats["tipos"].get(tipo, 0) for tipo in LEGACY_CHANGE_TIPOS},
+            "prioridades": {prioridade: stats["prioridades"].get(prioridade, 0) for prioridade in LEGACY_PRIORIDADES}
+        })
+    except Exception as e:
+        return jsonify({"erro": str(e)}), 500
+
+# Controle diário dos chamados: abertos e fechados do dia (UTC) lidos de daily_stats,
+# fechamentos pelo closed_at; pendentes dos contadores mantidos em stats_counters
+@legacy_bp.route("/dashboard/controle", methods=["GET"])
+def get_controle_data():
+    try:
+        daily = incident_service.get_daily_stats(1)
+        hoje = daily["dias"][-1]
+        stats = stats_cache.get_or_compute("incidentes", incident_service.get_dashboard_stats)
+        pendentes = sum(total for status, total in stats["status"].items() if status not in INCIDENT_CLOSED_STATUS)
+
+        return jsonify({
+            "abertos_hoje": hoje["abertos"],
+            "fechados_hoje": hoje["fechados"],
+            "pendentes": pendentes,
+            "atualizado_em": daily["atualizado_em"]
+        })
+    except Exception as e:
+        return jsonify({"erro": str(e)}), 500
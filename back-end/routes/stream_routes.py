@@ -0,0 +1,82 @@
+"""
+Canal Server-Sent Events com as escritas de incidentes e changes
+
+GET /api/stream?modules=incidentes,changes mantém a conexão aberta e envia:
+- ready: modo da origem dos eventos (change_stream, reconnecting ou local)
+- incidentes / changes: operação, id e documento no formato da API
+- stats: variações (e valores atuais) das estatísticas do dashboard
+- reset: eventos foram descartados (fila do cliente cheia ou perdidos na
+  reconexão do change stream); recarregue os dados
+
+Cada conexão ocupa uma thread do worker enquanto estiver aberta
+(STREAM_MAX_CLIENTS por processo, somadas às WEB_THREADS no gunicorn.conf.py).
+"""
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from config import settings
+from extensions import get_db
+from services.registry import incident_service, change_service
+from services.events import change_feed, event_bus
+from utils.error_handler import ErrorHandler, ValidationError
+import logging
+
+# Criar blueprint
+stream_bp = Blueprint('stream', __name__, url_prefix='/api')
+
+# Módulos publicados no canal
+STREAM_SERVICES = {"incidentes": incident_service, "changes": change_service}
+
+
+def format_event(event_id: int, event_type: str, data) -> str:
+    """Mensagem SSE (id, event e data em uma linha JSON)"""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {current_app.json.dumps(data)}\n\n"
+
+
+@stream_bp.route('/stream', methods=['GET'])
+def stream_events():
+    """Envia por SSE os eventos de escrita e as variações das estatísticas"""
+    try:
+        modules = [module for module in request.args.get('modules', ','.join(STREAM_SERVICES)).split(',') if module]
+        invalid = [module for module in modules if module not in STREAM_SERVICES]
+        if invalid or not modules:
+            raise ValidationError(f"modules deve conter: {', '.join(STREAM_SERVICES)}")
+
+        # Um único change stream por processo, aberto com o primeiro assinante
+        change_feed.start(get_db, STREAM_SERVICES, settings.STREAM_CHANGE_STREAMS_ENABLED,
+                          settings.STREAM_RETRY_SECONDS)
+
+        subscription = event_bus.subscribe(modules)
+        if subscription is None:
+            return jsonify({
+                "error": "Limite de conexões atingido",
+                "message": f"Máximo de {settings.STREAM_MAX_CLIENTS} conexões de stream por processo",
+                "type": "stream_limit"
+            }), 503
+
+        logging.info(f"Stream de eventos aberto: módulos={','.join(modules)}, modo={change_feed.mode}")
+
+        def generate():
+            try:
+                # Intervalo de reconexão do EventSource após uma queda
+                yield f"retry: {int(settings.STREAM_RETRY_SECONDS * 1000)}\n\n"
+                yield format_event(0, "ready", {"mode": change_feed.mode, "modules": modules})
+                while True:
+                    event = subscription.get(settings.STREAM_HEARTBEAT_SECONDS)
+                    if event is not None:
+                        yield format_event(*event)
+                    else:
+                        # Comentário SSE: mantém proxies abertos e detecta clientes desconectados
+                        yield ": keep-alive\n\n"
+            finally:
+                event_bus.unsubscribe(subscription)
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
+    except Exception as e:
+        logging.error(f"Erro ao abrir stream de eventos: {str(e)}")
+        return jsonify(ErrorHandler.handle_generic_error(e)), 500
@@ -2,18 +2,16 @@
 Rotas para gerenciamento de usuários
 """
 from flask import Blueprint, request, jsonify
-from services.user_service import UserService
-from models.user_model import UserCreate, UserUpdate, UserLogin
+from services.registry import user_service
+from models.user_model import UserCreate, UserUpdate, UserLogin, UserResponse
 from utils.error_handler import ErrorHandler, ValidationError, NotFoundError
 from utils.validators import Validators
+from utils.pagination import decode_cursor, next_cursor_for, parse_count_mode, build_pagination
 import logging
 
 # Criar blueprint
 user_bp = Blueprint('users', __name__, url_prefix='/api/usuarios')
 
-# Instanciar serviço
-user_service = UserService()
-
 
 @user_bp.route('/', methods=['GET'])
 def list_users():
@@ -47,26 +45,55 @@ def list_users():
         # Calcular skip
         skip = (page - 1) * per_page
         
-        # Buscar usuários
-        users = user_service.get_users(filters, per_page, skip)
-        
-        # Contar total de usuários
-        total = user_service.get_user_count(filters)
+        # Cursor opaco (keyset) tem precedência sobre a página
+        cursor = request.args.get('cursor')
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError as e:
+                raise ValidationError(str(e))
+        
+        # Modo de contagem do total: exact, estimated ou none
+        try:
+            count_mode = parse_count_mode(request.args.get('count'))
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
+        # Projeção opcional (fields=username,grupo,...); id e created_at sempre vêm (cursor)
+        try:
+            fields = Validators.validate_fields(request.args.get('fields'), UserResponse.model_fields,
+                                                required=("id", "created_at"))
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
+        # Query montada uma única vez para a página e para o total
+        query = user_service.build_query(filters)
+        
+        # Buscar usuários (um item extra indica se há próxima página)
+        users = user_service.get_user_page(filters, per_page + 1, skip, after, query=query, fields=fields)
+        has_more = len(users) > per_page
+        users = users[:per_page]
+        
+        # Contar total de usuários conforme o modo solicitado
+        total = None
+        if count_mode != "none":
+            total = user_service.get_user_count(filters, count_mode, query=query)
         
         # Log da operação
         logging.info(f"Listados {len(users)} usuários com filtros: {filters}")
         
         return jsonify({
-            "data": [user.dict() for user in users],
-            "pagination": {
-                "page": page,
-                "per_page": per_page,
-                "total": total,
-                "pages": (total + per_page - 1) // per_page
-            },
+            "data": users,
+            "pagination": build_pagination(
+                page, per_page, total, count_mode, has_more,
+                cursor, next_cursor_for(users, has_more)
+            ),
             "filters": filters
         }), 200
         
+    except ValidationError as e:
+        return jsonify(ErrorHandler.handle_validation_error(e)), 400
     except Exception as e:
         logging.error(f"Erro ao listar usuários: {str(e)}")
         return jsonify(ErrorHandler.handle_generic_error(e)), 500
@@ -112,17 +139,23 @@ def get_user(user_id):
         if not Validators.is_valid_object_id(user_id):
             raise ValidationError("ID de usuário inválido")
         
+        # Projeção opcional (fields=...); id sempre vem
+        try:
+            fields = Validators.validate_fields(request.args.get('fields'), UserResponse.model_fields)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        
         # Buscar usuário
-        user = user_service.get_user_by_id(user_id)
+        user = user_service.get_user_data(user_id, fields)
         
         if not user:
             raise NotFoundError("Usuário não encontrado")
         
         # Log da operação
-        logging.info(f"Usuário consultado: {user.username}")
+        logging.info(f"Usuário consultado: {user.get('username', user_id)}")
         
         return jsonify({
-            "data": user.dict()
+            "data": user
         }), 200
         
     except ValidationError as e:
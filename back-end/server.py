@@ -1,25 +1,13 @@
-from flask import Flask
-from flask_cors import CORS
-from config import init_app
-from routes.chamados import chamados_bp
-from routes.changes import changes_bp
+"""
+Ponto de entrada antigo, mantido por compatibilidade
 
-
-def create_app():
-    app = Flask(__name__)
-    init_app(app)
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
-
-    app.register_blueprint(chamados_bp, url_prefix="/api")
-    app.register_blueprint(changes_bp, url_prefix="/api")
-
-    @app.get("/api/health")
-    def health_check():
-        return {"status": "ok"}
-
-    return app
+As rotas legadas do front-end (/api/legacy/chamados, /api/legacy/changes e
+/api/legacy/dashboard) são servidas pela aplicação principal
+(routes/legacy_routes.py), no mesmo processo e pool do MongoDB. Este módulo
+apenas delega para app.py.
+"""
+from app import create_app, main
 
 
 if __name__ == "__main__":
-    app = create_app()
-    app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
+    main()
@@ -0,0 +1,90 @@
+"""
+Event loop dedicado para o driver assíncrono do MongoDB (Motor)
+
+As rotas do Flask continuam síncronas: as corrotinas são submetidas a um único
+event loop que roda em uma thread própria por processo, onde vive o cliente
+Motor. O cliente tem um pool pequeno (ASYNC_MONGODB_MAX_POOL_SIZE) e registra o
+mesmo listener de métricas do cliente síncrono, então as conexões dos dois
+aparecem juntas em /api/dashboard/health. Sem o pacote motor instalado, ou
+servindo pelo banco em memória, as rotas usam os serviços síncronos.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Optional
+from config import settings
+from services.pool_metrics import pool_metrics
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:
+    AsyncIOMotorClient = None
+
+
+class AsyncRuntime:
+    """Event loop em thread própria com um cliente Motor criado sob demanda
+
+    O loop e o cliente só são criados na primeira utilização, portanto cada
+    worker do gunicorn cria os seus depois do fork.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client = None
+
+    def available(self) -> bool:
+        """Indica se o caminho assíncrono pode ser usado (Motor instalado e MongoDB conectado)"""
+        from extensions import get_db, is_using_mock_data
+        if not settings.ASYNC_DASHBOARD_ENABLED or AsyncIOMotorClient is None:
+            return False
+        return get_db() is not None and not is_using_mock_data()
+
+    @property
+    def max_pool_size(self) -> int:
+        """Conexões máximas do cliente Motor (0 enquanto ele não foi criado)"""
+        return settings.ASYNC_MONGODB_MAX_POOL_SIZE if self._client is not None else 0
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Retorna o event loop, iniciando a thread na primeira chamada"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="async-runtime", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coroutine: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Executa a corrotina no loop dedicado e aguarda o resultado"""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop())
+        return future.result(timeout if timeout is not None else settings.ASYNC_TIMEOUT_SECONDS)
+
+    def database(self):
+        """Banco de dados no cliente Motor (criado no próprio loop na primeira chamada)"""
+        if self._client is None:
+            async def create_client():
+                if self._client is None:
+                    options = {
+                        **settings.mongo_client_options(),
+                        "maxPoolSize": settings.ASYNC_MONGODB_MAX_POOL_SIZE,
+                        "minPoolSize": 0
+                    }
+                    self._client = AsyncIOMotorClient(settings.MONGODB_URI, event_listeners=[pool_metrics], **options)
+            self.run(create_client())
+        return self._client[settings.MONGODB_DB]
+
+    def close(self) -> None:
+        """Fecha o cliente Motor e encerra o loop"""
+        with self._lock:
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop = self._thread = self._client = None
+        if loop is None:
+            return
+        if client is not None:
+            loop.call_soon_threadsafe(client.close)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+
+# Instância global por processo
+async_runtime = AsyncRuntime()
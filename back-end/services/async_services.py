@@ -0,0 +1,93 @@
+"""
+Variantes assíncronas (Motor/asyncio) dos serviços, usadas pelo dashboard
+
+Leem os contadores de stats_counters pelo cliente Motor, o que permite consultar
+os módulos em paralelo com asyncio.gather. Enquanto os contadores de um módulo
+não existem, a leitura passa ao serviço síncrono, que os reconstrói e grava
+(com o fallback da agregação); os snapshots são os mesmos do stats_cache.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from services.stats_cache import stats_cache
+from services.stats_counters import STATS_COUNTERS_COLLECTION, counters_from_document
+
+
+class AsyncStatsService:
+    """Leitura assíncrona das estatísticas de um módulo
+
+    `rebuild` é o get_dashboard_stats do serviço síncrono, executado fora do
+    event loop quando o documento de contadores ainda não foi construído.
+    """
+
+    module_key = ""
+
+    def __init__(self, db, rebuild: Callable[[], Dict[str, Any]]):
+        self.counters = db[STATS_COUNTERS_COLLECTION]
+        self.rebuild = rebuild
+
+    async def get_dashboard_stats(self) -> Dict[str, Any]:
+        """Estatísticas do dashboard a partir dos contadores incrementais"""
+        try:
+            stats = counters_from_document(await self.counters.find_one({"_id": self.module_key}))
+            if stats is None:
+                stats = await asyncio.get_running_loop().run_in_executor(None, self.rebuild)
+            return stats
+
+        except Exception as e:
+            raise Exception(f"Erro ao buscar estatísticas: {str(e)}")
+
+
+class AsyncIncidentService(AsyncStatsService):
+    """Serviço assíncrono de incidentes"""
+
+    module_key = "incidentes"
+
+
+class AsyncChangeService(AsyncStatsService):
+    """Serviço assíncrono de changes"""
+
+    module_key = "changes"
+
+
+class AsyncUserService(AsyncStatsService):
+    """Serviço assíncrono de usuários"""
+
+    module_key = "usuarios"
+
+
+# Recomputações em andamento no event loop, por chave do cache
+_inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+
+async def cached_stats(key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """Equivalente assíncrono de stats_cache.get_or_compute
+
+    Compartilha os snapshots com o caminho síncrono; requisições concorrentes
+    no mesmo event loop aguardam uma única leitura.
+    """
+    found, value, generation = stats_cache.peek(key)
+    if found:
+        return value
+
+    task = _inflight.get(key)
+    if task is not None:
+        return await asyncio.shield(task)
+
+    task = asyncio.ensure_future(compute())
+    _inflight[key] = task
+    try:
+        value = await task
+    finally:
+        _inflight.pop(key, None)
+    stats_cache.store(key, value, generation)
+    return value
+
+
+async def gather_dashboard_stats(db, incident_service, change_service,
+                                 user_service) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Estatísticas de incidentes, changes e usuários consultadas em paralelo"""
+    return tuple(await asyncio.gather(
+        cached_stats("incidentes", AsyncIncidentService(db, incident_service.get_dashboard_stats).get_dashboard_stats),
+        cached_stats("changes", AsyncChangeService(db, change_service.get_dashboard_stats).get_dashboard_stats),
+        cached_stats("usuarios", AsyncUserService(db, user_service.get_dashboard_stats).get_dashboard_stats)
+    ))
@@ -0,0 +1,40 @@
+"""
+Escritas em lote não ordenadas com erros por item
+"""
+from typing import Any, Dict, List
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+
+
+# Código de erro do MongoDB para violação de índice único
+DUPLICATE_KEY_ERROR = 11000
+
+
+def write_errors_by_index(error: BulkWriteError) -> Dict[int, Dict[str, Any]]:
+    """Erros de um BulkWriteError indexados pela posição da operação no lote"""
+    return {item["index"]: item for item in error.details.get("writeErrors", [])}
+
+
+def insert_many_unordered(collection: Collection, documents: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """Insere todos os documentos possíveis e retorna os erros por posição
+
+    Os documentos recebem o _id no próprio dicionário, inclusive os que falharem.
+    """
+    if not documents:
+        return {}
+    try:
+        collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        return write_errors_by_index(e)
+    return {}
+
+
+def bulk_write_unordered(collection: Collection, operations: List[Any]) -> Dict[int, Dict[str, Any]]:
+    """Executa as operações sem parar no primeiro erro e retorna os erros por posição"""
+    if not operations:
+        return {}
+    try:
+        collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        return write_errors_by_index(e)
+    return {}
@@ -2,90 +2,235 @@
 Serviço de Changes - Lógica de negócio
 """
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Sequence, Iterator, Iterable
 from bson import ObjectId
-from pymongo.collection import Collection
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
 from pymongo.database import Database
-from extensions import get_db
+from pymongo.errors import DuplicateKeyError
+from utils.pagination import KeysetPosition
+from services.repository import PRIORIDADE_FILTER_MAP, FieldFilter, QueryTranslator, Repository, response_projection
+from services.stats_counters import StatsCounters
+from services.versions import CollectionVersion
+from services.trends import TrendRollups
+from services.daily_stats import DailyStats, stamp_closed_at, status_update
+from services.events import WriteEvents, change_feed
+from services.bulk import DUPLICATE_KEY_ERROR, insert_many_unordered, bulk_write_unordered
+from services.sequence import get_sequence_generator, max_integer_value, max_numeric_suffix
+from config import settings
 from models.change_model import ChangeCreate, ChangeUpdate, ChangeModel, ChangeResponse
 
 
-class ChangeService:
+# Chave do dashboard correspondente a cada status de change
+DASHBOARD_STATUS_KEYS = {
+    "pendente": "changes_pendentes",
+    "aprovada": "changes_aprovadas",
+    "em_execucao": "changes_execucao",
+    # Status de execução gravado pelas rotas legadas
+    "execucao": "changes_execucao",
+    "concluida": "changes_concluidas",
+    "cancelada": "changes_canceladas"
+}
+DASHBOARD_TIPOS = ["manutencao", "atualizacao", "configuracao", "migracao", "correcao"]
+DASHBOARD_PRIORIDADES = ["critica", "alta", "media", "baixa"]
+
+# Campos necessários para calcular as estatísticas do dashboard
+DASHBOARD_PROJECTION = {"_id": 0, "status": 1, "tipo": 1, "prioridade": 1}
+
+# Tendências: dimensões dos rollups (nome -> campo) e status que tiram o item do backlog
+CHANGE_TREND_DIMENSIONS = {"tipos": "tipo", "prioridades": "prioridade", "grupos": "grupo_responsavel"}
+CHANGE_CLOSED_STATUS = ("concluida", "cancelada")
+
+# Campos lidos antes de uma escrita para manter contadores e tendências
+TRACKED_PROJECTION = {**DASHBOARD_PROJECTION, **{field: 1 for field in CHANGE_TREND_DIMENSIONS.values()}}
+
+# Índices da coleção changes, alinhados aos filtros da listagem e às changes programadas
+CHANGE_INDEXES = [
+    IndexModel([("numero", ASCENDING)], unique=True),
+    IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("tipo", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("grupo_responsavel", ASCENDING), ("status", ASCENDING)]),
+    IndexModel([("status", ASCENDING), ("data_programada", ASCENDING)]),
+    # Aberturas (legado) e fechamentos do período na materialização de daily_stats
+    IndexModel([("data_criacao", DESCENDING)]),
+    IndexModel([("closed_at", DESCENDING)])
+]
+
+# Tradução dos filtros da listagem (valores da API -> valores gravados)
+STATUS_FILTER_MAP = {
+    "Pendente": "pendente",
+    "Aprovada": "aprovada",
+    "Em execução": "em_execucao",
+    "Concluída": "concluida",
+    "Cancelada": "cancelada"
+}
+IMPACTO_FILTER_MAP = {
+    "Baixo": "baixo",
+    "Médio": "medio",
+    "Alto": "alto",
+    "Crítico": "critico"
+}
+CHANGE_FILTERS = QueryTranslator({
+    "tipo": FieldFilter("tipo", convert=str.lower),
+    "prioridade": FieldFilter("prioridade", PRIORIDADE_FILTER_MAP),
+    "status": FieldFilter("status", STATUS_FILTER_MAP),
+    "grupo_responsavel": FieldFilter("grupo_responsavel"),
+    "impacto": FieldFilter("impacto", IMPACTO_FILTER_MAP)
+})
+
+# Campos da resposta da listagem, na ordem do modelo ChangeResponse
+CHANGE_RESPONSE_FIELDS = ("numero", "titulo", "descricao", "tipo", "prioridade", "status", "data_programada", "grupo_responsavel", "impacto", "created_at", "updated_at")
+CHANGE_RESPONSE_PROJECTION = response_projection(CHANGE_RESPONSE_FIELDS)
+
+
+def empty_dashboard_stats() -> Dict[str, Any]:
+    """Retorna a estrutura de estatísticas com todos os buckets zerados"""
+    return {
+        **{key: 0 for key in DASHBOARD_STATUS_KEYS.values()},
+        "total_changes": 0,
+        "tipos": {tipo: 0 for tipo in DASHBOARD_TIPOS},
+        "prioridades": {prioridade: 0 for prioridade in DASHBOARD_PRIORIDADES}
+    }
+
+
+def change_stat_buckets(change: Dict[str, Any]) -> Dict[str, int]:
+    """Buckets do dashboard aos quais uma change pertence"""
+    buckets = {"total_changes": 1}
+    if change.get("status") in DASHBOARD_STATUS_KEYS:
+        buckets[DASHBOARD_STATUS_KEYS[change["status"]]] = 1
+    if change.get("tipo") in DASHBOARD_TIPOS:
+        buckets[f"tipos.{change['tipo']}"] = 1
+    if change.get("prioridade") in DASHBOARD_PRIORIDADES:
+        buckets[f"prioridades.{change['prioridade']}"] = 1
+    return buckets
+
+
+def dashboard_stats_from_documents(changes: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Soma os buckets de cada change (mesma regra dos incrementos em stats_counters)"""
+    stats = empty_dashboard_stats()
+    for change in changes:
+        for path, value in change_stat_buckets(change).items():
+            section, _, key = path.partition(".")
+            if key:
+                stats[section][key] += value
+            else:
+                stats[section] += value
+    return stats
+
+
+def change_to_dict(change: Dict[str, Any]) -> Dict[str, Any]:
+    """Equivalente a change_to_response(...).dict(), sem validação do Pydantic
+
+    Changes criadas pelas rotas legadas (/api/changes) não têm grupo_responsavel
+    nem impacto, e as mais antigas nem created_at: esses campos saem None.
+    """
+    return {
+        "id": str(change["_id"]),
+        "numero": change.get("numero"),
+        "titulo": change.get("titulo"),
+        "descricao": change.get("descricao"),
+        "tipo": change.get("tipo"),
+        "prioridade": change.get("prioridade"),
+        "status": change.get("status"),
+        "data_programada": change.get("data_programada"),
+        "grupo_responsavel": change.get("grupo_responsavel"),
+        "impacto": change.get("impacto"),
+        "created_at": change.get("created_at"),
+        "updated_at": change.get("updated_at")
+    }
+
+
+def change_to_response(change: Dict[str, Any]) -> ChangeResponse:
+    """Converte um documento de change em resposta da API"""
+    return ChangeResponse(
+        id=str(change["_id"]),
+        numero=change["numero"],
+        titulo=change["titulo"],
+        descricao=change["descricao"],
+        tipo=change["tipo"],
+        prioridade=change["prioridade"],
+        status=change["status"],
+        data_programada=change.get("data_programada"),
+        grupo_responsavel=change["grupo_responsavel"],
+        impacto=change["impacto"],
+        created_at=change["created_at"],
+        updated_at=change.get("updated_at")
+    )
+
+
+class ChangeService(Repository):
     """Serviço para gerenciar changes"""
     
-    def __init__(self):
-        self.db: Database = get_db()
-        if self.db is not None:
-            self.collection: Collection = self.db.changes
-        else:
-            self.collection = None
+    collection_name = "changes"
+    module_key = "changes"
+    query_translator = CHANGE_FILTERS
+    document_to_dict = staticmethod(change_to_dict)
+    default_projection = CHANGE_RESPONSE_PROJECTION
+    
+    def __init__(self, db: Optional[Database] = None):
+        super().__init__(db)
+        self.counters = StatsCounters(self.db, "changes", change_stat_buckets, self.compute_dashboard_stats)
+        self.trends = TrendRollups(self.db, "changes", self.collection, CHANGE_TREND_DIMENSIONS, CHANGE_CLOSED_STATUS)
+        self.daily_stats = DailyStats(self.db, "changes", self.collection, CHANGE_CLOSED_STATUS)
+        self.events = WriteEvents(change_feed, "changes", change_to_dict)
+        self.version = CollectionVersion(self.db, "changes")
+        self.sequences = get_sequence_generator(self.db, settings.SEQUENCE_BLOCK_SIZE) if self.db is not None else None
+    
+    def _number_seed(self) -> int:
+        """Maior número CHG- existente, usado como semente da sequência"""
+        return max_numeric_suffix(self.collection, "CHG")
     
     def _generate_next_number(self) -> str:
-        """Gera o próximo número sequencial de change"""
+        """Gera o próximo número sequencial de change (ex: 1 -> CHG-001)"""
+        next_num = self.sequences.next_value("changes", seed=self._number_seed)
+        return f"CHG-{next_num:03d}"
+    
+    def _insert_numbered(self, document: Dict[str, Any], generated: bool) -> None:
+        """insert_one; se o número gerado já existe, ressincroniza a sequência e tenta outro
+
+        A sequência fica atrás dos dados quando números são gravados fora da API
+        (importações, shell) ou o contador é apagado depois de semeado.
+        """
         try:
-            # Buscar a última change ordenada por número
-            last_change = self.collection.find_one(
-                sort=[("numero", -1)]
-            )
-            
-            if last_change and "numero" in last_change:
-                # Extrair número da última change (ex: CHG-001 -> 1)
-                last_num = last_change["numero"]
-                if "-" in last_num:
-                    last_num = last_num.split("-")[-1]
-                
-                try:
-                    next_num = int(last_num) + 1
-                except ValueError:
-                    next_num = 1
-            else:
-                next_num = 1
-            
-            # Formatar número (ex: 1 -> CHG-001)
-            return f"CHG-{next_num:03d}"
-            
-        except Exception as e:
-            print(f"Erro ao gerar número da change: {e}")
-            return f"CHG-{int(datetime.now().timestamp())}"
+            self.collection.insert_one(document)
+        except DuplicateKeyError:
+            if not generated:
+                raise
+            self.sequences.resync("changes", self._number_seed)
+            document["numero"] = self._generate_next_number()
+            self.collection.insert_one(document)
+    
+    def _insert_document(self, document: Dict[str, Any], generated: bool) -> None:
+        """Grava uma change já montada: datas, closed_at, inserção e efeitos colaterais"""
+        document["created_at"] = datetime.utcnow()
+        document["updated_at"] = None
+        stamp_closed_at(document, CHANGE_CLOSED_STATUS)
+        
+        # Inserir no banco (o índice único de número rejeita duplicatas)
+        try:
+            self._insert_numbered(document, generated)
+        except DuplicateKeyError:
+            raise ValueError(f"Change com número {document['numero']} já existe")
+        
+        self._after_write("insert", None, document)
     
     def create_change(self, change_data: ChangeCreate) -> ChangeResponse:
         """Cria uma nova change"""
         try:
             # Gerar número único se não fornecido
-            if not change_data.numero:
+            generated = not change_data.numero
+            if generated:
                 change_data.numero = self._generate_next_number()
             
-            # Verificar se número já existe
-            if self.collection.find_one({"numero": change_data.numero}):
-                raise ValueError(f"Change com número {change_data.numero} já existe")
-            
             # Preparar dados para inserção
             change_dict = change_data.dict()
-            change_dict["created_at"] = datetime.utcnow()
-            change_dict["updated_at"] = None
-            
-            # Inserir no banco
-            result = self.collection.insert_one(change_dict)
-            
-            # Buscar change criada
-            created_change = self.collection.find_one({"_id": result.inserted_id})
-            
-            # Converter para resposta
-            return ChangeResponse(
-                id=str(created_change["_id"]),
-                numero=created_change["numero"],
-                titulo=created_change["titulo"],
-                descricao=created_change["descricao"],
-                tipo=created_change["tipo"],
-                prioridade=created_change["prioridade"],
-                status=created_change["status"],
-                data_programada=created_change.get("data_programada"),
-                grupo_responsavel=created_change["grupo_responsavel"],
-                impacto=created_change["impacto"],
-                created_at=created_change["created_at"],
-                updated_at=created_change.get("updated_at")
-            )
+            self._insert_document(change_dict, generated)
+            
+            # Converter para resposta (insert_one preenche o _id no próprio dicionário)
+            return change_to_response(change_dict)
             
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Erro ao criar change: {str(e)}")
     
@@ -100,116 +245,115 @@ class ChangeService:
             if not change:
                 return None
             
-            return ChangeResponse(
-                id=str(change["_id"]),
-                numero=change["numero"],
-                titulo=change["titulo"],
-                descricao=change["descricao"],
-                tipo=change["tipo"],
-                prioridade=change["prioridade"],
-                status=change["status"],
-                data_programada=change.get("data_programada"),
-                grupo_responsavel=change["grupo_responsavel"],
-                impacto=change["impacto"],
-                created_at=change["created_at"],
-                updated_at=change.get("updated_at")
-            )
+            return change_to_response(change)
             
         except Exception as e:
             raise Exception(f"Erro ao buscar change: {str(e)}")
     
     def get_changes(self, filters: Optional[Dict[str, Any]] = None, 
-                   limit: int = 100, skip: int = 0) -> List[ChangeResponse]:
-        """Lista changes com filtros opcionais"""
+                   limit: int = 100, skip: int = 0,
+                   after: Optional[KeysetPosition] = None,
+                   query: Optional[Dict[str, Any]] = None) -> List[ChangeResponse]:
+        """Lista changes com filtros opcionais (ou com a query já montada por build_query)"""
         try:
-            # Construir query de filtros
-            query = {}
-            
-            if filters:
-                if "tipo" in filters:
-                    query["tipo"] = filters["tipo"].lower()
-                
-                if "prioridade" in filters:
-                    prioridade_map = {
-                        "Crítico": "critica",
-                        "Alto": "alta",
-                        "Moderado": "media"
-                    }
-                    if filters["prioridade"] in prioridade_map:
-                        query["prioridade"] = prioridade_map[filters["prioridade"]]
-                
-                if "status" in filters:
-                    status_map = {
-                        "Pendente": "pendente",
-                        "Aprovada": "aprovada",
-                        "Em execução": "em_execucao",
-                        "Concluída": "concluida",
-                        "Cancelada": "cancelada"
-                    }
-                    if filters["status"] in status_map:
-                        query["status"] = status_map[filters["status"]]
-                
-                if "grupo_responsavel" in filters:
-                    query["grupo_responsavel"] = filters["grupo_responsavel"]
-                
-                if "impacto" in filters:
-                    impacto_map = {
-                        "Baixo": "baixo",
-                        "Médio": "medio",
-                        "Alto": "alto",
-                        "Crítico": "critico"
-                    }
-                    if filters["impacto"] in impacto_map:
-                        query["impacto"] = impacto_map[filters["impacto"]]
-            
-            # Executar query
-            cursor = self.collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
+            cursor = self.find_page(self.resolve_query(filters, query), limit, skip, after)
             
             # Converter para lista de respostas
-            changes = []
-            for change in cursor:
-                changes.append(ChangeResponse(
-                    id=str(change["_id"]),
-                    numero=change["numero"],
-                    titulo=change["titulo"],
-                    descricao=change["descricao"],
-                    tipo=change["tipo"],
-                    prioridade=change["prioridade"],
-                    status=change["status"],
-                    data_programada=change.get("data_programada"),
-                    grupo_responsavel=change["grupo_responsavel"],
-                    impacto=change["impacto"],
-                    created_at=change["created_at"],
-                    updated_at=change.get("updated_at")
-                ))
-            
-            return changes
+            return [change_to_response(change) for change in cursor]
             
         except Exception as e:
             raise Exception(f"Erro ao listar changes: {str(e)}")
     
-    def update_change(self, change_id: str, update_data: ChangeUpdate) -> Optional[ChangeResponse]:
-        """Atualiza uma change existente"""
+    def get_change_page(self, filters: Optional[Dict[str, Any]] = None,
+                        limit: int = 100, skip: int = 0,
+                        after: Optional[KeysetPosition] = None,
+                        query: Optional[Dict[str, Any]] = None,
+                        fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Lista changes já como dicionários da resposta (todos os campos de ChangeResponse ou os de fields)"""
+        try:
+            return self.find_page_rows(self.resolve_query(filters, query), limit, skip, after, fields)
+            
+        except Exception as e:
+            raise Exception(f"Erro ao listar changes: {str(e)}")
+    
+    def iter_change_rows(self, filters: Optional[Dict[str, Any]] = None,
+                         fields: Optional[Sequence[str]] = None,
+                         query: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Percorre todos os changes dos filtros em lotes do cursor (exportação em streaming)"""
+        return self.iter_rows(self.resolve_query(filters, query), fields, settings.EXPORT_BATCH_SIZE)
+    
+    def get_change_data(self, change_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Busca change por ID já como dicionário da resposta (completo ou só com fields)"""
         try:
             if not ObjectId.is_valid(change_id):
                 raise ValueError("ID de change inválido")
             
-            # Preparar dados para atualização
-            update_dict = update_data.dict(exclude_unset=True)
-            update_dict["updated_at"] = datetime.utcnow()
+            return self.find_row_by_id(ObjectId(change_id), fields)
             
-            # Atualizar no banco
-            result = self.collection.update_one(
-                {"_id": ObjectId(change_id)},
-                {"$set": update_dict}
-            )
+        except Exception as e:
+            raise Exception(f"Erro ao buscar change: {str(e)}")
+    
+    def _update_document(self, change_id: str, update_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Aplica o $set com updated_at e closed_at; retorna o documento atualizado (None se não existe)"""
+        if not ObjectId.is_valid(change_id):
+            raise ValueError("ID de change inválido")
+        
+        update_dict["updated_at"] = datetime.utcnow()
+        
+        # Atualizar no banco em uma única ida: a versão anterior alimenta os
+        # contadores e a resposta é a versão anterior com o $set aplicado
+        previous = self.collection.find_one_and_update(
+            {"_id": ObjectId(change_id)},
+            status_update(update_dict, CHANGE_CLOSED_STATUS, update_dict["updated_at"]),
+            return_document=ReturnDocument.BEFORE
+        )
+        
+        if previous is None:
+            return None
+        
+        updated = {**previous, **update_dict}
+        self._after_write("update", previous, updated)
+        return updated
+    
+    def update_change(self, change_id: str, update_data: ChangeUpdate) -> Optional[ChangeResponse]:
+        """Atualiza uma change existente"""
+        try:
+            # Preparar dados para atualização
+            updated = self._update_document(change_id, update_data.dict(exclude_unset=True))
             
-            if result.matched_count == 0:
+            if updated is None:
                 return None
             
-            # Buscar change atualizada
-            return self.get_change_by_id(change_id)
+            return change_to_response(updated)
+            
+        except ValueError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro ao atualizar change: {str(e)}")
+    
+    def create_legacy_change(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Cria uma change no formato legado: número inteiro da sequência changes_legacy e data_criacao local"""
+        try:
+            document["numero"] = self.sequences.next_value(
+                "changes_legacy",
+                seed=lambda: max_integer_value(self.collection)
+            )
+            document["data_criacao"] = datetime.now()
+            self._insert_document(document, generated=False)
+            return document
+            
+        except ValueError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro ao criar change: {str(e)}")
+    
+    def update_legacy_change(self, change_id: str, update_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Atualiza uma change com os campos do modelo legado"""
+        try:
+            return self._update_document(change_id, update_dict)
             
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Erro ao atualizar change: {str(e)}")
     
@@ -219,32 +363,181 @@ class ChangeService:
             if not ObjectId.is_valid(change_id):
                 raise ValueError("ID de change inválido")
             
-            result = self.collection.delete_one({"_id": ObjectId(change_id)})
+            deleted = self.collection.find_one_and_delete(
+                {"_id": ObjectId(change_id)},
+                projection={**TRACKED_PROJECTION, "_id": 1}
+            )
+            
+            if deleted is None:
+                return False
             
-            return result.deleted_count > 0
+            self._after_write("delete", deleted, None)
+            
+            return True
             
         except Exception as e:
             raise Exception(f"Erro ao deletar change: {str(e)}")
     
-    def get_dashboard_stats(self) -> Dict[str, Any]:
-        """Retorna estatísticas para o dashboard"""
+    def create_changes_bulk(self, items: List[ChangeCreate]) -> List[Dict[str, Any]]:
+        """Cria changes em lote com um único insert_many não ordenado
+
+        Os números ausentes são reservados em bloco. Retorna, na ordem dos itens,
+        {"success": True, "id": ..., "numero": ...} ou {"success": False, "error": ...}.
+        """
         try:
-            stats = {
-                "changes_pendentes": self.collection.count_documents({"status": "pendente"}),
-                "changes_aprovadas": self.collection.count_documents({"status": "aprovada"}),
-                "changes_execucao": self.collection.count_documents({"status": "em_execucao"}),
-                "changes_concluidas": self.collection.count_documents({"status": "concluida"}),
-                "changes_canceladas": self.collection.count_documents({"status": "cancelada"}),
-                "total_changes": self.collection.count_documents({})
+            # Reservar de uma vez os números dos itens que não informaram um
+            pending = [index for index, item in enumerate(items) if not item.numero]
+            if pending:
+                numbers = self.sequences.reserve("changes", len(pending), seed=self._number_seed)
+                for index, number in zip(pending, numbers):
+                    items[index].numero = f"CHG-{number:03d}"
+            
+            # Preparar documentos
+            now = datetime.utcnow()
+            documents = []
+            for item in items:
+                document = item.dict()
+                document["created_at"] = now
+                document["updated_at"] = None
+                stamp_closed_at(document, CHANGE_CLOSED_STATUS)
+                documents.append(document)
+            
+            # Inserir no banco (falhas individuais não interrompem o lote)
+            errors = insert_many_unordered(self.collection, documents)
+            
+            # Números gerados que já existiam: ressincronizar a sequência e reinserir uma vez
+            retry = [index for index in pending if errors.get(index, {}).get("code") == DUPLICATE_KEY_ERROR]
+            if retry:
+                self.sequences.resync("changes", self._number_seed)
+                numbers = self.sequences.reserve("changes", len(retry), seed=self._number_seed)
+                for index, number in zip(retry, numbers):
+                    documents[index]["numero"] = f"CHG-{number:03d}"
+                    del errors[index]
+                retried = insert_many_unordered(self.collection, [documents[index] for index in retry])
+                errors.update((retry[position], error) for position, error in retried.items())
+            
+            inserted = [document for index, document in enumerate(documents) if index not in errors]
+            if inserted:
+                created = [(None, document) for document in inserted]
+                self._after_write_batch("insert", created)
+            
+            results = []
+            for index, document in enumerate(documents):
+                if index in errors:
+                    error = errors[index]
+                    if error.get("code") == DUPLICATE_KEY_ERROR:
+                        message = f"Change com número {document['numero']} já existe"
+                    else:
+                        message = error.get("errmsg", "Erro ao inserir")
+                    results.append({"success": False, "error": message})
+                else:
+                    results.append({"success": True, "id": str(document["_id"]), "numero": document["numero"]})
+            
+            return results
+            
+        except Exception as e:
+            raise Exception(f"Erro ao criar changes em lote: {str(e)}")
+    
+    def update_changes_bulk(self, updates: List[Tuple[str, ChangeUpdate]]) -> List[Dict[str, Any]]:
+        """Atualiza changes em lote com um único bulk_write não ordenado
+
+        Os buckets anteriores são lidos em uma única consulta para manter os
+        contadores; escritas concorrentes nesse intervalo podem gerar drift,
+        corrigido por `manage.py reconcile-stats`.
+        """
+        try:
+            results: List[Optional[Dict[str, Any]]] = [None] * len(updates)
+            
+            # Validar IDs (cada registro só pode aparecer uma vez no lote)
+            targets: Dict[int, ObjectId] = {}
+            seen = set()
+            for index, (change_id, _) in enumerate(updates):
+                if not ObjectId.is_valid(change_id):
+                    results[index] = {"success": False, "error": "ID de change inválido"}
+                elif change_id in seen:
+                    results[index] = {"success": False, "error": "Change repetida no lote"}
+                else:
+                    seen.add(change_id)
+                    targets[index] = ObjectId(change_id)
+            
+            # Buscar a versão anterior de todos os registros de uma vez
+            previous = {
+                document["_id"]: document
+                for document in self.collection.find(
+                    {"_id": {"$in": list(targets.values())}},
+                    {**TRACKED_PROJECTION, "_id": 1}
+                )
             }
             
-            return stats
+            now = datetime.utcnow()
+            operations = []
+            pending = []
+            for index, object_id in targets.items():
+                if object_id not in previous:
+                    results[index] = {"success": False, "error": "Change não encontrada"}
+                    continue
+                update_dict = updates[index][1].dict(exclude_unset=True)
+                update_dict["updated_at"] = now
+                operations.append(UpdateOne({"_id": object_id}, status_update(update_dict, CHANGE_CLOSED_STATUS, now)))
+                pending.append((index, object_id, update_dict))
+            
+            errors = bulk_write_unordered(self.collection, operations)
+            
+            applied = []
+            for position, (index, object_id, update_dict) in enumerate(pending):
+                if position in errors:
+                    results[index] = {"success": False, "error": errors[position].get("errmsg", "Erro ao atualizar")}
+                    continue
+                before = previous[object_id]
+                applied.append((before, {**before, **update_dict}))
+                results[index] = {"success": True, "id": str(object_id)}
+            
+            if applied:
+                self._after_write_batch("update", applied)
+            
+            return results
+            
+        except Exception as e:
+            raise Exception(f"Erro ao atualizar changes em lote: {str(e)}")
+    
+    def get_dashboard_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas para o dashboard a partir dos contadores incrementais"""
+        try:
+            return self.counters.get()
+            
+        except Exception as e:
+            raise Exception(f"Erro ao buscar estatísticas: {str(e)}")
+    
+    def get_trends(self, granularity: str, periods: int, window: int,
+                   dimension: Optional[str] = None) -> Dict[str, Any]:
+        """Séries de abertos, fechados e backlog lidas dos rollups de tendência"""
+        try:
+            return self.trends.series(granularity, periods, window, settings.TREND_STABLE_PERCENT, dimension)
+            
+        except Exception as e:
+            raise Exception(f"Erro ao buscar tendências: {str(e)}")
+    
+    def get_daily_stats(self, days: int) -> Dict[str, Any]:
+        """Abertos e fechados dos últimos dias e pendentes, lidos de daily_stats"""
+        try:
+            return self.daily_stats.read_days(days)
+            
+        except Exception as e:
+            raise Exception(f"Erro ao buscar estatísticas diárias: {str(e)}")
+    
+    def compute_dashboard_stats(self) -> Dict[str, Any]:
+        """Recalcula as estatísticas do dashboard varrendo a coleção"""
+        try:
+            # Uma passada com projeção calcula status, tipos e prioridades juntos
+            cursor = self.collection.find({}, DASHBOARD_PROJECTION, batch_size=5000)
+            return dashboard_stats_from_documents(cursor)
             
         except Exception as e:
             raise Exception(f"Erro ao buscar estatísticas: {str(e)}")
     
-    def get_upcoming_changes(self, days: int = 7) -> List[ChangeResponse]:
-        """Retorna changes programadas para os próximos dias"""
+    def get_upcoming_changes(self, days: int = 7,
+                             fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Retorna changes programadas para os próximos dias (dicionários da resposta)"""
         try:
             from datetime import timedelta
             
@@ -259,61 +552,18 @@ class ChangeService:
                 "status": {"$in": ["aprovada", "em_execucao"]}
             }
             
-            cursor = self.collection.find(query).sort("data_programada", 1)
-            
-            changes = []
-            for change in cursor:
-                changes.append(ChangeResponse(
-                    id=str(change["_id"]),
-                    numero=change["numero"],
-                    titulo=change["titulo"],
-                    descricao=change["descricao"],
-                    tipo=change["tipo"],
-                    prioridade=change["prioridade"],
-                    status=change["status"],
-                    data_programada=change.get("data_programada"),
-                    grupo_responsavel=change["grupo_responsavel"],
-                    impacto=change["impacto"],
-                    created_at=change["created_at"],
-                    updated_at=change.get("updated_at")
-                ))
-            
-            return changes
+            cursor = self.collection.find(query, self.projection_for(fields)).sort("data_programada", 1)
+            
+            return self.to_rows(cursor, fields)
             
         except Exception as e:
             raise Exception(f"Erro ao buscar changes programadas: {str(e)}")
     
-    def get_change_count(self, filters: Optional[Dict[str, Any]] = None) -> int:
-        """Retorna o total de changes com filtros"""
+    def get_change_count(self, filters: Optional[Dict[str, Any]] = None, mode: str = "exact",
+                         query: Optional[Dict[str, Any]] = None) -> int:
+        """Retorna o total de changes com os mesmos filtros da listagem"""
         try:
-            query = {}
-            
-            if filters:
-                # Aplicar os mesmos filtros da busca
-                if "tipo" in filters:
-                    query["tipo"] = filters["tipo"].lower()
-                
-                if "prioridade" in filters:
-                    prioridade_map = {
-                        "Crítico": "critica",
-                        "Alto": "alta",
-                        "Moderado": "media"
-                    }
-                    if filters["prioridade"] in prioridade_map:
-                        query["prioridade"] = prioridade_map[filters["prioridade"]]
-                
-                if "status" in filters:
-                    status_map = {
-                        "Pendente": "pendente",
-                        "Aprovada": "aprovada",
-                        "Em execução": "em_execucao",
-                        "Concluída": "concluida",
-                        "Cancelada": "cancelada"
-                    }
-                    if filters["status"] in status_map:
-                        query["status"] = status_map[filters["status"]]
-            
-            return self.collection.count_documents(query)
+            return self.count(self.resolve_query(filters, query), mode)
             
         except Exception as e:
             raise Exception(f"Erro ao contar changes: {str(e)}")
@@ -0,0 +1,328 @@
+"""
+Estatísticas diárias materializadas (abertos, fechados e pendentes por dia)
+
+Um pipeline com $merge grava na coleção daily_stats um documento por módulo e
+dia (UTC), com as aberturas (created_at, ou data_criacao no legado) e os
+fechamentos do dia (closed_at; nos documentos fechados antes de closed_at
+existir, updated_at ou, sem ele, a data de abertura). Os pendentes são o retrato do backlog no
+momento da atualização, gravados no documento do dia atual. As rotas leem
+apenas os documentos dos dias pedidos (por _id); a atualização é feita por
+uma thread agendada (DAILY_STATS_REFRESH_SECONDS) ou por
+`manage.py refresh-daily-stats`, recalculando só os dias desde a anterior.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+
+DAILY_STATS_COLLECTION = "daily_stats"
+
+# Documentos por lote do cursor no cálculo em Python
+FALLBACK_BATCH_SIZE = 5000
+
+# Início da primeira materialização (ou de uma recomputação completa)
+EPOCH = datetime(1970, 1, 1)
+
+# Validade da reserva de uma atualização agendada; expira se o worker morrer no meio
+REFRESH_LEASE_SECONDS = 300
+
+
+def day_start(moment: datetime) -> datetime:
+    """Meia-noite (UTC) do dia que contém o instante"""
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def day_id(key: str, day: datetime) -> str:
+    """_id do documento diário (ex: incidentes:2024-01-02)"""
+    return f"{key}:{day:%Y-%m-%d}"
+
+
+def stamp_closed_at(document: Dict[str, Any], closed_status: Sequence[str]) -> None:
+    """Documento criado já fechado: closed_at igual à data de abertura"""
+    if document.get("status") in closed_status:
+        document["closed_at"] = document.get("created_at") or document.get("data_criacao")
+
+
+def status_update(update_dict: Dict[str, Any], closed_status: Sequence[str], now: datetime) -> Dict[str, Any]:
+    """Documento de atualização com o $set e a marcação de closed_at
+
+    Ao entrar em um status de fechamento, closed_at recebe o instante atual com
+    $min (fechado -> fechado mantém a data original); ao voltar para um status
+    aberto, closed_at é removido. Sem status no $set, closed_at não muda.
+    """
+    update: Dict[str, Any] = {"$set": update_dict}
+    if "status" in update_dict:
+        if update_dict["status"] in closed_status:
+            update["$min"] = {"closed_at": now}
+        else:
+            update["$unset"] = {"closed_at": ""}
+    return update
+
+
+def window_filter(since: datetime, closed_status: Sequence[str]) -> Dict[str, Any]:
+    """Documentos com abertura ou fechamento a partir de `since`"""
+    return {"$or": [
+        {"created_at": {"$gte": since}},
+        {"data_criacao": {"$gte": since}},
+        {"closed_at": {"$gte": since}},
+        # Fechados sem closed_at (gravados antes da marcação): fechamento em updated_at
+        {"closed_at": None, "status": {"$in": list(closed_status)}, "updated_at": {"$gte": since}}
+    ]}
+
+
+def closed_moment(document: Dict[str, Any], closed_status: Sequence[str]) -> Optional[datetime]:
+    """Instante do fechamento: closed_at ou, nos fechados sem ele, updated_at ou a abertura"""
+    if document.get("closed_at") is not None:
+        return document["closed_at"]
+    if document.get("status") not in closed_status:
+        return None
+    return document.get("updated_at") or document.get("created_at") or document.get("data_criacao")
+
+
+def build_daily_pipeline(key: str, since: datetime, refreshed_at: datetime,
+                         closed_status: Sequence[str] = ()) -> List[Dict[str, Any]]:
+    """Aberturas e fechamentos por dia a partir de `since`, mesclados em daily_stats"""
+    def day_of(field: Any) -> Dict[str, Any]:
+        return {"$dateToString": {"format": "%Y-%m-%d", "date": field}}
+
+    opened = {"$ifNull": ["$created_at", "$data_criacao"]}
+    closed = {"$ifNull": ["$closed_at", {"$cond": [
+        {"$in": ["$status", list(closed_status)]},
+        {"$ifNull": ["$updated_at", opened]},
+        None
+    ]}]}
+    return [
+        {"$match": window_filter(since, closed_status)},
+        # Cada documento gera um evento de abertura e um de fechamento; eventos
+        # sem data (item aberto) ou anteriores a `since` são descartados
+        {"$project": {"_id": 0, "eventos": [
+            {"dia": day_of(opened), "fluxo": "abertos"},
+            {"dia": day_of(closed), "fluxo": "fechados"}
+        ]}},
+        {"$unwind": "$eventos"},
+        {"$match": {"eventos.dia": {"$gte": f"{since:%Y-%m-%d}"}}},
+        {"$group": {
+            "_id": "$eventos.dia",
+            "abertos": {"$sum": {"$cond": [{"$eq": ["$eventos.fluxo", "abertos"]}, 1, 0]}},
+            "fechados": {"$sum": {"$cond": [{"$eq": ["$eventos.fluxo", "fechados"]}, 1, 0]}}
+        }},
+        {"$project": {
+            "_id": {"$concat": [f"{key}:", "$_id"]},
+            "chave": {"$literal": key},
+            "inicio": {"$dateFromString": {"dateString": "$_id", "format": "%Y-%m-%d"}},
+            "abertos": 1,
+            "fechados": 1,
+            "atualizado_em": {"$literal": refreshed_at}
+        }},
+        {"$merge": {"into": DAILY_STATS_COLLECTION, "on": "_id",
+                    "whenMatched": "merge", "whenNotMatched": "insert"}}
+    ]
+
+
+def daily_counts_from_documents(documents: Iterable[Dict[str, Any]], since: datetime,
+                                closed_status: Sequence[str] = ()) -> Dict[datetime, Counter]:
+    """Mesmas contagens do pipeline, calculadas em Python"""
+    days: Dict[datetime, Counter] = {}
+    for document in documents:
+        opened_at = document.get("created_at") or document.get("data_criacao")
+        closed_at = closed_moment(document, closed_status)
+        for flow, moment in (("abertos", opened_at), ("fechados", closed_at)):
+            if isinstance(moment, datetime) and moment >= since:
+                days.setdefault(day_start(moment), Counter())[flow] += 1
+    return days
+
+
+class DailyStats:
+    """Documentos diários de um módulo em daily_stats, materializados a partir da coleção de origem
+
+    O documento {"_id": "<chave>:meta"} guarda o instante da última atualização
+    e os pendentes nesse momento, além da reserva da atualização agendada em
+    andamento (reservado_ate).
+    """
+
+    def __init__(self, db: Optional[Database], key: str, source: Optional[Collection],
+                 closed_status: Sequence[str]):
+        self.collection = db[DAILY_STATS_COLLECTION] if db is not None else None
+        self.key = key
+        self.source = source
+        self.closed_status = tuple(closed_status)
+
+    @property
+    def meta_id(self) -> str:
+        return f"{self.key}:meta"
+
+    def read_meta(self) -> Optional[Dict[str, Any]]:
+        """Última atualização (None se nunca materializado)"""
+        meta = self.collection.find_one({"_id": self.meta_id})
+        # Documento criado só pela reserva de uma primeira atualização ainda em curso
+        return meta if meta is not None and "atualizado_em" in meta else None
+
+    def refresh(self, full: bool = False, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Recalcula os dias desde a última atualização (ou todos, com full)
+
+        O dia da atualização anterior é recalculado por inteiro; dias da janela
+        que deixaram de ter eventos voltam a zero.
+        """
+        now = now or datetime.utcnow()
+        meta = None if full else self.read_meta()
+        since = day_start(meta["atualizado_em"]) if meta else EPOCH
+        start = time.perf_counter()
+
+        try:
+            self.source.aggregate(build_daily_pipeline(self.key, since, now, self.closed_status))
+            engine = "merge"
+        except OperationFailure as e:
+            # Servidor sem suporte ao pipeline: calcular a partir de um único cursor
+            logging.warning(f"Agregação das estatísticas diárias indisponível, usando fallback: {e}")
+            self._refresh_from_cursor(since, now)
+            engine = "cursor"
+
+        # Dias da janela não tocados por esta atualização ficaram sem eventos
+        today = day_id(self.key, day_start(now))
+        self.collection.update_many(
+            {"_id": {"$gte": day_id(self.key, since), "$lte": today}, "atualizado_em": {"$lt": now}},
+            {"$set": {"abertos": 0, "fechados": 0, "atualizado_em": now}}
+        )
+
+        pending = self.source.count_documents({"status": {"$nin": list(self.closed_status)}})
+        self.collection.update_one(
+            {"_id": today},
+            {"$set": {"pendentes": pending, "atualizado_em": now},
+             "$setOnInsert": {"chave": self.key, "inicio": day_start(now), "abertos": 0, "fechados": 0}},
+            upsert=True
+        )
+        self.collection.replace_one(
+            {"_id": self.meta_id},
+            {"modulo": self.key, "atualizado_em": now, "pendentes": pending},
+            upsert=True
+        )
+
+        return {
+            "key": self.key,
+            "engine": engine,
+            "since": None if since == EPOCH else since,
+            "pending": pending,
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+
+    def _refresh_from_cursor(self, since: datetime, now: datetime) -> None:
+        projection = {"_id": 0, "status": 1, "created_at": 1, "data_criacao": 1, "closed_at": 1, "updated_at": 1}
+        cursor = self.source.find(window_filter(since, self.closed_status), projection).batch_size(FALLBACK_BATCH_SIZE)
+        try:
+            days = daily_counts_from_documents(cursor, since, self.closed_status)
+        finally:
+            cursor.close()
+
+        operations = [
+            UpdateOne(
+                {"_id": day_id(self.key, day)},
+                {"$set": {"chave": self.key, "inicio": day, "abertos": counts.get("abertos", 0),
+                          "fechados": counts.get("fechados", 0), "atualizado_em": now}},
+                upsert=True
+            )
+            for day, counts in days.items()
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def refresh_if_stale(self, max_age_seconds: float,
+                         lease_seconds: float = REFRESH_LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        """Atualiza se a última atualização (de qualquer worker) for mais antiga que max_age_seconds
+
+        Antes de atualizar, o worker reserva a atualização no documento meta com
+        find_one_and_update; os demais workers que acordarem no mesmo ciclo não
+        encontram o meta vencido e livre e pulam. A reserva é desfeita pelo
+        replace_one do meta no fim de refresh ou expira após lease_seconds.
+        """
+        now = datetime.utcnow()
+        try:
+            self.collection.find_one_and_update(
+                {
+                    "_id": self.meta_id,
+                    "$and": [
+                        {"$or": [{"atualizado_em": {"$exists": False}},
+                                 {"atualizado_em": {"$lt": now - timedelta(seconds=max_age_seconds)}}]},
+                        {"$or": [{"reservado_ate": {"$exists": False}}, {"reservado_ate": {"$lt": now}}]}
+                    ]
+                },
+                {"$set": {"reservado_ate": now + timedelta(seconds=lease_seconds)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Meta existente, mas atualizado há pouco ou reservado por outro worker
+            return None
+        return self.refresh(now=now)
+
+    def read_days(self, days: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Os últimos `days` dias até hoje, materializando na primeira consulta
+
+        Dias sem documento contam zero; pendentes vêm da última atualização.
+        """
+        meta = self.read_meta()
+        if meta is None:
+            self.refresh()
+            meta = self.read_meta() or {}
+
+        end = day_start(now or datetime.utcnow())
+        starts = [end - timedelta(days=days - 1 - index) for index in range(days)]
+        ids = [day_id(self.key, start) for start in starts]
+        found = {document["_id"]: document for document in self.collection.find({"_id": {"$in": ids}})}
+        return {
+            "dias": [
+                {
+                    "dia": start,
+                    "abertos": found.get(identifier, {}).get("abertos", 0),
+                    "fechados": found.get(identifier, {}).get("fechados", 0)
+                }
+                for start, identifier in zip(starts, ids)
+            ],
+            "pendentes": meta.get("pendentes", 0),
+            "atualizado_em": meta.get("atualizado_em")
+        }
+
+
+class DailyStatsScheduler:
+    """Thread do processo que atualiza periodicamente as estatísticas diárias
+
+    Cada worker tem a sua, mas só o worker que reserva o documento meta vencido
+    atualiza; os demais pulam o ciclo (refresh_if_stale).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, interval_seconds: float, targets: Callable[[], Iterable[DailyStats]],
+              logger: Optional[logging.Logger] = None) -> None:
+        """Inicia a thread (uma vez por processo); targets é chamado a cada ciclo"""
+        logger = logger or logging.getLogger(__name__)
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+
+            def run():
+                while not self._stop.wait(interval_seconds):
+                    try:
+                        for daily_stats in targets():
+                            daily_stats.refresh_if_stale(interval_seconds)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Aviso ao atualizar estatísticas diárias: {e}")
+
+            self._thread = threading.Thread(target=run, name="daily-stats", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+# Agendador global por processo
+daily_stats_scheduler = DailyStatsScheduler()
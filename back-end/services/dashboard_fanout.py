@@ -0,0 +1,58 @@
+"""
+Consulta em paralelo das estatísticas dos módulos do dashboard sem o Motor
+
+Caminho usado quando o driver assíncrono não está disponível (pacote motor não
+instalado, ASYNC_DASHBOARD_ENABLED desligado ou banco em memória; ver
+services/async_runtime.py). As leituras de incidentes, changes e usuários são
+submetidas a um pool de threads do processo e usam os próprios serviços
+síncronos: o mesmo MongoClient, o mesmo cache de snapshots e o mesmo fallback
+quando a agregação não está disponível. O pool de threads é criado na primeira
+utilização, portanto depois do fork de cada worker do gunicorn.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+from config import settings
+
+
+class DashboardFanOut:
+    """Executa leituras independentes em paralelo, limitado a `workers` threads por processo
+
+    A primeira leitura roda na própria thread da requisição; as demais vão para
+    o pool. Cada leitura em andamento ocupa uma conexão do pool do MongoDB.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def executor(self) -> Optional[ThreadPoolExecutor]:
+        """Pool de threads, criado na primeira chamada (None com workers <= 0)"""
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="dashboard-fanout")
+            return self._executor
+
+    def run(self, readers: Sequence[Callable[[], Any]]) -> List[Any]:
+        """Resultados das leituras, na mesma ordem"""
+        executor = self.executor() if len(readers) > 1 else None
+        if executor is None:
+            return [reader() for reader in readers]
+
+        futures = [executor.submit(reader) for reader in readers[1:]]
+        first = readers[0]()
+        return [first, *(future.result() for future in futures)]
+
+    def close(self) -> None:
+        """Encerra o pool de threads (desligamento do worker)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Instância global por processo
+dashboard_fanout = DashboardFanOut(settings.DASHBOARD_FANOUT_THREADS)
@@ -0,0 +1,351 @@
+"""
+Eventos de incidentes e changes para o canal SSE (/api/stream)
+
+O ChangeFeed do processo abre um único change stream no banco (com o primeiro
+assinante) e publica cada escrita de chamados e changes no EventBus, junto com
+as variações das estatísticas do dashboard. Sem change streams (servidor fora
+de replica set, banco em memória ou STREAM_CHANGE_STREAMS_ENABLED=false), as
+próprias escritas do processo publicam os eventos (WriteEvents); nesse modo
+cada worker só vê as escritas que ele mesmo atendeu.
+
+Cada assinante tem uma fila limitada: quando ela enche, os eventos pendentes
+dele são descartados e substituídos por um evento reset (o cliente recarrega
+os dados), em vez de atrasar a publicação para os demais.
+"""
+import itertools
+import logging
+import queue
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from pymongo.database import Database
+from pymongo.errors import OperationFailure, PyMongoError
+from config import settings
+from services.stats_counters import flatten_stats
+
+
+# Coleção de origem -> módulo publicado
+COLLECTION_MODULES = {"chamados": "incidentes", "changes": "changes"}
+
+# Operações do change stream repassadas aos assinantes
+STREAM_OPERATIONS = ("insert", "update", "replace", "delete")
+
+# Espera máxima (ms) de cada getMore do change stream, para poder encerrar a thread
+WATCH_AWAIT_MS = 1000
+
+# Códigos do MongoDB para um token de retomada fora do oplog
+CHANGE_STREAM_HISTORY_LOST = (280, 286)
+
+
+class Subscription:
+    """Fila limitada de eventos de um cliente"""
+
+    def __init__(self, modules: Sequence[str], max_size: int):
+        self.modules = frozenset(modules)
+        self.queue: "queue.Queue[Tuple[int, str, Dict[str, Any]]]" = queue.Queue(maxsize=max_size)
+
+    def reset(self, event: Tuple[int, str, Dict[str, Any]]) -> int:
+        """Descarta os eventos pendentes e enfileira o reset; retorna quantos foram descartados"""
+        discarded = 0
+        while True:
+            try:
+                self.queue.get_nowait()
+                discarded += 1
+            except queue.Empty:
+                break
+        self.queue.put_nowait(event)
+        return discarded
+
+    def get(self, timeout: float) -> Optional[Tuple[int, str, Dict[str, Any]]]:
+        """Próximo evento (id, tipo, dados) ou None após timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """Pub/sub em memória do processo com filas limitadas por assinante"""
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscription] = []
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.dropped = 0
+        self.resets = 0
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self, modules: Sequence[str]) -> Optional[Subscription]:
+        """Registra um assinante (None se o limite do processo foi atingido)"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscription = Subscription(modules, self.queue_size)
+            self._subscribers.append(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Entrega o evento aos assinantes do módulo; uma fila cheia é trocada por um reset"""
+        module = data.get("module")
+        with self._lock:
+            event = (next(self._ids), event_type, data)
+            self.published += 1
+            for subscription in self._subscribers:
+                if module is not None and module not in subscription.modules:
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                except queue.Full:
+                    reset = (next(self._ids), "reset", {"reason": "fila do cliente cheia"})
+                    self.dropped += subscription.reset(reset) + 1
+                    self.resets += 1
+
+    def reset_all(self, reason: str) -> None:
+        """Avisa todos os assinantes que eventos foram perdidos (recarregar os dados)"""
+        self.publish("reset", {"reason": reason})
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"subscribers": len(self._subscribers), "published": self.published,
+                    "dropped": self.dropped, "resets": self.resets}
+
+
+def event_document(convert: Callable[[Dict[str, Any]], Dict[str, Any]],
+                   document: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Documento no formato da resposta da API (None se ausente ou incompleto, ex: legado)"""
+    if document is None:
+        return None
+    try:
+        return convert(document)
+    except KeyError:
+        return None
+
+
+class ChangeFeed:
+    """Origem dos eventos do processo: change stream do MongoDB ou escritas locais
+
+    mode: idle (sem assinantes ainda), change_stream, reconnecting ou local.
+
+    Em reconnecting, as escritas do processo ficam em um buffer limitado: se o
+    stream for retomado pelo token, ele mesmo as reenvia e o buffer é
+    descartado; se abrir sem token ou cair para o modo local, o buffer é
+    publicado. Buffer cheio (ou token fora do oplog) vira um reset.
+    """
+
+    def __init__(self, bus: EventBus, stats_interval: float, buffer_size: int = 256):
+        self.bus = bus
+        self.stats_interval = stats_interval
+        self.mode = "idle"
+        self.buffer_size = buffer_size
+        self._buffer: "deque[Tuple[str, Dict[str, Any]]]" = deque()
+        self._buffer_overflow = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._services: Dict[str, Any] = {}
+        self._snapshots: Dict[str, Dict[str, int]] = {}
+        self._pending_stats: Dict[str, threading.Timer] = {}
+        self._resume_token: Optional[Dict[str, Any]] = None
+
+    @property
+    def local(self) -> bool:
+        """As escritas do processo publicam os próprios eventos"""
+        return self.mode in ("idle", "local")
+
+    def _emit(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Publica um evento local, ou o guarda enquanto o change stream reconecta"""
+        with self._lock:
+            if self.mode == "change_stream":
+                # O stream abriu depois da escrita e já vai entregá-la
+                return
+            if self.mode == "reconnecting":
+                if len(self._buffer) >= self.buffer_size:
+                    self._buffer.clear()
+                    self._buffer_overflow = True
+                elif not self._buffer_overflow:
+                    self._buffer.append((event_type, data))
+                return
+        self.bus.publish(event_type, data)
+
+    def _leave_reconnecting(self, mode: str, replayed: bool) -> None:
+        """Troca o modo e esvazia o buffer da reconexão; replayed: o stream retomado reenvia as escritas"""
+        with self._lock:
+            self.mode = mode
+            buffered, overflow = list(self._buffer), self._buffer_overflow
+            self._buffer.clear()
+            self._buffer_overflow = False
+        if overflow:
+            self.bus.reset_all("eventos perdidos durante a reconexão")
+        elif not replayed:
+            for event_type, data in buffered:
+                self.bus.publish(event_type, data)
+
+    def start(self, get_db: Callable[[], Any], services: Dict[str, Any], use_change_streams: bool,
+              retry_seconds: float) -> None:
+        """Inicia a origem dos eventos (uma vez por processo)
+
+        services: módulo -> serviço (document_to_dict e get_dashboard_stats).
+        """
+        with self._lock:
+            if self.mode != "idle":
+                return
+            self._services = dict(services)
+            db = get_db()
+            if not use_change_streams or not isinstance(db, Database):
+                self.mode = "local"
+                self._snapshot_stats()
+                return
+
+            self.mode = "reconnecting"
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, args=(get_db, retry_seconds),
+                                            name="change-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _watch(self, get_db: Callable[[], Any], retry_seconds: float) -> None:
+        self._snapshot_stats()
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": list(COLLECTION_MODULES)},
+            "operationType": {"$in": list(STREAM_OPERATIONS)}
+        }}]
+        while not self._stop.is_set():
+            try:
+                db = get_db()
+                if not isinstance(db, Database):
+                    raise PyMongoError("Banco de dados indisponível")
+                resumed = self._resume_token is not None
+                with db.watch(pipeline, full_document="updateLookup", resume_after=self._resume_token,
+                              max_await_time_ms=WATCH_AWAIT_MS) as stream:
+                    self._leave_reconnecting("change_stream", replayed=resumed)
+                    while not self._stop.is_set() and stream.alive:
+                        change = stream.try_next()
+                        self._resume_token = stream.resume_token
+                        if change is not None:
+                            self._publish_change(change)
+            except OperationFailure as e:
+                if e.code in (40573, 40324) or "replica set" in str(e).lower():
+                    # Servidor sem change streams: as escritas locais passam a publicar
+                    logging.info(f"Change streams indisponíveis, usando eventos locais: {e}")
+                    self._leave_reconnecting("local", replayed=False)
+                    return
+                if e.code in CHANGE_STREAM_HISTORY_LOST:
+                    # Token fora do oplog: recomeça do ponto atual, sem as escritas do intervalo
+                    self._resume_token = None
+                    with self._lock:
+                        self._buffer_overflow = True
+                self._retry(e, retry_seconds)
+            except PyMongoError as e:
+                self._retry(e, retry_seconds)
+
+    def _retry(self, error: Exception, retry_seconds: float) -> None:
+        logging.warning(f"⚠️ Change stream interrompido, retomando em {retry_seconds}s: {error}")
+        with self._lock:
+            self.mode = "reconnecting"
+        self._stop.wait(retry_seconds)
+
+    def _publish_change(self, change: Dict[str, Any]) -> None:
+        module = COLLECTION_MODULES.get(change.get("ns", {}).get("coll"))
+        service = self._services.get(module)
+        if service is None:
+            return
+        self.bus.publish(module, {
+            "module": module,
+            "operation": change["operationType"],
+            "id": str(change["documentKey"]["_id"]),
+            "document": event_document(service.document_to_dict, change.get("fullDocument"))
+        })
+        self.schedule_stats(module)
+
+    def publish_local(self, module: str, operation: str, documents: Iterable[Dict[str, Any]],
+                      convert: Callable[[Dict[str, Any]], Dict[str, Any]], include_document: bool = True) -> None:
+        """Publica escritas do próprio processo (somente fora do modo change_stream)"""
+        if self.mode == "change_stream" or not self.bus.has_subscribers:
+            return
+        documents = list(documents)
+        if len(documents) == 1:
+            document = documents[0]
+            self._emit(module, {
+                "module": module,
+                "operation": operation,
+                "id": str(document["_id"]),
+                "document": event_document(convert, document) if include_document else None
+            })
+        elif documents:
+            # Lotes viram um único evento, para não encher as filas dos assinantes
+            self._emit(module, {
+                "module": module,
+                "operation": f"bulk_{operation}",
+                "ids": [str(document["_id"]) for document in documents]
+            })
+        self.schedule_stats(module)
+
+    def schedule_stats(self, module: str) -> None:
+        """Agenda a publicação das estatísticas do módulo (no máximo uma por intervalo)"""
+        with self._lock:
+            if module in self._pending_stats or module not in self._services:
+                return
+            timer = threading.Timer(self.stats_interval, self._publish_stats, args=(module,))
+            timer.daemon = True
+            self._pending_stats[module] = timer
+        timer.start()
+
+    def _publish_stats(self, module: str) -> None:
+        with self._lock:
+            self._pending_stats.pop(module, None)
+        try:
+            stats = self._services[module].get_dashboard_stats()
+        except Exception as e:
+            logging.warning(f"⚠️ Aviso ao publicar estatísticas de {module}: {e}")
+            return
+
+        current = flatten_stats(stats)
+        previous = self._snapshots.get(module, {})
+        deltas = {path: current.get(path, 0) - previous.get(path, 0)
+                  for path in current.keys() | previous.keys()
+                  if current.get(path, 0) != previous.get(path, 0)}
+        self._snapshots[module] = current
+        if deltas:
+            self.bus.publish("stats", {"module": module, "deltas": deltas, "stats": stats})
+
+    def _snapshot_stats(self) -> None:
+        """Estatísticas de referência para as primeiras variações"""
+        for module, service in self._services.items():
+            try:
+                self._snapshots[module] = flatten_stats(service.get_dashboard_stats())
+            except Exception as e:
+                logging.warning(f"⚠️ Aviso ao ler estatísticas de {module}: {e}")
+
+
+class WriteEvents:
+    """Eventos das escritas de um serviço, publicados quando não há change stream"""
+
+    def __init__(self, feed: ChangeFeed, module: str, convert: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        self.feed = feed
+        self.module = module
+        self.convert = convert
+
+    def record(self, operation: str, changes: Iterable[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> None:
+        """Lote de (antes, depois) de um mesmo tipo de escrita (insert, update ou delete)"""
+        documents = [after if after is not None else before for before, after in changes]
+        if documents:
+            self.feed.publish_local(self.module, operation, documents, self.convert,
+                                    include_document=operation != "delete")
+
+
+# Instâncias globais por processo, compartilhadas pelos serviços e pela rota /api/stream
+event_bus = EventBus(settings.STREAM_QUEUE_SIZE, settings.STREAM_MAX_CLIENTS)
+change_feed = ChangeFeed(event_bus, settings.STREAM_STATS_INTERVAL_SECONDS, settings.STREAM_QUEUE_SIZE)
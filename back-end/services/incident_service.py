@@ -2,91 +2,298 @@
 Serviço de Incidentes - Lógica de negócio
 """
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Tuple, Sequence, Iterator
 from bson import ObjectId
-from pymongo.collection import Collection
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
 from pymongo.database import Database
-from extensions import get_db
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from utils.pagination import KeysetPosition
+from services.repository import PRIORIDADE_FILTER_MAP, FieldFilter, QueryTranslator, Repository, response_projection
+from services.stats_counters import StatsCounters
+from services.versions import CollectionVersion
+from services.trends import TrendRollups
+from services.daily_stats import DailyStats, stamp_closed_at, status_update
+from services.events import WriteEvents, change_feed
+from services.bulk import DUPLICATE_KEY_ERROR, insert_many_unordered, bulk_write_unordered
+from services.sequence import get_sequence_generator, max_integer_value, max_numeric_suffix
+from config import settings
 from models.incident_model import IncidentCreate, IncidentUpdate, IncidentModel, IncidentResponse
+import logging
 
 
-class IncidentService:
+# Buckets exibidos no dashboard de incidentes
+DASHBOARD_FILAS = ["fila_p2k", "fila_crivo", "sg5_ura", "alarmes", "tsk_vendas", "sr", "rit"]
+DASHBOARD_PRIORIDADES = ["critica", "alta", "media", "baixa"]
+DASHBOARD_STATUS = ["em_andamento", "em_espera", "tks_remoto", "aberto", "resolvido", "fechado"]
+
+# Campos necessários para calcular as estatísticas do dashboard
+DASHBOARD_PROJECTION = {
+    "_id": 0,
+    "incidente_vendas": 1,
+    "local_problema": 1,
+    "prioridade": 1,
+    "status": 1
+}
+
+# Tendências: dimensões dos rollups (nome -> campo) e status que tiram o item do backlog
+INCIDENT_TREND_DIMENSIONS = {"filas": "local_problema", "prioridades": "prioridade", "grupos": "grupo_designado"}
+INCIDENT_CLOSED_STATUS = ("resolvido", "fechado")
+
+# Campos lidos antes de uma escrita para manter contadores e tendências
+TRACKED_PROJECTION = {**DASHBOARD_PROJECTION, **{field: 1 for field in INCIDENT_TREND_DIMENSIONS.values()}}
+
+# Índices da coleção chamados, alinhados aos filtros da listagem e à ordenação
+# (created_at, _id) da paginação por cursor
+INCIDENT_INDEXES = [
+    IndexModel([("numero", ASCENDING)], unique=True),
+    IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("local_problema", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("prioridade", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("grupo_designado", ASCENDING), ("status", ASCENDING)]),
+    IndexModel([("atribuido", ASCENDING), ("created_at", DESCENDING)]),
+    # Listagem legada ordenada por (data_criacao, _id), paginada por cursor
+    IndexModel([("data_criacao", DESCENDING), ("_id", DESCENDING)]),
+    # Fechamentos do período na materialização de daily_stats
+    IndexModel([("closed_at", DESCENDING)])
+]
+
+# Tradução dos filtros da listagem (valores da API -> valores gravados)
+FILA_FILTER_MAP = {
+    "P2K": "fila_p2k",
+    "CRIVO": "fila_crivo",
+    "SG5_URA": "sg5_ura",
+    "ALARMES": "alarmes",
+    "TSK_VENDAS": "tsk_vendas",
+    "SR": "sr",
+    "RIT": "rit"
+}
+STATUS_FILTER_MAP = {
+    "Em andamento": "em_andamento",
+    "Em espera": "em_espera",
+    "TKS Remoto": "tks_remoto",
+    "Aberto": "aberto"
+}
+INCIDENT_FILTERS = QueryTranslator({
+    "fila": FieldFilter("local_problema", FILA_FILTER_MAP),
+    "prioridade": FieldFilter("prioridade", PRIORIDADE_FILTER_MAP),
+    "status": FieldFilter("status", STATUS_FILTER_MAP),
+    "grupo_designado": FieldFilter("grupo_designado"),
+    "atribuido": FieldFilter("atribuido")
+})
+
+# Campos da resposta da listagem, na ordem do modelo IncidentResponse
+INCIDENT_RESPONSE_FIELDS = ("numero", "titulo", "descricao", "prioridade", "status", "atribuido", "tipo_tarefa", "grupo_designado", "local_problema", "incidente_vendas", "created_at", "updated_at")
+INCIDENT_RESPONSE_PROJECTION = response_projection(INCIDENT_RESPONSE_FIELDS)
+
+
+def build_dashboard_pipeline() -> List[Dict[str, Any]]:
+    """Monta o pipeline que calcula todos os buckets do dashboard em uma única passada"""
+    def group_by(field: str, values: List[str]) -> List[Dict[str, Any]]:
+        return [
+            {"$match": {field: {"$in": values}}},
+            {"$group": {"_id": f"${field}", "total": {"$sum": 1}}}
+        ]
+    
+    return [
+        {"$project": DASHBOARD_PROJECTION},
+        {"$facet": {
+            "incidentes_vendas": [
+                {"$match": {"incidente_vendas": True}},
+                {"$count": "total"}
+            ],
+            "filas": group_by("local_problema", DASHBOARD_FILAS),
+            "prioridades": group_by("prioridade", DASHBOARD_PRIORIDADES),
+            "status": group_by("status", DASHBOARD_STATUS)
+        }}
+    ]
+
+
+def empty_dashboard_stats() -> Dict[str, Any]:
+    """Retorna a estrutura de estatísticas com todos os buckets zerados"""
+    return {
+        "incidentes_vendas": 0,
+        "filas": {fila: 0 for fila in DASHBOARD_FILAS},
+        "prioridades": {prioridade: 0 for prioridade in DASHBOARD_PRIORIDADES},
+        "status": {status: 0 for status in DASHBOARD_STATUS}
+    }
+
+
+def dashboard_stats_from_facets(facets: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte o resultado do $facet para o formato do dashboard"""
+    stats = empty_dashboard_stats()
+    
+    vendas = facets.get("incidentes_vendas") or []
+    if vendas:
+        stats["incidentes_vendas"] = vendas[0]["total"]
+    
+    for bucket in ("filas", "prioridades", "status"):
+        for item in facets.get(bucket) or []:
+            stats[bucket][item["_id"]] = item["total"]
+    
+    return stats
+
+
+def dashboard_stats_from_documents(documents: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Calcula os mesmos buckets do pipeline percorrendo os documentos uma única vez"""
+    stats = empty_dashboard_stats()
+    filas = stats["filas"]
+    prioridades = stats["prioridades"]
+    status = stats["status"]
+    vendas = 0
+    
+    for doc in documents:
+        if doc.get("incidente_vendas") is True:
+            vendas += 1
+        
+        fila = doc.get("local_problema")
+        if fila in filas:
+            filas[fila] += 1
+        
+        prioridade = doc.get("prioridade")
+        if prioridade in prioridades:
+            prioridades[prioridade] += 1
+        
+        situacao = doc.get("status")
+        if situacao in status:
+            status[situacao] += 1
+    
+    stats["incidentes_vendas"] = vendas
+    return stats
+
+
+def incident_stat_buckets(incident: Dict[str, Any]) -> Dict[str, int]:
+    """Buckets do dashboard aos quais um incidente pertence"""
+    buckets = {}
+    if incident.get("incidente_vendas") is True:
+        buckets["incidentes_vendas"] = 1
+    if incident.get("local_problema") in DASHBOARD_FILAS:
+        buckets[f"filas.{incident['local_problema']}"] = 1
+    if incident.get("prioridade") in DASHBOARD_PRIORIDADES:
+        buckets[f"prioridades.{incident['prioridade']}"] = 1
+    if incident.get("status") in DASHBOARD_STATUS:
+        buckets[f"status.{incident['status']}"] = 1
+    return buckets
+
+
+def incident_to_dict(incident: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte um documento de incidente direto no dicionário da resposta
+
+    Mesmo resultado de incident_to_response(...).dict(), sem construir e validar o
+    modelo: os documentos vêm do próprio banco, gravados já validados. Chamados
+    criados pelas rotas legadas (/api/legacy/chamados) não têm tipo_tarefa nem
+    grupo_designado, e os mais antigos nem created_at: esses campos saem None.
+    """
+    return {
+        "id": str(incident["_id"]),
+        "numero": incident.get("numero"),
+        "titulo": incident.get("titulo"),
+        "descricao": incident.get("descricao"),
+        "prioridade": incident.get("prioridade"),
+        "status": incident.get("status"),
+        "atribuido": incident.get("atribuido"),
+        "tipo_tarefa": incident.get("tipo_tarefa"),
+        "grupo_designado": incident.get("grupo_designado"),
+        "local_problema": incident.get("local_problema"),
+        "incidente_vendas": incident.get("incidente_vendas", False),
+        "created_at": incident.get("created_at"),
+        "updated_at": incident.get("updated_at")
+    }
+
+
+def incident_to_response(incident: Dict[str, Any]) -> IncidentResponse:
+    """Converte um documento de incidente em resposta da API"""
+    return IncidentResponse(
+        id=str(incident["_id"]),
+        numero=incident["numero"],
+        titulo=incident["titulo"],
+        descricao=incident["descricao"],
+        prioridade=incident["prioridade"],
+        status=incident["status"],
+        atribuido=incident.get("atribuido"),
+        tipo_tarefa=incident["tipo_tarefa"],
+        grupo_designado=incident["grupo_designado"],
+        local_problema=incident.get("local_problema"),
+        incidente_vendas=incident.get("incidente_vendas", False),
+        created_at=incident["created_at"],
+        updated_at=incident.get("updated_at")
+    )
+
+
+class IncidentService(Repository):
     """Serviço para gerenciar incidentes"""
     
-    def __init__(self):
-        self.db: Database = get_db()
-        if self.db is not None:
-            self.collection: Collection = self.db.chamados
-        else:
-            self.collection = None
+    collection_name = "chamados"
+    module_key = "incidentes"
+    query_translator = INCIDENT_FILTERS
+    document_to_dict = staticmethod(incident_to_dict)
+    default_projection = INCIDENT_RESPONSE_PROJECTION
+    response_defaults = {"incidente_vendas": False}
+    
+    def __init__(self, db: Optional[Database] = None):
+        super().__init__(db)
+        self.counters = StatsCounters(self.db, "incidentes", incident_stat_buckets, self.compute_dashboard_stats)
+        self.trends = TrendRollups(self.db, "incidentes", self.collection, INCIDENT_TREND_DIMENSIONS, INCIDENT_CLOSED_STATUS)
+        self.daily_stats = DailyStats(self.db, "incidentes", self.collection, INCIDENT_CLOSED_STATUS)
+        self.events = WriteEvents(change_feed, "incidentes", incident_to_dict)
+        self.version = CollectionVersion(self.db, "incidentes")
+        self.sequences = get_sequence_generator(self.db, settings.SEQUENCE_BLOCK_SIZE) if self.db is not None else None
+    
+    def _number_seed(self) -> int:
+        """Maior número INC- existente, usado como semente da sequência"""
+        return max_numeric_suffix(self.collection, "INC")
     
     def _generate_next_number(self) -> str:
-        """Gera o próximo número sequencial de incidente"""
+        """Gera o próximo número sequencial de incidente (ex: 1 -> INC-001)"""
+        next_num = self.sequences.next_value("incidentes", seed=self._number_seed)
+        return f"INC-{next_num:03d}"
+    
+    def _insert_numbered(self, document: Dict[str, Any], generated: bool) -> None:
+        """insert_one; se o número gerado já existe, ressincroniza a sequência e tenta outro
+
+        A sequência fica atrás dos dados quando números são gravados fora da API
+        (importações, shell) ou o contador é apagado depois de semeado.
+        """
         try:
-            # Buscar o último incidente ordenado por número
-            last_incident = self.collection.find_one(
-                sort=[("numero", -1)]
-            )
-            
-            if last_incident and "numero" in last_incident:
-                # Extrair número do último incidente (ex: INC-001 -> 1)
-                last_num = last_incident["numero"]
-                if "-" in last_num:
-                    last_num = last_num.split("-")[-1]
-                
-                try:
-                    next_num = int(last_num) + 1
-                except ValueError:
-                    next_num = 1
-            else:
-                next_num = 1
-            
-            # Formatar número (ex: 1 -> INC-001)
-            return f"INC-{next_num:03d}"
-            
-        except Exception as e:
-            print(f"Erro ao gerar número do incidente: {e}")
-            return f"INC-{int(datetime.now().timestamp())}"
+            self.collection.insert_one(document)
+        except DuplicateKeyError:
+            if not generated:
+                raise
+            self.sequences.resync("incidentes", self._number_seed)
+            document["numero"] = self._generate_next_number()
+            self.collection.insert_one(document)
+    
+    def _insert_document(self, document: Dict[str, Any], generated: bool) -> None:
+        """Grava um incidente já montado: datas, closed_at, inserção e efeitos colaterais"""
+        document["created_at"] = datetime.utcnow()
+        document["updated_at"] = None
+        stamp_closed_at(document, INCIDENT_CLOSED_STATUS)
+        
+        # Inserir no banco (o índice único de número rejeita duplicatas)
+        try:
+            self._insert_numbered(document, generated)
+        except DuplicateKeyError:
+            raise ValueError(f"Incidente com número {document['numero']} já existe")
+        
+        self._after_write("insert", None, document)
     
     def create_incident(self, incident_data: IncidentCreate) -> IncidentResponse:
         """Cria um novo incidente"""
         try:
             # Gerar número único se não fornecido
-            if not incident_data.numero:
+            generated = not incident_data.numero
+            if generated:
                 incident_data.numero = self._generate_next_number()
             
-            # Verificar se número já existe
-            if self.collection.find_one({"numero": incident_data.numero}):
-                raise ValueError(f"Incidente com número {incident_data.numero} já existe")
-            
             # Preparar dados para inserção
             incident_dict = incident_data.dict()
-            incident_dict["created_at"] = datetime.utcnow()
-            incident_dict["updated_at"] = None
-            
-            # Inserir no banco
-            result = self.collection.insert_one(incident_dict)
-            
-            # Buscar incidente criado
-            created_incident = self.collection.find_one({"_id": result.inserted_id})
-            
-            # Converter para resposta
-            return IncidentResponse(
-                id=str(created_incident["_id"]),
-                numero=created_incident["numero"],
-                titulo=created_incident["titulo"],
-                descricao=created_incident["descricao"],
-                prioridade=created_incident["prioridade"],
-                status=created_incident["status"],
-                atribuido=created_incident.get("atribuido"),
-                tipo_tarefa=created_incident["tipo_tarefa"],
-                grupo_designado=created_incident["grupo_designado"],
-                local_problema=created_incident.get("local_problema"),
-                incidente_vendas=created_incident.get("incidente_vendas", False),
-                created_at=created_incident["created_at"],
-                updated_at=created_incident.get("updated_at")
-            )
+            self._insert_document(incident_dict, generated)
             
+            # Converter para resposta (insert_one preenche o _id no próprio dicionário)
+            return incident_to_response(incident_dict)
+            
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Erro ao criar incidente: {str(e)}")
     
@@ -101,207 +308,318 @@ class IncidentService:
             if not incident:
                 return None
             
-            return IncidentResponse(
-                id=str(incident["_id"]),
-                numero=incident["numero"],
-                titulo=incident["titulo"],
-                descricao=incident["descricao"],
-                prioridade=incident["prioridade"],
-                status=incident["status"],
-                atribuido=incident.get("atribuido"),
-                tipo_tarefa=incident["tipo_tarefa"],
-                grupo_designado=incident["grupo_designado"],
-                local_problema=incident.get("local_problema"),
-                incidente_vendas=incident.get("incidente_vendas", False),
-                created_at=incident["created_at"],
-                updated_at=incident.get("updated_at")
-            )
+            return incident_to_response(incident)
             
         except Exception as e:
             raise Exception(f"Erro ao buscar incidente: {str(e)}")
     
     def get_incidents(self, filters: Optional[Dict[str, Any]] = None, 
-                     limit: int = 100, skip: int = 0) -> List[IncidentResponse]:
-        """Lista incidentes com filtros opcionais"""
+                     limit: int = 100, skip: int = 0,
+                     after: Optional[KeysetPosition] = None,
+                     query: Optional[Dict[str, Any]] = None) -> List[IncidentResponse]:
+        """Lista incidentes com filtros opcionais (ou com a query já montada por build_query)"""
         try:
-            # Construir query de filtros
-            query = {}
-            
-            if filters:
-                # Mapear filtros para campos do banco
-                if "fila" in filters:
-                    fila_map = {
-                        "P2K": "fila_p2k",
-                        "CRIVO": "fila_crivo",
-                        "SG5_URA": "sg5_ura",
-                        "ALARMES": "alarmes",
-                        "TSK_VENDAS": "tsk_vendas",
-                        "SR": "sr",
-                        "RIT": "rit"
-                    }
-                    if filters["fila"] in fila_map:
-                        query["local_problema"] = fila_map[filters["fila"]]
-                
-                if "prioridade" in filters:
-                    prioridade_map = {
-                        "Crítico": "critica",
-                        "Alto": "alta",
-                        "Moderado": "media"
-                    }
-                    if filters["prioridade"] in prioridade_map:
-                        query["prioridade"] = prioridade_map[filters["prioridade"]]
-                
-                if "status" in filters:
-                    status_map = {
-                        "Em andamento": "em_andamento",
-                        "Em espera": "em_espera",
-                        "TKS Remoto": "tks_remoto",
-                        "Aberto": "aberto"
-                    }
-                    if filters["status"] in status_map:
-                        query["status"] = status_map[filters["status"]]
-                
-                if "grupo_designado" in filters:
-                    query["grupo_designado"] = filters["grupo_designado"]
-                
-                if "atribuido" in filters:
-                    query["atribuido"] = filters["atribuido"]
-            
-            # Executar query
-            cursor = self.collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
+            cursor = self.find_page(self.resolve_query(filters, query), limit, skip, after)
             
             # Converter para lista de respostas
-            incidents = []
-            for incident in cursor:
-                incidents.append(IncidentResponse(
-                    id=str(incident["_id"]),
-                    numero=incident["numero"],
-                    titulo=incident["titulo"],
-                    descricao=incident["descricao"],
-                    prioridade=incident["prioridade"],
-                    status=incident["status"],
-                    atribuido=incident.get("atribuido"),
-                    tipo_tarefa=incident["tipo_tarefa"],
-                    grupo_designado=incident["grupo_designado"],
-                    local_problema=incident.get("local_problema"),
-                    incidente_vendas=incident.get("incidente_vendas", False),
-                    created_at=incident["created_at"],
-                    updated_at=incident.get("updated_at")
-                ))
-            
-            return incidents
+            return [incident_to_response(incident) for incident in cursor]
             
         except Exception as e:
             raise Exception(f"Erro ao listar incidentes: {str(e)}")
     
-    def update_incident(self, incident_id: str, update_data: IncidentUpdate) -> Optional[IncidentResponse]:
-        """Atualiza um incidente existente"""
+    def get_incident_page(self, filters: Optional[Dict[str, Any]] = None,
+                          limit: int = 100, skip: int = 0,
+                          after: Optional[KeysetPosition] = None,
+                          query: Optional[Dict[str, Any]] = None,
+                          fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Lista incidentes já como dicionários da resposta (caminho rápido das rotas)
+
+        Busca apenas os campos de IncidentResponse (ou os de fields) e converte
+        sem passar pelo Pydantic.
+        """
+        try:
+            return self.find_page_rows(self.resolve_query(filters, query), limit, skip, after, fields)
+            
+        except Exception as e:
+            raise Exception(f"Erro ao listar incidentes: {str(e)}")
+    
+    def iter_incident_rows(self, filters: Optional[Dict[str, Any]] = None,
+                           fields: Optional[Sequence[str]] = None,
+                           query: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Percorre todos os incidentes dos filtros em lotes do cursor (exportação em streaming)"""
+        return self.iter_rows(self.resolve_query(filters, query), fields, settings.EXPORT_BATCH_SIZE)
+    
+    def get_incident_data(self, incident_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Busca incidente por ID já como dicionário da resposta (completo ou só com fields)"""
         try:
             if not ObjectId.is_valid(incident_id):
                 raise ValueError("ID de incidente inválido")
             
-            # Preparar dados para atualização
-            update_dict = update_data.dict(exclude_unset=True)
-            update_dict["updated_at"] = datetime.utcnow()
+            return self.find_row_by_id(ObjectId(incident_id), fields)
             
-            # Atualizar no banco
-            result = self.collection.update_one(
-                {"_id": ObjectId(incident_id)},
-                {"$set": update_dict}
-            )
+        except Exception as e:
+            raise Exception(f"Erro ao buscar incidente: {str(e)}")
+    
+    def _update_document(self, incident_id: str, update_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Aplica o $set com updated_at e closed_at; retorna o documento atualizado (None se não existe)"""
+        if not ObjectId.is_valid(incident_id):
+            raise ValueError("ID de incidente inválido")
+        
+        update_dict["updated_at"] = datetime.utcnow()
+        
+        # Atualizar no banco em uma única ida: a versão anterior alimenta os
+        # contadores e a resposta é a versão anterior com o $set aplicado
+        previous = self.collection.find_one_and_update(
+            {"_id": ObjectId(incident_id)},
+            status_update(update_dict, INCIDENT_CLOSED_STATUS, update_dict["updated_at"]),
+            return_document=ReturnDocument.BEFORE
+        )
+        
+        if previous is None:
+            return None
+        
+        updated = {**previous, **update_dict}
+        self._after_write("update", previous, updated)
+        return updated
+    
+    def update_incident(self, incident_id: str, update_data: IncidentUpdate) -> Optional[IncidentResponse]:
+        """Atualiza um incidente existente"""
+        try:
+            # Preparar dados para atualização
+            updated = self._update_document(incident_id, update_data.dict(exclude_unset=True))
             
-            if result.matched_count == 0:
+            if updated is None:
                 return None
             
-            # Buscar incidente atualizado
-            return self.get_incident_by_id(incident_id)
+            return incident_to_response(updated)
             
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Erro ao atualizar incidente: {str(e)}")
     
+    def create_legacy_incident(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Cria um chamado no formato legado: número inteiro da sequência chamados_legacy e data_criacao local"""
+        try:
+            document["numero"] = self.sequences.next_value(
+                "chamados_legacy",
+                seed=lambda: max_integer_value(self.collection)
+            )
+            document["data_criacao"] = datetime.now()
+            self._insert_document(document, generated=False)
+            return document
+            
+        except ValueError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro ao criar chamado: {str(e)}")
+    
+    def update_legacy_incident(self, incident_id: str, update_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Atualiza um chamado com os campos do modelo legado"""
+        try:
+            return self._update_document(incident_id, update_dict)
+            
+        except ValueError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro ao atualizar chamado: {str(e)}")
+    
     def delete_incident(self, incident_id: str) -> bool:
         """Remove um incidente"""
         try:
             if not ObjectId.is_valid(incident_id):
                 raise ValueError("ID de incidente inválido")
             
-            result = self.collection.delete_one({"_id": ObjectId(incident_id)})
+            deleted = self.collection.find_one_and_delete(
+                {"_id": ObjectId(incident_id)},
+                projection={**TRACKED_PROJECTION, "_id": 1}
+            )
+            
+            if deleted is None:
+                return False
             
-            return result.deleted_count > 0
+            self._after_write("delete", deleted, None)
+            
+            return True
             
         except Exception as e:
             raise Exception(f"Erro ao deletar incidente: {str(e)}")
     
-    def get_dashboard_stats(self) -> Dict[str, Any]:
-        """Retorna estatísticas para o dashboard"""
+    def create_incidents_bulk(self, items: List[IncidentCreate]) -> List[Dict[str, Any]]:
+        """Cria incidentes em lote com um único insert_many não ordenado
+
+        Os números ausentes são reservados em bloco. Retorna, na ordem dos itens,
+        {"success": True, "id": ..., "numero": ...} ou {"success": False, "error": ...}.
+        """
         try:
-            stats = {
-                "incidentes_vendas": self.collection.count_documents({"incidente_vendas": True}),
-                "filas": {},
-                "prioridades": {},
-                "status": {}
+            # Reservar de uma vez os números dos itens que não informaram um
+            pending = [index for index, item in enumerate(items) if not item.numero]
+            if pending:
+                numbers = self.sequences.reserve("incidentes", len(pending), seed=self._number_seed)
+                for index, number in zip(pending, numbers):
+                    items[index].numero = f"INC-{number:03d}"
+            
+            # Preparar documentos
+            now = datetime.utcnow()
+            documents = []
+            for item in items:
+                document = item.dict()
+                document["created_at"] = now
+                document["updated_at"] = None
+                stamp_closed_at(document, INCIDENT_CLOSED_STATUS)
+                documents.append(document)
+            
+            # Inserir no banco (falhas individuais não interrompem o lote)
+            errors = insert_many_unordered(self.collection, documents)
+            
+            # Números gerados que já existiam: ressincronizar a sequência e reinserir uma vez
+            retry = [index for index in pending if errors.get(index, {}).get("code") == DUPLICATE_KEY_ERROR]
+            if retry:
+                self.sequences.resync("incidentes", self._number_seed)
+                numbers = self.sequences.reserve("incidentes", len(retry), seed=self._number_seed)
+                for index, number in zip(retry, numbers):
+                    documents[index]["numero"] = f"INC-{number:03d}"
+                    del errors[index]
+                retried = insert_many_unordered(self.collection, [documents[index] for index in retry])
+                errors.update((retry[position], error) for position, error in retried.items())
+            
+            inserted = [document for index, document in enumerate(documents) if index not in errors]
+            if inserted:
+                created = [(None, document) for document in inserted]
+                self._after_write_batch("insert", created)
+            
+            results = []
+            for index, document in enumerate(documents):
+                if index in errors:
+                    error = errors[index]
+                    if error.get("code") == DUPLICATE_KEY_ERROR:
+                        message = f"Incidente com número {document['numero']} já existe"
+                    else:
+                        message = error.get("errmsg", "Erro ao inserir")
+                    results.append({"success": False, "error": message})
+                else:
+                    results.append({"success": True, "id": str(document["_id"]), "numero": document["numero"]})
+            
+            return results
+            
+        except Exception as e:
+            raise Exception(f"Erro ao criar incidentes em lote: {str(e)}")
+    
+    def update_incidents_bulk(self, updates: List[Tuple[str, IncidentUpdate]]) -> List[Dict[str, Any]]:
+        """Atualiza incidentes em lote com um único bulk_write não ordenado
+
+        Os buckets anteriores são lidos em uma única consulta para manter os
+        contadores; escritas concorrentes nesse intervalo podem gerar drift,
+        corrigido por `manage.py reconcile-stats`.
+        """
+        try:
+            results: List[Optional[Dict[str, Any]]] = [None] * len(updates)
+            
+            # Validar IDs (cada registro só pode aparecer uma vez no lote)
+            targets: Dict[int, ObjectId] = {}
+            seen = set()
+            for index, (incident_id, _) in enumerate(updates):
+                if not ObjectId.is_valid(incident_id):
+                    results[index] = {"success": False, "error": "ID de incidente inválido"}
+                elif incident_id in seen:
+                    results[index] = {"success": False, "error": "Incidente repetido no lote"}
+                else:
+                    seen.add(incident_id)
+                    targets[index] = ObjectId(incident_id)
+            
+            # Buscar a versão anterior de todos os registros de uma vez
+            previous = {
+                document["_id"]: document
+                for document in self.collection.find(
+                    {"_id": {"$in": list(targets.values())}},
+                    {**TRACKED_PROJECTION, "_id": 1}
+                )
             }
             
-            # Estatísticas por fila
-            filas = ["fila_p2k", "fila_crivo", "sg5_ura", "alarmes", "tsk_vendas", "sr", "rit"]
-            for fila in filas:
-                stats["filas"][fila] = self.collection.count_documents({"local_problema": fila})
+            now = datetime.utcnow()
+            operations = []
+            pending = []
+            for index, object_id in targets.items():
+                if object_id not in previous:
+                    results[index] = {"success": False, "error": "Incidente não encontrado"}
+                    continue
+                update_dict = updates[index][1].dict(exclude_unset=True)
+                update_dict["updated_at"] = now
+                operations.append(UpdateOne({"_id": object_id}, status_update(update_dict, INCIDENT_CLOSED_STATUS, now)))
+                pending.append((index, object_id, update_dict))
+            
+            errors = bulk_write_unordered(self.collection, operations)
+            
+            applied = []
+            for position, (index, object_id, update_dict) in enumerate(pending):
+                if position in errors:
+                    results[index] = {"success": False, "error": errors[position].get("errmsg", "Erro ao atualizar")}
+                    continue
+                before = previous[object_id]
+                applied.append((before, {**before, **update_dict}))
+                results[index] = {"success": True, "id": str(object_id)}
+            
+            if applied:
+                self._after_write_batch("update", applied)
+            
+            return results
             
-            # Estatísticas por prioridade
-            prioridades = ["critica", "alta", "media", "baixa"]
-            for prioridade in prioridades:
-                stats["prioridades"][prioridade] = self.collection.count_documents({"prioridade": prioridade})
+        except Exception as e:
+            raise Exception(f"Erro ao atualizar incidentes em lote: {str(e)}")
+    
+    def get_dashboard_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas para o dashboard a partir dos contadores incrementais"""
+        try:
+            return self.counters.get()
             
-            # Estatísticas por status
-            status_list = ["em_andamento", "em_espera", "tks_remoto", "aberto", "resolvido", "fechado"]
-            for status in status_list:
-                stats["status"][status] = self.collection.count_documents({"status": status})
+        except Exception as e:
+            raise Exception(f"Erro ao buscar estatísticas: {str(e)}")
+    
+    def get_trends(self, granularity: str, periods: int, window: int,
+                   dimension: Optional[str] = None) -> Dict[str, Any]:
+        """Séries de abertos, fechados e backlog lidas dos rollups de tendência"""
+        try:
+            return self.trends.series(granularity, periods, window, settings.TREND_STABLE_PERCENT, dimension)
+            
+        except Exception as e:
+            raise Exception(f"Erro ao buscar tendências: {str(e)}")
+    
+    def get_daily_stats(self, days: int) -> Dict[str, Any]:
+        """Abertos e fechados dos últimos dias e pendentes, lidos de daily_stats"""
+        try:
+            return self.daily_stats.read_days(days)
             
-            return stats
+        except Exception as e:
+            raise Exception(f"Erro ao buscar estatísticas diárias: {str(e)}")
+    
+    def compute_dashboard_stats(self) -> Dict[str, Any]:
+        """Recalcula as estatísticas do dashboard varrendo a coleção"""
+        try:
+            try:
+                return self._dashboard_stats_from_aggregation()
+            except OperationFailure as e:
+                # Servidor sem suporte ao pipeline: calcular a partir de um único cursor
+                logging.warning(f"Agregação do dashboard indisponível, usando fallback: {e}")
+                return self._dashboard_stats_from_cursor()
             
         except Exception as e:
             raise Exception(f"Erro ao buscar estatísticas: {str(e)}")
     
-    def get_incident_count(self, filters: Optional[Dict[str, Any]] = None) -> int:
-        """Retorna o total de incidentes com filtros"""
+    def _dashboard_stats_from_aggregation(self) -> Dict[str, Any]:
+        """Calcula as estatísticas com um único pipeline $facet"""
+        result = list(self.collection.aggregate(build_dashboard_pipeline()))
+        return dashboard_stats_from_facets(result[0] if result else {})
+    
+    def _dashboard_stats_from_cursor(self, batch_size: int = 5000) -> Dict[str, Any]:
+        """Calcula as estatísticas em Python a partir de um cursor com projeção"""
+        cursor = self.collection.find({}, DASHBOARD_PROJECTION, batch_size=batch_size)
+        return dashboard_stats_from_documents(cursor)
+    
+    def get_incident_count(self, filters: Optional[Dict[str, Any]] = None, mode: str = "exact",
+                           query: Optional[Dict[str, Any]] = None) -> int:
+        """Retorna o total de incidentes com os mesmos filtros da listagem"""
         try:
-            query = {}
-            
-            if filters:
-                # Aplicar os mesmos filtros da busca
-                if "fila" in filters:
-                    fila_map = {
-                        "P2K": "fila_p2k",
-                        "CRIVO": "fila_crivo",
-                        "SG5_URA": "sg5_ura",
-                        "ALARMES": "alarmes",
-                        "TSK_VENDAS": "tsk_vendas",
-                        "SR": "sr",
-                        "RIT": "rit"
-                    }
-                    if filters["fila"] in fila_map:
-                        query["local_problema"] = fila_map[filters["fila"]]
-                
-                if "prioridade" in filters:
-                    prioridade_map = {
-                        "Crítico": "critica",
-                        "Alto": "alta",
-                        "Moderado": "media"
-                    }
-                    if filters["prioridade"] in prioridade_map:
-                        query["prioridade"] = prioridade_map[filters["prioridade"]]
-                
-                if "status" in filters:
-                    status_map = {
-                        "Em andamento": "em_andamento",
-                        "Em espera": "em_espera",
-                        "TKS Remoto": "tks_remoto",
-                        "Aberto": "aberto"
-                    }
-                    if filters["status"] in status_map:
-                        query["status"] = status_map[filters["status"]]
-            
-            return self.collection.count_documents(query)
+            return self.count(self.resolve_query(filters, query), mode)
             
         except Exception as e:
             raise Exception(f"Erro ao contar incidentes: {str(e)}")
@@ -0,0 +1,221 @@
+"""
+Registro declarativo de índices e reconciliação com o banco
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import IndexModel
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import OperationFailure
+
+
+# Opções comparadas entre o índice declarado e o existente
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def desired_indexes() -> Dict[str, List[IndexModel]]:
+    """Índices declarados por cada serviço, agrupados por coleção"""
+    from services.incident_service import INCIDENT_INDEXES
+    from services.change_service import CHANGE_INDEXES
+    from services.user_service import USER_INDEXES
+
+    return {
+        "chamados": INCIDENT_INDEXES,
+        "changes": CHANGE_INDEXES,
+        "usuarios": USER_INDEXES
+    }
+
+
+def index_key(key: Any) -> Tuple[Tuple[str, Any], ...]:
+    """Padrão de chave normalizado, usado para identificar um índice independente do nome"""
+    items = key.items() if hasattr(key, "items") else key
+    return tuple((field, int(direction) if isinstance(direction, (int, float)) else direction)
+                 for field, direction in items)
+
+
+def _options(spec: Dict[str, Any]) -> Dict[str, Any]:
+    return {option: spec[option] for option in _COMPARED_OPTIONS if spec.get(option)}
+
+
+def diff_indexes(collection: Collection, desired: List[IndexModel]) -> Dict[str, List[Any]]:
+    """Compara os índices existentes com os declarados
+
+    Retorna os índices ausentes (IndexModel), os existentes com opções
+    divergentes e os existentes que não foram declarados (nomes).
+    """
+    existing = {
+        index_key(info["key"]): (name, info)
+        for name, info in collection.index_information().items()
+        if name != "_id_"
+    }
+
+    missing, conflicting = [], []
+    declared = set()
+    for model in desired:
+        spec = model.document
+        key = index_key(spec["key"])
+        declared.add(key)
+
+        if key not in existing:
+            missing.append(model)
+        elif _options(existing[key][1]) != _options(spec):
+            conflicting.append(existing[key][0])
+
+    extra = [name for key, (name, _) in existing.items() if key not in declared]
+    return {"missing": missing, "conflicting": conflicting, "extra": extra}
+
+
+def sync_indexes(db: Database, dry_run: bool = False, drop_extra: bool = False) -> Dict[str, Dict[str, List[str]]]:
+    """Cria os índices ausentes de todas as coleções registradas
+
+    Índices com opções divergentes nunca são alterados automaticamente; os não
+    declarados só são removidos com drop_extra.
+    """
+    report = {}
+    for collection_name, desired in desired_indexes().items():
+        collection = db[collection_name]
+        diff = diff_indexes(collection, desired)
+
+        created, dropped = [], []
+        if not dry_run:
+            for model in diff["missing"]:
+                # Em servidores anteriores ao 4.2, evita bloquear a coleção durante a construção
+                spec = dict(model.document)
+                keys = list(spec.pop("key").items())
+                created.append(collection.create_index(keys, background=True, **spec))
+            if drop_extra:
+                for name in diff["extra"]:
+                    collection.drop_index(name)
+                    dropped.append(name)
+
+        report[collection_name] = {
+            "missing": [model.document["name"] for model in diff["missing"]],
+            "conflicting": diff["conflicting"],
+            "extra": diff["extra"],
+            "created": created,
+            "dropped": dropped
+        }
+    return report
+
+
+def missing_unique_indexes(db: Database) -> Dict[str, List[str]]:
+    """Índices únicos declarados que não existem (ou existem sem unique), por coleção
+
+    Sem eles, números de incidente/change e logins duplicados seriam aceitos.
+    """
+    missing = {}
+    for collection_name, desired in desired_indexes().items():
+        existing = {
+            index_key(info["key"])
+            for info in db[collection_name].index_information().values()
+            if info.get("unique")
+        }
+        names = [model.document["name"] for model in desired
+                 if model.document.get("unique") and index_key(model.document["key"]) not in existing]
+        if names:
+            missing[collection_name] = names
+    return missing
+
+
+class UniqueIndexCheck:
+    """Situação dos índices únicos do processo, exibida e exigida pelo health check
+
+    Verificada ao fim da reconciliação da inicialização. Enquanto houver índice
+    ausente (ou antes da primeira verificação), cada consulta verifica de novo;
+    com todos presentes, a verificação se repete a cada recheck_seconds.
+    """
+
+    def __init__(self, recheck_seconds: float = 60.0):
+        self.recheck_seconds = recheck_seconds
+        self._lock = threading.Lock()
+        self._missing: Optional[Dict[str, List[str]]] = None
+        self._checked_at = 0.0
+
+    def check(self, db: Database) -> Dict[str, List[str]]:
+        """Verifica os índices no banco e guarda o resultado"""
+        missing = missing_unique_indexes(db)
+        with self._lock:
+            self._missing = missing
+            self._checked_at = time.monotonic()
+        return missing
+
+    def missing(self, db: Database) -> Dict[str, List[str]]:
+        """Índices únicos ausentes, verificando de novo quando pendentes ou antigos"""
+        with self._lock:
+            missing = self._missing
+            expired = time.monotonic() - self._checked_at >= self.recheck_seconds
+        if missing is None or missing or expired:
+            return self.check(db)
+        return missing
+
+    def reset(self) -> None:
+        with self._lock:
+            self._missing = None
+
+
+def check_unique_indexes(db: Database, logger: Optional[logging.Logger] = None) -> Dict[str, List[str]]:
+    """Verifica os índices únicos e registra erro para os ausentes"""
+    logger = logger or logging.getLogger(__name__)
+    missing = unique_index_check.check(db)
+    for collection_name, names in missing.items():
+        logger.error(f"❌ Índices únicos ausentes em {collection_name}: {', '.join(names)} "
+                     f"(health check em 503 até que existam; use manage.py sync-indexes)")
+    return missing
+
+
+def sync_indexes_in_background(db: Database, logger: Optional[logging.Logger] = None) -> threading.Thread:
+    """Reconcilia os índices em uma thread separada para não atrasar a inicialização"""
+    logger = logger or logging.getLogger(__name__)
+
+    def run():
+        try:
+            report = sync_indexes(db)
+            for collection_name, result in report.items():
+                if result["created"]:
+                    logger.info(f"🗂️ Índices criados em {collection_name}: {', '.join(result['created'])}")
+                if result["conflicting"]:
+                    logger.warning(f"⚠️ Índices com opções divergentes em {collection_name}: "
+                                   f"{', '.join(result['conflicting'])} (use manage.py sync-indexes)")
+        except Exception as e:
+            logger.warning(f"⚠️ Aviso ao configurar índices: {e}")
+        try:
+            check_unique_indexes(db, logger)
+        except Exception as e:
+            logger.warning(f"⚠️ Aviso ao verificar índices únicos: {e}")
+
+    thread = threading.Thread(target=run, name="index-sync", daemon=True)
+    thread.start()
+    return thread
+
+
+def index_usage(db: Database) -> Dict[str, List[Dict[str, Any]]]:
+    """Uso de cada índice desde o último restart do servidor ($indexStats)"""
+    usage = {}
+    for collection_name, desired in desired_indexes().items():
+        declared = {index_key(model.document["key"]) for model in desired}
+        try:
+            stats = list(db[collection_name].aggregate([{"$indexStats": {}}]))
+        except OperationFailure:
+            stats = []
+
+        usage[collection_name] = sorted(
+            (
+                {
+                    "name": stat["name"],
+                    "key": dict(stat["key"]),
+                    "ops": int(stat["accesses"]["ops"]),
+                    "since": stat["accesses"]["since"],
+                    "declared": stat["name"] == "_id_" or index_key(stat["key"]) in declared
+                }
+                for stat in stats
+            ),
+            key=lambda item: item["ops"],
+            reverse=True
+        )
+    return usage
+
+
+# Instância global por processo (health check em routes/dashboard_routes.py)
+unique_index_check = UniqueIndexCheck()
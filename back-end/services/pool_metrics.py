@@ -0,0 +1,111 @@
+"""
+Métricas do pool de conexões do MongoDB a partir dos eventos do PyMongo
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+from pymongo import monitoring
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Listener que acumula uso do pool e tempos de espera no checkout
+
+    Os eventos de checkout são publicados na thread que pede a conexão, então
+    o início da espera é guardado em um threading.local.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._waits_ms: Deque[float] = deque(maxlen=window)
+        self.reset()
+
+    def reset(self) -> None:
+        """Zera os contadores (ex: após recriar o cliente)"""
+        with self._lock:
+            self._waits_ms.clear()
+            self.in_use = 0
+            self.max_in_use = 0
+            self.open = 0
+            self.checkouts = 0
+            self.checkout_failures: Dict[str, int] = {}
+            self.pools_cleared = 0
+            self.max_wait_ms = 0.0
+            self.total_wait_ms = 0.0
+
+    # Eventos de checkout
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait_ms = self._elapsed_ms()
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self._waits_ms.append(wait_ms)
+
+    def connection_check_out_failed(self, event):
+        self._elapsed_ms()
+        with self._lock:
+            reason = str(event.reason)
+            self.checkout_failures[reason] = self.checkout_failures.get(reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    # Ciclo de vida das conexões e do pool
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open = max(self.open - 1, 0)
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def _elapsed_ms(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return (time.perf_counter() - started) * 1000 if started is not None else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado atual do pool deste processo"""
+        with self._lock:
+            waits = sorted(self._waits_ms)
+            return {
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "open_connections": self.open,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "pools_cleared": self.pools_cleared,
+                "wait_ms": {
+                    "avg": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                    "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else 0.0,
+                    "max": round(self.max_wait_ms, 3)
+                }
+            }
+
+
+# Instância global por processo, registrada no cliente criado em extensions
+pool_metrics = PoolMetrics()
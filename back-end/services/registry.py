@@ -0,0 +1,76 @@
+"""
+Registro de serviços construídos sob demanda
+
+Os blueprints são importados antes de init_mongodb; por isso as rotas usam
+proxies que só constroem o serviço na primeira utilização, com o banco já
+conectado. As instâncias são compartilhadas por todos os blueprints do processo
+e reconstruídas quando o banco muda (ex: após reconnect_mongodb).
+"""
+import threading
+from typing import Any, Callable, Dict, Tuple
+from extensions import get_db
+from services.incident_service import IncidentService
+from services.change_service import ChangeService
+from services.user_service import UserService
+
+
+class ServiceRegistry:
+    """Instâncias de serviço por nome, construídas com o banco atual"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._factories: Dict[str, Callable[[Any], Any]] = {}
+        self._instances: Dict[str, Tuple[Any, Any]] = {}
+
+    def register(self, name: str, factory: Callable[[Any], Any]) -> None:
+        """Registra a função que constrói o serviço a partir do banco"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """Retorna o serviço, construindo-o se ainda não existe para o banco atual"""
+        db = get_db()
+        cached = self._instances.get(name)
+        if cached is not None and cached[0] is db:
+            return cached[1]
+
+        with self._lock:
+            cached = self._instances.get(name)
+            if cached is None or cached[0] is not db:
+                cached = (db, self._factories[name](db))
+                # Sem banco (modo mock), não guarda a instância para tentar de novo depois
+                if db is not None:
+                    self._instances[name] = cached
+            return cached[1]
+
+    def reset(self) -> None:
+        """Descarta as instâncias (serão reconstruídas na próxima utilização)"""
+        with self._lock:
+            self._instances.clear()
+
+
+class ServiceProxy:
+    """Encaminha atributos para o serviço registrado, resolvido a cada acesso"""
+
+    def __init__(self, registry: ServiceRegistry, name: str):
+        self._registry = registry
+        self._name = name
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._registry.get(self._name), attribute)
+
+    def __repr__(self) -> str:
+        return f"<ServiceProxy {self._name}>"
+
+
+# Registro global por processo
+services = ServiceRegistry()
+services.register("incidentes", lambda db: IncidentService(db=db))
+services.register("changes", lambda db: ChangeService(db=db))
+services.register("usuarios", lambda db: UserService(db=db))
+
+# Proxies usados pelos blueprints
+incident_service = ServiceProxy(services, "incidentes")
+change_service = ServiceProxy(services, "changes")
+user_service = ServiceProxy(services, "usuarios")
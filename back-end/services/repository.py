@@ -0,0 +1,223 @@
+"""
+Camada de repositório compartilhada pelos serviços
+
+Os filtros da API são traduzidos para consultas do MongoDB por tabelas
+declaradas uma única vez no módulo de cada serviço. A mesma consulta é usada
+pela página e pela contagem, então o total sempre corresponde aos itens listados.
+"""
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from bson import ObjectId
+from pymongo.collection import Collection
+from pymongo.cursor import Cursor
+from pymongo.database import Database
+from extensions import get_db
+from utils.pagination import KEYSET_SORT, KeysetPosition, apply_keyset
+from services.stats_cache import estimated_count, stats_cache
+from services.stats_counters import STATS_COUNTERS_COLLECTION
+
+
+# Prioridades aceitas nos filtros de incidentes e changes
+PRIORIDADE_FILTER_MAP = {
+    "Crítico": "critica",
+    "Alto": "alta",
+    "Moderado": "media"
+}
+
+
+def response_projection(fields: Iterable[str]) -> Dict[str, int]:
+    """Projeção que busca apenas _id e os campos da resposta ("id" vem do _id)"""
+    projection = {"_id": 1}
+    projection.update((field, 1) for field in fields if field != "id")
+    return projection
+
+
+class FieldFilter:
+    """Como um filtro da API vira a condição de um campo do banco
+
+    - values: tabela de tradução; valores fora dela são ignorados
+    - convert: função aplicada ao valor recebido (ex: str.lower)
+    - regex: busca parcial sem diferenciar maiúsculas
+    """
+    __slots__ = ("field", "values", "convert", "regex")
+
+    def __init__(self, field: str, values: Optional[Mapping[str, Any]] = None,
+                 convert: Optional[Callable[[Any], Any]] = None, regex: bool = False):
+        self.field = field
+        self.values = values
+        self.convert = convert
+        self.regex = regex
+
+    def apply(self, query: Dict[str, Any], value: Any) -> None:
+        """Adiciona a condição à query (ou nada, se o valor não é aceito)"""
+        if self.values is not None:
+            if value not in self.values:
+                return
+            value = self.values[value]
+        if self.convert is not None:
+            value = self.convert(value)
+        if self.regex:
+            value = {"$regex": value, "$options": "i"}
+        query[self.field] = value
+
+
+class QueryTranslator:
+    """Tabela de filtros da API -> query do MongoDB, montada uma vez por serviço"""
+
+    def __init__(self, filters: Dict[str, FieldFilter]):
+        self.filters = filters
+
+    def build(self, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Traduz os filtros recebidos; chaves desconhecidas são ignoradas"""
+        query: Dict[str, Any] = {}
+        if filters:
+            for name, value in filters.items():
+                field_filter = self.filters.get(name)
+                if field_filter is not None:
+                    field_filter.apply(query, value)
+        return query
+
+
+class Repository:
+    """Base dos serviços: coleção, tradução de filtros, página, contagem e resposta"""
+
+    collection_name: str = ""
+    query_translator = QueryTranslator({})
+
+    # Conversão documento -> resposta completa (staticmethod nas subclasses) e a projeção que ela precisa
+    document_to_dict: Callable[[Dict[str, Any]], Dict[str, Any]]
+    default_projection: Optional[Dict[str, Any]] = None
+    # Valores dos campos opcionais ausentes no documento (os demais viram None)
+    response_defaults: Dict[str, Any] = {}
+
+    # Chave do módulo nos contadores, na versão e no cache do dashboard (ex: "incidentes")
+    module_key: str = ""
+    # Derivados atualizados após cada escrita (None nos serviços que não os mantêm)
+    counters = None
+    trends = None
+    events = None
+    version = None
+
+    def __init__(self, db: Optional[Database] = None):
+        self.db: Database = db if db is not None else get_db()
+        if self.db is not None:
+            self.collection: Collection = self.db[self.collection_name]
+        else:
+            self.collection = None
+
+    def _after_write(self, kind: str, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        """Efeitos de uma escrita já confirmada no banco (kind: insert, update ou delete)"""
+        self._after_write_batch(kind, [(before, after)])
+
+    def _after_write_batch(self, kind: str, changes: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> None:
+        """Efeitos de um lote de escritas (antes, depois) do mesmo tipo, já confirmadas
+
+        Contadores, tendências e versão vão ao banco em um único bulk_write em
+        stats_counters. Falhas aqui não desfazem a escrita nem viram erro na
+        resposta: são registradas no log e o drift é corrigido por
+        `manage.py reconcile-stats`.
+        """
+        if not changes:
+            return
+        try:
+            operations = []
+            if self.counters is not None:
+                operations.extend(self.counters.operations(changes))
+            if self.trends is not None:
+                operations.extend(self.trends.operations(changes))
+            if self.version is not None:
+                operations.append(self.version.operation())
+            if operations:
+                self.db[STATS_COUNTERS_COLLECTION].bulk_write(operations, ordered=False)
+        except Exception as e:
+            logging.warning(f"⚠️ Aviso ao atualizar os contadores de {self.module_key} após {kind}: {e}")
+
+        if self.events is not None:
+            try:
+                self.events.record(kind, changes)
+            except Exception as e:
+                logging.warning(f"⚠️ Aviso ao publicar eventos de {self.module_key}: {e}")
+        stats_cache.invalidate(self.module_key)
+
+    def build_query(self, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Monta a query dos filtros da API (reutilizável na página e na contagem)"""
+        return self.query_translator.build(filters)
+
+    def resolve_query(self, filters: Optional[Dict[str, Any]] = None,
+                      query: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Usa a query já montada pela rota ou monta a partir dos filtros"""
+        return query if query is not None else self.build_query(filters)
+
+    def find_page(self, query: Dict[str, Any], limit: int, skip: int = 0,
+                  after: Optional[KeysetPosition] = None,
+                  projection: Optional[Dict[str, Any]] = None) -> Cursor:
+        """Página ordenada por (created_at, _id): por cursor quando informado, senão por skip"""
+        cursor = self.collection.find(apply_keyset(query, after), projection).sort(KEYSET_SORT)
+        if after is None:
+            cursor = cursor.skip(skip)
+        return cursor.limit(limit)
+
+    def count(self, query: Dict[str, Any], mode: str = "exact") -> int:
+        """Total de documentos da query (estimado via cache quando mode='estimated')"""
+        if mode == "estimated":
+            return estimated_count(self.collection, query)
+        return self.collection.count_documents(query)
+
+    def projection_for(self, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Projeção da resposta completa ou apenas dos campos pedidos"""
+        if fields is None:
+            return self.default_projection
+        return response_projection(fields)
+
+    def select_fields(self, document: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+        """Monta somente as chaves pedidas, na ordem de fields"""
+        defaults = self.response_defaults
+        return {
+            field: str(document["_id"]) if field == "id" else document.get(field, defaults.get(field))
+            for field in fields
+        }
+
+    def to_rows(self, documents: Iterable[Dict[str, Any]],
+                fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Converte documentos nos dicionários da resposta (completos ou só com fields)"""
+        if fields is None:
+            return [self.document_to_dict(document) for document in documents]
+        return [self.select_fields(document, fields) for document in documents]
+
+    def find_page_rows(self, query: Dict[str, Any], limit: int, skip: int = 0,
+                       after: Optional[KeysetPosition] = None,
+                       fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Página já convertida, buscando apenas os campos que a resposta usa"""
+        return self.to_rows(self.find_page(query, limit, skip, after, self.projection_for(fields)), fields)
+
+    def find_row_by_id(self, object_id: ObjectId,
+                       fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Documento por _id convertido para a resposta, ou None se não existe"""
+        document = self.collection.find_one({"_id": object_id}, self.projection_for(fields))
+        if document is None:
+            return None
+        return self.to_rows([document], fields)[0]
+
+    def response_columns(self, fields: Optional[Sequence[str]] = None) -> List[str]:
+        """Chaves da resposta (fields ou todas), na ordem do modelo"""
+        if fields is not None:
+            return list(fields)
+        return ["id", *(field for field in self.default_projection if field != "_id")]
+
+    def iter_rows(self, query: Dict[str, Any], fields: Optional[Sequence[str]] = None,
+                  batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Percorre todos os documentos da query em lotes, já convertidos para a resposta
+
+        O cursor busca batch_size documentos por vez, então a memória não cresce
+        com o tamanho do resultado. Ordem (created_at, _id), a mesma das listagens.
+        """
+        cursor = self.collection.find(query, self.projection_for(fields)).sort(KEYSET_SORT).batch_size(batch_size)
+        try:
+            if fields is None:
+                for document in cursor:
+                    yield self.document_to_dict(document)
+            else:
+                for document in cursor:
+                    yield self.select_fields(document, fields)
+        finally:
+            cursor.close()
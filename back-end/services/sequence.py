@@ -0,0 +1,128 @@
+"""
+Geração atômica de números sequenciais (INC-, CHG-, ...)
+"""
+import threading
+from typing import Callable, Dict, List, Optional
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+
+SEQUENCE_COLLECTION = "counters"
+
+
+def max_numeric_suffix(collection: Collection, prefix: str, field: str = "numero") -> int:
+    """Maior sufixo numérico existente (ex: INC-1000 -> 1000), comparado como número"""
+    pipeline = [
+        {"$match": {field: {"$regex": f"^{prefix}-[0-9]+$"}}},
+        {"$project": {"n": {"$toLong": {"$arrayElemAt": [{"$split": [f"${field}", "-"]}, 1]}}}},
+        {"$group": {"_id": None, "max": {"$max": "$n"}}}
+    ]
+    try:
+        result = list(collection.aggregate(pipeline))
+    except OperationFailure:
+        # Sem suporte ao pipeline ($toLong exige MongoDB 4.0; banco em memória): varrer os números
+        numbers = collection.find({field: {"$regex": f"^{prefix}-[0-9]+$"}}, {field: 1, "_id": 0})
+        return max((int(document[field].split("-")[1]) for document in numbers), default=0)
+    return int(result[0]["max"]) if result and result[0]["max"] is not None else 0
+
+
+def max_integer_value(collection: Collection, field: str = "numero") -> int:
+    """Maior valor inteiro existente no campo (numeração legada)"""
+    last = collection.find_one({field: {"$type": "number"}}, {field: 1}, sort=[(field, -1)])
+    return int(last[field]) if last else 0
+
+
+class SequenceGenerator:
+    """Sequências atômicas na coleção counters via find_one_and_update($inc)
+
+    Com block_size > 1, cada processo reserva um bloco de números de uma vez e
+    os entrega da memória, evitando uma ida ao banco por criação. Os números
+    continuam únicos, mas podem sair fora de ordem entre workers e blocos não
+    usados viram lacunas quando o processo termina.
+    """
+
+    def __init__(self, db: Optional[Database], block_size: int = 1):
+        self.collection = db[SEQUENCE_COLLECTION] if db is not None else None
+        self.block_size = max(1, block_size)
+        self._lock = threading.Lock()
+        self._blocks: Dict[str, List[int]] = {}
+        self._seeded: set = set()
+
+    def next_value(self, name: str, seed: Optional[Callable[[], int]] = None) -> int:
+        """Retorna o próximo número da sequência"""
+        with self._lock:
+            block = self._blocks.get(name)
+            if block is not None and block[0] <= block[1]:
+                value = block[0]
+                block[0] += 1
+                return value
+
+            first, last = self._reserve(name, self.block_size, seed)
+            self._blocks[name] = [first + 1, last]
+            return first
+
+    def reserve(self, name: str, count: int, seed: Optional[Callable[[], int]] = None) -> range:
+        """Reserva `count` números consecutivos em uma única operação"""
+        with self._lock:
+            first, last = self._reserve(name, count, seed)
+        return range(first, last + 1)
+
+    def _reserve(self, name: str, count: int, seed: Optional[Callable[[], int]]) -> tuple[int, int]:
+        if seed is not None and name not in self._seeded:
+            self._ensure_seeded(name, seed)
+
+        try:
+            counter = self._increment(name, count)
+        except DuplicateKeyError:
+            # Outro processo criou o contador ao mesmo tempo: repetir sem conflito
+            counter = self._increment(name, count)
+
+        last = counter["seq"]
+        return last - count + 1, last
+
+    def _increment(self, name: str, count: int) -> dict:
+        return self.collection.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"seq": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+    def resync(self, name: str, seed: Callable[[], int]) -> None:
+        """Realinha a sequência aos dados existentes e descarta o bloco reservado
+
+        Usado quando um número gerado já existe (ex: inserido fora da API, ou o
+        contador foi apagado depois da primeira utilização neste processo).
+        """
+        with self._lock:
+            self._blocks.pop(name, None)
+            self._apply_seed(name, seed())
+            self._seeded.add(name)
+
+    def _ensure_seeded(self, name: str, seed: Callable[[], int]) -> None:
+        """Inicializa o contador a partir dos dados existentes na primeira utilização"""
+        if self.collection.find_one({"_id": name}, {"_id": 1}) is None:
+            self._apply_seed(name, seed())
+        self._seeded.add(name)
+
+    def _apply_seed(self, name: str, value: int) -> None:
+        try:
+            self.collection.update_one({"_id": name}, {"$max": {"seq": value}}, upsert=True)
+        except DuplicateKeyError:
+            self.collection.update_one({"_id": name}, {"$max": {"seq": value}})
+
+
+_generators: Dict[str, SequenceGenerator] = {}
+_generators_lock = threading.Lock()
+
+
+def get_sequence_generator(db: Database, block_size: int = 1) -> SequenceGenerator:
+    """Gerador compartilhado por processo, para que os blocos reservados sejam por worker"""
+    with _generators_lock:
+        generator = _generators.get(db.name)
+        if generator is None or generator.collection.database.client is not db.client:
+            generator = SequenceGenerator(db, block_size)
+            _generators[db.name] = generator
+        return generator
@@ -0,0 +1,140 @@
+"""
+Cache de snapshots das estatísticas do dashboard
+"""
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from pymongo.collection import Collection
+from config import settings
+
+
+class _Flight:
+    """Recomputação em andamento para uma chave"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SnapshotCache:
+    """Cache de snapshots por processo com TTL e recomputação single-flight
+
+    Requisições concorrentes que encontram a chave expirada aguardam uma única
+    recomputação em vez de cada uma disparar a sua. Os valores são compartilhados
+    entre requisições e não devem ser modificados por quem os consome.
+    A invalidação vale apenas para o processo atual; os demais workers
+    dependem do TTL.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple[float, Any]] = {}
+        self._inflight: Dict[str, _Flight] = {}
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Retorna o snapshot da chave, recomputando-o se estiver expirado"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                generation = self._generations.get(key, 0)
+                self.misses += 1
+            else:
+                self.waits += 1
+
+        # Outra requisição já está recalculando: aguardar o resultado dela
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = compute()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+            raise
+
+        with self._lock:
+            # Não armazenar snapshots calculados antes de uma invalidação
+            if self.ttl_seconds > 0 and self._generations.get(key, 0) == generation:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._inflight.pop(key, None)
+
+        flight.value = value
+        flight.event.set()
+        return value
+
+    def peek(self, key: str) -> tuple[bool, Any, int]:
+        """Consulta sem recomputar: (encontrado, valor, geração atual da chave)"""
+        with self._lock:
+            generation = self._generations.get(key, 0)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return True, entry[1], generation
+            self.misses += 1
+            return False, None, generation
+    
+    def store(self, key: str, value: Any, generation: int) -> None:
+        """Armazena um valor calculado fora de get_or_compute, se a chave não foi invalidada desde `generation`"""
+        with self._lock:
+            if self.ttl_seconds > 0 and self._generations.get(key, 0) == generation:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+    
+    def invalidate(self, *keys: str) -> None:
+        """Invalida as chaves informadas (ou todas, se nenhuma for informada)"""
+        with self._lock:
+            targets = keys or tuple(set(self._entries) | set(self._generations))
+            for key in targets:
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores de uso do cache"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.waits
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "invalidations": self.invalidations,
+                "hit_ratio": round((self.hits + self.waits) / lookups, 4) if lookups else 0.0,
+                "keys": sorted(self._entries)
+            }
+
+
+# Instância global compartilhada pelos serviços e rotas do dashboard
+stats_cache = SnapshotCache(settings.STATS_CACHE_TTL_SECONDS)
+
+# Totais aproximados das listagens, por coleção e filtro normalizado
+count_cache = SnapshotCache(settings.COUNT_CACHE_TTL_SECONDS)
+
+
+def estimated_count(collection: Collection, query: Dict[str, Any]) -> int:
+    """Total aproximado: metadados da coleção sem filtros, cache curto com filtros"""
+    if not query:
+        return collection.estimated_document_count()
+    
+    key = f"{collection.name}:{json.dumps(query, sort_keys=True, default=str)}"
+    return count_cache.get_or_compute(key, lambda: collection.count_documents(query))
@@ -0,0 +1,110 @@
+"""
+Contadores de estatísticas mantidos incrementalmente na coleção stats_counters
+
+A mesma coleção guarda os rollups de tendência (services/trends.py) e as
+versões das coleções (services/versions.py): os incrementos de uma escrita vão
+ao banco em um único bulk_write (Repository._after_write).
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+
+STATS_COUNTERS_COLLECTION = "stats_counters"
+
+# Campos de controle gravados junto com os contadores
+_METADATA_FIELDS = ("_id", "rebuilt_at")
+
+
+def flatten_stats(stats: Dict[str, Any], prefix: str = "") -> Dict[str, int]:
+    """Converte estatísticas aninhadas em caminhos pontuados (ex: filas.fila_p2k)"""
+    flat = {}
+    for key, value in stats.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_stats(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def counters_from_document(document: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Remove os campos de controle de um documento de stats_counters"""
+    if document is None:
+        return None
+    return {k: v for k, v in document.items() if k not in _METADATA_FIELDS}
+
+
+class StatsCounters:
+    """Contadores por bucket de um módulo, atualizados com $inc a cada escrita
+
+    Cada módulo possui um documento em stats_counters (ex: {"_id": "incidentes"})
+    com o mesmo formato retornado por get_dashboard_stats. Os incrementos só são
+    aplicados depois que o documento foi construído por rebuild(); até lá, as
+    leituras reconstroem os contadores a partir da coleção de origem.
+    """
+
+    def __init__(self, db: Optional[Database], key: str,
+                 buckets: Callable[[Dict[str, Any]], Dict[str, int]],
+                 compute: Callable[[], Dict[str, Any]]):
+        self.collection = db[STATS_COUNTERS_COLLECTION] if db is not None else None
+        self.key = key
+        self.buckets = buckets
+        self.compute = compute
+
+    def operations(self, changes: Iterable[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> List[UpdateOne]:
+        """$inc de várias escritas (antes, depois), para um bulk_write em stats_counters"""
+        deltas = Counter()
+        for before, after in changes:
+            deltas.update(self._deltas(before, after))
+        deltas = {path: value for path, value in deltas.items() if value}
+        if not deltas:
+            return []
+        # Sem upsert: um documento parcial mascararia contadores nunca construídos
+        return [UpdateOne({"_id": self.key}, {"$inc": deltas})]
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Lê os contadores atuais (None se ainda não foram construídos)"""
+        return counters_from_document(self.collection.find_one({"_id": self.key}))
+
+    def get(self) -> Dict[str, Any]:
+        """Lê os contadores, construindo-os na primeira consulta"""
+        stats = self.read()
+        if stats is None:
+            stats = self.rebuild()["expected"]
+        return stats
+
+    def rebuild(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Recalcula os contadores a partir da coleção de origem e reporta o drift"""
+        expected = self.compute()
+        current = self.read()
+
+        drift = {}
+        if current is not None:
+            expected_flat = flatten_stats(expected)
+            current_flat = flatten_stats(current)
+            for path in sorted(set(expected_flat) | set(current_flat)):
+                diff = current_flat.get(path, 0) - expected_flat.get(path, 0)
+                if diff:
+                    drift[path] = diff
+
+        if not dry_run:
+            self.collection.replace_one(
+                {"_id": self.key},
+                {**expected, "rebuilt_at": datetime.utcnow()},
+                upsert=True
+            )
+
+        return {
+            "key": self.key,
+            "initialized": current is not None,
+            "drift": drift,
+            "expected": expected
+        }
+
+    def _deltas(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Dict[str, int]:
+        deltas = Counter(self.buckets(after) if after is not None else {})
+        deltas.subtract(self.buckets(before) if before is not None else {})
+        return {path: value for path, value in deltas.items() if value}
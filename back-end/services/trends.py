@@ -0,0 +1,427 @@
+"""
+Rollups de tendência por hora e por dia (abertos, fechados e backlog)
+
+Cada escrita incrementa com $inc o documento da hora e o do dia em que
+aconteceu (UTC), além do backlog atual do módulo, na coleção stats_counters
+(no mesmo bulk_write dos contadores do dashboard).
+A rota de tendências lê apenas os N buckets pedidos (por _id) e o backlog; o
+histórico do backlog é derivado dos fluxos, sem varrer a coleção de origem.
+As médias móveis e variações são calculadas com NumPy quando instalado.
+"""
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.collection import Collection
+from pymongo.database import Database
+from services.stats_counters import STATS_COUNTERS_COLLECTION
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Tamanho de cada bucket
+TREND_GRANULARITIES = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1)
+}
+
+# Fluxos de cada bucket: entradas no backlog (inclui reaberturas), saídas e
+# ajustes (mudança de dimensão de um item aberto, remoção de item aberto)
+TREND_FLOWS = ("abertos", "fechados", "ajustes")
+
+# Documentos por lote do cursor no backfill
+BACKFILL_BATCH_SIZE = 1000
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Início do bucket (hora ou dia) que contém o instante"""
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_id(key: str, granularity: str, start: datetime) -> str:
+    """_id do documento de rollup (ex: incidentes:day:2024-01-02T00)"""
+    return f"{key}:{granularity}:{start:%Y-%m-%dT%H}"
+
+
+def dimension_key(value: Any) -> Optional[str]:
+    """Valor de dimensão usável como nome de campo do MongoDB"""
+    if value is None or value == "":
+        return None
+    return str(value).replace(".", "_").replace("$", "_")
+
+
+def nested_value(document: Dict[str, Any], path: str) -> int:
+    """Valor de um caminho pontuado (0 se ausente)"""
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return 0
+        value = value.get(part)
+    return value if isinstance(value, (int, float)) else 0
+
+
+def _increment_nested(target: Dict[str, Any], path: str, value: int) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        target = target.setdefault(part, {})
+    target[parts[-1]] = target.get(parts[-1], 0) + value
+
+
+def backlog_deltas(flows: Dict[str, int]) -> Dict[str, int]:
+    """Variação do backlog por caminho: abertos - fechados + ajustes"""
+    deltas = Counter()
+    for path, value in flows.items():
+        flow, _, rest = path.partition(".")
+        deltas[rest] += -value if flow == "fechados" else value
+    return {path: value for path, value in deltas.items() if value}
+
+
+def _rolling_mean_python(values: List[int], window: int) -> List[float]:
+    averages = []
+    running = 0
+    for index, value in enumerate(values):
+        running += value
+        if index >= window:
+            running -= values[index - window]
+        averages.append(running / min(index + 1, window))
+    return averages
+
+
+def _delta_pct_python(values: List[int], window: int) -> Optional[float]:
+    if len(values) < 2 * window:
+        return None
+    previous = sum(values[-2 * window:-window]) / window
+    if previous == 0:
+        return None
+    return (sum(values[-window:]) / window - previous) / previous * 100
+
+
+def _series_python(opened: List[List[int]], closed: List[List[int]], adjusted: List[List[int]],
+                   current: List[int], window: int) -> List[Dict[str, Any]]:
+    series = []
+    for row_opened, row_closed, row_adjusted, now in zip(opened, closed, adjusted, current):
+        net = [o - c + a for o, c, a in zip(row_opened, row_closed, row_adjusted)]
+        # Backlog ao fim de cada bucket: o atual menos o saldo dos buckets seguintes
+        backlog = []
+        remaining = sum(net)
+        for value in net:
+            remaining -= value
+            backlog.append(now - remaining)
+        series.append({
+            "opened_avg": _rolling_mean_python(row_opened, window),
+            "closed_avg": _rolling_mean_python(row_closed, window),
+            "backlog": backlog,
+            "opened_delta_pct": _delta_pct_python(row_opened, window),
+            "closed_delta_pct": _delta_pct_python(row_closed, window)
+        })
+    return series
+
+
+def _rolling_mean_numpy(matrix, window: int):
+    periods = matrix.shape[1]
+    cumulative = numpy.concatenate([numpy.zeros((matrix.shape[0], 1)), matrix.cumsum(axis=1)], axis=1)
+    upper = numpy.arange(1, periods + 1)
+    lower = numpy.maximum(upper - window, 0)
+    return (cumulative[:, upper] - cumulative[:, lower]) / (upper - lower)
+
+
+def _delta_pct_numpy(matrix, window: int) -> List[Optional[float]]:
+    if matrix.shape[1] < 2 * window:
+        return [None] * matrix.shape[0]
+    recent = matrix[:, -window:].mean(axis=1)
+    previous = matrix[:, -2 * window:-window].mean(axis=1)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        delta = (recent - previous) / previous * 100
+    return [None if base == 0 else value for value, base in zip(delta.tolist(), previous.tolist())]
+
+
+def _series_numpy(opened: List[List[int]], closed: List[List[int]], adjusted: List[List[int]],
+                  current: List[int], window: int) -> List[Dict[str, Any]]:
+    # Uma linha por série (total e cada valor da dimensão), uma coluna por bucket
+    opened_matrix = numpy.asarray(opened, dtype=numpy.float64)
+    closed_matrix = numpy.asarray(closed, dtype=numpy.float64)
+    net = opened_matrix - closed_matrix + numpy.asarray(adjusted, dtype=numpy.float64)
+    backlog = numpy.asarray(current, dtype=numpy.float64)[:, None] - (net.sum(axis=1, keepdims=True) - net.cumsum(axis=1))
+
+    opened_avg = _rolling_mean_numpy(opened_matrix, window).tolist()
+    closed_avg = _rolling_mean_numpy(closed_matrix, window).tolist()
+    backlog = backlog.astype(numpy.int64).tolist()
+    opened_delta = _delta_pct_numpy(opened_matrix, window)
+    closed_delta = _delta_pct_numpy(closed_matrix, window)
+    return [
+        {
+            "opened_avg": opened_avg[row],
+            "closed_avg": closed_avg[row],
+            "backlog": backlog[row],
+            "opened_delta_pct": opened_delta[row],
+            "closed_delta_pct": closed_delta[row]
+        }
+        for row in range(len(opened))
+    ]
+
+
+def trend_direction(delta_pct: Optional[float], stable_pct: float) -> str:
+    """increasing/decreasing/stable a partir da variação percentual"""
+    if delta_pct is None or abs(delta_pct) <= stable_pct:
+        return "stable"
+    return "increasing" if delta_pct > 0 else "decreasing"
+
+
+def compute_series(opened: List[List[int]], closed: List[List[int]], adjusted: List[List[int]],
+                   current: List[int], window: int, stable_pct: float) -> List[Dict[str, Any]]:
+    """Médias móveis, backlog por bucket e variações de várias séries de uma vez
+
+    Cada linha das matrizes é uma série (mesmo número de buckets); current é o
+    backlog atual de cada série.
+    """
+    compute = _series_numpy if numpy is not None else _series_python
+    results = []
+    for row, computed in enumerate(compute(opened, closed, adjusted, current, window)):
+        backlog = computed["backlog"]
+        results.append({
+            "opened": opened[row],
+            "closed": closed[row],
+            "backlog": backlog,
+            "opened_avg": [round(value, 2) for value in computed["opened_avg"]],
+            "closed_avg": [round(value, 2) for value in computed["closed_avg"]],
+            "opened_delta_pct": _round_optional(computed["opened_delta_pct"]),
+            "closed_delta_pct": _round_optional(computed["closed_delta_pct"]),
+            "backlog_delta": backlog[-1] - backlog[max(len(backlog) - 1 - window, 0)] if backlog else 0,
+            "trend": trend_direction(computed["opened_delta_pct"], stable_pct)
+        })
+    return results
+
+
+def _round_optional(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+
+class TrendRollups:
+    """Rollups de tendência de um módulo (ex: {"_id": "incidentes:day:2024-01-02T00"})
+
+    Cada bucket guarda os fluxos por caminho ("total" e "<dimensão>.<valor>");
+    o documento "<módulo>:backlog" guarda o backlog atual com os mesmos
+    caminhos. Como nos contadores do dashboard, o backlog só recebe incrementos
+    depois de construído pelo backfill (rebuild); os buckets são criados sob
+    demanda a cada escrita.
+    """
+
+    def __init__(self, db: Optional[Database], key: str, source: Optional[Collection],
+                 dimensions: Dict[str, str], closed_status: Sequence[str]):
+        self.collection = db[STATS_COUNTERS_COLLECTION] if db is not None else None
+        self.key = key
+        self.source = source
+        self.dimensions = dimensions
+        self.closed_status = frozenset(closed_status)
+
+    @property
+    def backlog_id(self) -> str:
+        return f"{self.key}:backlog"
+
+    @property
+    def projection(self) -> Dict[str, int]:
+        """Campos de um documento de origem usados pelos rollups"""
+        return {"status": 1, **{field: 1 for field in self.dimensions.values()}}
+
+    def paths(self, document: Dict[str, Any]) -> List[str]:
+        """Caminhos aos quais um documento pertence (total e um por dimensão)"""
+        paths = ["total"]
+        for name, field in self.dimensions.items():
+            value = dimension_key(document.get(field))
+            if value is not None:
+                paths.append(f"{name}.{value}")
+        return paths
+
+    def is_open(self, document: Dict[str, Any]) -> bool:
+        return document.get("status") not in self.closed_status
+
+    def flows(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Dict[str, int]:
+        """Fluxos de uma escrita; somados por caminho, resultam na variação do backlog"""
+        flows = Counter()
+        was_open = before is not None and self.is_open(before)
+        now_open = after is not None and self.is_open(after)
+
+        if before is None:
+            # Criado (já fechado, se for o caso: entra e sai no mesmo bucket)
+            flows.update(f"abertos.{path}" for path in self.paths(after))
+            if not now_open:
+                flows.update(f"fechados.{path}" for path in self.paths(after))
+        elif was_open and after is None:
+            flows.subtract(f"ajustes.{path}" for path in self.paths(before))
+        elif was_open and not now_open:
+            flows.update(f"fechados.{path}" for path in self.paths(before))
+        elif now_open and not was_open:
+            flows.update(f"abertos.{path}" for path in self.paths(after))
+        elif was_open and now_open:
+            # Continua aberto: só muda de dimensão (ex: outra fila)
+            before_paths, after_paths = set(self.paths(before)), set(self.paths(after))
+            flows.update(f"ajustes.{path}" for path in after_paths - before_paths)
+            flows.subtract(f"ajustes.{path}" for path in before_paths - after_paths)
+
+        return {path: value for path, value in flows.items() if value}
+
+    def operations(self, changes: Iterable[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+                   at: Optional[datetime] = None) -> List[UpdateOne]:
+        """$inc dos buckets e do backlog de várias escritas, para um bulk_write em stats_counters"""
+        flows = Counter()
+        for before, after in changes:
+            flows.update(self.flows(before, after))
+        flows = {path: value for path, value in flows.items() if value}
+        if not flows:
+            return []
+        at = at or datetime.utcnow()
+
+        operations = []
+        for granularity in TREND_GRANULARITIES:
+            start = bucket_start(at, granularity)
+            operations.append(UpdateOne(
+                {"_id": bucket_id(self.key, granularity, start)},
+                {"$inc": flows, "$setOnInsert": {"chave": self.key, "granularidade": granularity, "inicio": start}},
+                upsert=True
+            ))
+
+        backlog = backlog_deltas(flows)
+        if backlog:
+            # Sem upsert: um backlog parcial mascararia o backfill ainda não executado
+            operations.append(UpdateOne(
+                {"_id": self.backlog_id},
+                {"$inc": {f"backlog.{path}": value for path, value in backlog.items()}}
+            ))
+        return operations
+
+    def rebuild(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Backfill: recalcula todos os buckets e o backlog a partir da coleção de origem
+
+        Abertura em created_at (ou data_criacao, no legado) e fechamento em
+        closed_at ou, na falta dele, updated_at. Reaberturas passadas não ficam
+        registradas nos documentos e portanto não entram no histórico.
+        """
+        previous = self.collection.find_one({"_id": self.backlog_id}, {"_id": 1})
+        started = datetime.utcnow()
+
+        buckets: Dict[str, Dict[str, Any]] = {}
+        backlog: Dict[str, Any] = {}
+        documents = 0
+        projection = {**self.projection, "_id": 0, "created_at": 1, "data_criacao": 1,
+                      "updated_at": 1, "closed_at": 1}
+        cursor = self.source.find({}, projection).batch_size(BACKFILL_BATCH_SIZE)
+        try:
+            for document in cursor:
+                documents += 1
+                paths = self.paths(document)
+                opened_at = document.get("created_at") or document.get("data_criacao")
+                if self.is_open(document):
+                    for path in paths:
+                        _increment_nested(backlog, path, 1)
+                if not isinstance(opened_at, datetime):
+                    continue
+                self._add(buckets, "abertos", opened_at, paths)
+                if not self.is_open(document):
+                    closed_at = document.get("closed_at") or document.get("updated_at")
+                    self._add(buckets, "fechados", closed_at if isinstance(closed_at, datetime) else opened_at, paths)
+        finally:
+            cursor.close()
+
+        if not dry_run:
+            self._replace_buckets(buckets, started)
+            self.collection.replace_one(
+                {"_id": self.backlog_id},
+                {"chave": self.key, "backlog": backlog, "rebuilt_at": datetime.utcnow()},
+                upsert=True
+            )
+
+        counts = Counter(row["granularidade"] for row in buckets.values())
+        return {
+            "key": self.key,
+            "initialized": previous is not None,
+            "documents": documents,
+            "buckets": {granularity: counts.get(granularity, 0) for granularity in TREND_GRANULARITIES},
+            "backlog": backlog.get("total", 0)
+        }
+
+    def _replace_buckets(self, buckets: Dict[str, Dict[str, Any]], started: datetime) -> None:
+        """Troca os buckets sem janela vazia: substitui cada um e só depois remove os que sobraram
+
+        A coleção é compartilhada com os contadores, então não dá para montar uma
+        cópia e renomeá-la. Cada ReplaceOne troca um bucket inteiro de uma vez e
+        marca a reconstrução; os buckets anteriores ao início da varredura sem a
+        marca não existem mais na origem e são removidos. Os buckets a partir do
+        início da varredura podem ter sido criados por escritas concorrentes e
+        são mantidos.
+        """
+        token = uuid.uuid4().hex
+        rows = [ReplaceOne({"_id": identifier}, {**row, "reconstrucao": token}, upsert=True)
+                for identifier, row in buckets.items()]
+        for offset in range(0, len(rows), BACKFILL_BATCH_SIZE):
+            self.collection.bulk_write(rows[offset:offset + BACKFILL_BATCH_SIZE], ordered=False)
+        for granularity in TREND_GRANULARITIES:
+            self.collection.delete_many({
+                "_id": {"$regex": f"^{self.key}:{granularity}:"},
+                "reconstrucao": {"$ne": token},
+                "inicio": {"$lt": bucket_start(started, granularity)}
+            })
+
+    def _add(self, buckets: Dict[str, Dict[str, Any]], flow: str, moment: datetime, paths: List[str]) -> None:
+        for granularity in TREND_GRANULARITIES:
+            start = bucket_start(moment, granularity)
+            identifier = bucket_id(self.key, granularity, start)
+            row = buckets.get(identifier)
+            if row is None:
+                row = buckets[identifier] = {"_id": identifier, "chave": self.key,
+                                             "granularidade": granularity, "inicio": start}
+            for path in paths:
+                _increment_nested(row, f"{flow}.{path}", 1)
+
+    def read_backlog(self) -> Dict[str, Any]:
+        """Backlog atual por caminho (vazio até o backfill: manage.py backfill-trends)
+
+        O backfill varre a coleção de origem inteira; não é executado em uma
+        requisição.
+        """
+        document = self.collection.find_one({"_id": self.backlog_id}) or {}
+        return document.get("backlog", {})
+
+    def read_buckets(self, granularity: str, periods: int,
+                     now: Optional[datetime] = None) -> Tuple[List[datetime], List[Dict[str, Any]]]:
+        """Os últimos `periods` buckets até o atual, buscados por _id (buckets vazios viram {})"""
+        end = bucket_start(now or datetime.utcnow(), granularity)
+        step = TREND_GRANULARITIES[granularity]
+        starts = [end - step * (periods - 1 - index) for index in range(periods)]
+        ids = [bucket_id(self.key, granularity, start) for start in starts]
+        found = {document["_id"]: document for document in self.collection.find({"_id": {"$in": ids}})}
+        return starts, [found.get(identifier, {}) for identifier in ids]
+
+    def series(self, granularity: str, periods: int, window: int, stable_pct: float,
+               dimension: Optional[str] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Séries do total e, com dimension, de cada valor dela"""
+        backlog = self.read_backlog()
+        starts, documents = self.read_buckets(granularity, periods, now)
+
+        paths = ["total"]
+        if dimension is not None:
+            values = set(backlog.get(dimension, {}))
+            for document in documents:
+                for flow in TREND_FLOWS:
+                    values.update(document.get(flow, {}).get(dimension, {}))
+            paths.extend(f"{dimension}.{value}" for value in sorted(values))
+
+        def matrix(flow: str) -> List[List[int]]:
+            return [[nested_value(document, f"{flow}.{path}") for document in documents] for path in paths]
+
+        computed = compute_series(
+            matrix("abertos"), matrix("fechados"), matrix("ajustes"),
+            [nested_value(backlog, path) for path in paths],
+            window, stable_pct
+        )
+        rows = dict(zip(paths, computed))
+        return {
+            "buckets": starts,
+            "total": rows.pop("total"),
+            "breakdown": {path.split(".", 1)[1]: row for path, row in rows.items()} if dimension else None
+        }
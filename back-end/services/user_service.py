@@ -2,35 +2,113 @@
 Serviço de Usuários - Lógica de negócio
 """
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 from bson import ObjectId
-from pymongo.collection import Collection
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
 from pymongo.database import Database
-from extensions import get_db
+from pymongo.errors import DuplicateKeyError
+from utils.pagination import KeysetPosition
+from services.repository import FieldFilter, QueryTranslator, Repository, response_projection
+from services.stats_counters import StatsCounters
+from services.versions import CollectionVersion
 from models.user_model import UserCreate, UserUpdate, UserModel, UserResponse
 
 
-class UserService:
+# Grupos exibidos no dashboard de usuários
+DASHBOARD_GRUPOS = ['TI Infraestrutura', 'TI Sistemas', 'TI Vendas', 'TI Monitoramento', 'TI Dados', 'TI Segurança', 'TI Integração']
+
+# Campos necessários para calcular as estatísticas do dashboard
+DASHBOARD_PROJECTION = {"_id": 0, "ativo": 1, "grupo": 1}
+
+# Índices da coleção usuarios (unicidade de login e filtros da listagem)
+USER_INDEXES = [
+    IndexModel([("username", ASCENDING)], unique=True),
+    IndexModel([("email", ASCENDING)], unique=True),
+    IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("grupo", ASCENDING), ("ativo", ASCENDING), ("created_at", DESCENDING)]),
+    IndexModel([("ativo", ASCENDING), ("created_at", DESCENDING)])
+]
+
+# Filtros da listagem: grupo/ativo exatos, username/nome por busca parcial
+USER_FILTERS = QueryTranslator({
+    "grupo": FieldFilter("grupo"),
+    "ativo": FieldFilter("ativo"),
+    "username": FieldFilter("username", regex=True),
+    "nome_completo": FieldFilter("nome_completo", regex=True)
+})
+
+# Campos da resposta da listagem, na ordem do modelo UserResponse
+USER_RESPONSE_FIELDS = ("username", "email", "nome_completo", "grupo", "ativo", "created_at", "updated_at", "last_login")
+USER_RESPONSE_PROJECTION = response_projection(USER_RESPONSE_FIELDS)
+
+
+def user_stat_buckets(user: Dict[str, Any]) -> Dict[str, int]:
+    """Buckets do dashboard aos quais um usuário pertence"""
+    buckets = {"total_usuarios": 1}
+    if user.get("ativo") is True:
+        buckets["usuarios_ativos"] = 1
+    elif user.get("ativo") is False:
+        buckets["usuarios_inativos"] = 1
+    if user.get("grupo") in DASHBOARD_GRUPOS:
+        buckets[f"usuarios_por_grupo.{user['grupo']}"] = 1
+    return buckets
+
+
+def duplicate_user_field(error: DuplicateKeyError) -> str:
+    """Identifica qual índice único (username ou email) gerou o DuplicateKeyError"""
+    key_value = (error.details or {}).get("keyValue") or {}
+    if "email" in key_value or ("username" not in key_value and "email" in str(error)):
+        return "email"
+    return "username"
+
+
+def user_to_dict(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Equivalente a user_to_response(...).dict(), sem validação do Pydantic"""
+    return {
+        "id": str(user["_id"]),
+        "username": user["username"],
+        "email": user["email"],
+        "nome_completo": user["nome_completo"],
+        "grupo": user["grupo"],
+        "ativo": user["ativo"],
+        "created_at": user["created_at"],
+        "updated_at": user.get("updated_at"),
+        "last_login": user.get("last_login")
+    }
+
+
+def user_to_response(user: Dict[str, Any]) -> UserResponse:
+    """Converte um documento de usuário em resposta da API"""
+    return UserResponse(
+        id=str(user["_id"]),
+        username=user["username"],
+        email=user["email"],
+        nome_completo=user["nome_completo"],
+        grupo=user["grupo"],
+        ativo=user["ativo"],
+        created_at=user["created_at"],
+        updated_at=user.get("updated_at"),
+        last_login=user.get("last_login")
+    )
+
+
+class UserService(Repository):
     """Serviço para gerenciar usuários"""
     
-    def __init__(self):
-        self.db: Database = get_db()
-        if self.db is not None:
-            self.collection: Collection = self.db.usuarios
-        else:
-            self.collection = None
+    collection_name = "usuarios"
+    module_key = "usuarios"
+    query_translator = USER_FILTERS
+    document_to_dict = staticmethod(user_to_dict)
+    default_projection = USER_RESPONSE_PROJECTION
+    
+    def __init__(self, db: Optional[Database] = None):
+        super().__init__(db)
+        self.counters = StatsCounters(self.db, "usuarios", user_stat_buckets, self.compute_dashboard_stats)
+        self.version = CollectionVersion(self.db, "usuarios")
     
     def create_user(self, user_data: UserCreate) -> UserResponse:
         """Cria um novo usuário"""
         try:
-            # Verificar se username já existe
-            if self.collection.find_one({"username": user_data.username}):
-                raise ValueError(f"Usuário com username {user_data.username} já existe")
-            
-            # Verificar se email já existe
-            if self.collection.find_one({"email": user_data.email}):
-                raise ValueError(f"Usuário com email {user_data.email} já existe")
-            
             # TODO: Implementar hash da senha
             # Por enquanto, armazenar senha em texto plano (NÃO RECOMENDADO PARA PRODUÇÃO)
             # Em produção, usar: hashlib.sha256(user_data.password.encode()).hexdigest()
@@ -41,25 +119,20 @@ class UserService:
             user_dict["updated_at"] = None
             user_dict["last_login"] = None
             
-            # Inserir no banco
-            result = self.collection.insert_one(user_dict)
+            # Inserir no banco (os índices únicos de username e email rejeitam duplicatas)
+            try:
+                self.collection.insert_one(user_dict)
+            except DuplicateKeyError as e:
+                field = duplicate_user_field(e)
+                raise ValueError(f"Usuário com {field} {user_dict[field]} já existe")
             
-            # Buscar usuário criado
-            created_user = self.collection.find_one({"_id": result.inserted_id})
+            self._after_write("insert", None, user_dict)
             
-            # Converter para resposta (sem senha)
-            return UserResponse(
-                id=str(created_user["_id"]),
-                username=created_user["username"],
-                email=created_user["email"],
-                nome_completo=created_user["nome_completo"],
-                grupo=created_user["grupo"],
-                ativo=created_user["ativo"],
-                created_at=created_user["created_at"],
-                updated_at=created_user.get("updated_at"),
-                last_login=created_user.get("last_login")
-            )
+            # Converter para resposta sem senha (insert_one preenche o _id no próprio dicionário)
+            return user_to_response(user_dict)
             
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Erro ao criar usuário: {str(e)}")
     
@@ -74,17 +147,7 @@ class UserService:
             if not user:
                 return None
             
-            return UserResponse(
-                id=str(user["_id"]),
-                username=user["username"],
-                email=user["email"],
-                nome_completo=user["nome_completo"],
-                grupo=user["grupo"],
-                ativo=user["ativo"],
-                created_at=user["created_at"],
-                updated_at=user.get("updated_at"),
-                last_login=user.get("last_login")
-            )
+            return user_to_response(user)
             
         except Exception as e:
             raise Exception(f"Erro ao buscar usuário: {str(e)}")
@@ -113,88 +176,75 @@ class UserService:
             raise Exception(f"Erro ao buscar usuário por username: {str(e)}")
     
     def get_users(self, filters: Optional[Dict[str, Any]] = None, 
-                 limit: int = 100, skip: int = 0) -> List[UserResponse]:
-        """Lista usuários com filtros opcionais"""
+                 limit: int = 100, skip: int = 0,
+                 after: Optional[KeysetPosition] = None,
+                 query: Optional[Dict[str, Any]] = None) -> List[UserResponse]:
+        """Lista usuários com filtros opcionais (ou com a query já montada por build_query)"""
         try:
-            # Construir query de filtros
-            query = {}
-            
-            if filters:
-                if "grupo" in filters:
-                    query["grupo"] = filters["grupo"]
-                
-                if "ativo" in filters:
-                    query["ativo"] = filters["ativo"]
-                
-                if "username" in filters:
-                    query["username"] = {"$regex": filters["username"], "$options": "i"}
-                
-                if "nome_completo" in filters:
-                    query["nome_completo"] = {"$regex": filters["nome_completo"], "$options": "i"}
-            
-            # Executar query
-            cursor = self.collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
+            cursor = self.find_page(self.resolve_query(filters, query), limit, skip, after)
             
             # Converter para lista de respostas
-            users = []
-            for user in cursor:
-                users.append(UserResponse(
-                    id=str(user["_id"]),
-                    username=user["username"],
-                    email=user["email"],
-                    nome_completo=user["nome_completo"],
-                    grupo=user["grupo"],
-                    ativo=user["ativo"],
-                    created_at=user["created_at"],
-                    updated_at=user.get("updated_at"),
-                    last_login=user.get("last_login")
-                ))
-            
-            return users
+            return [user_to_response(user) for user in cursor]
             
         except Exception as e:
             raise Exception(f"Erro ao listar usuários: {str(e)}")
     
+    def get_user_page(self, filters: Optional[Dict[str, Any]] = None,
+                      limit: int = 100, skip: int = 0,
+                      after: Optional[KeysetPosition] = None,
+                      query: Optional[Dict[str, Any]] = None,
+                      fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Lista usuários já como dicionários da resposta (todos os campos de UserResponse ou os de fields)"""
+        try:
+            return self.find_page_rows(self.resolve_query(filters, query), limit, skip, after, fields)
+            
+        except Exception as e:
+            raise Exception(f"Erro ao listar usuários: {str(e)}")
+    
+    def get_user_data(self, user_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Busca usuário por ID já como dicionário da resposta (completo ou só com fields)"""
+        try:
+            if not ObjectId.is_valid(user_id):
+                raise ValueError("ID de usuário inválido")
+            
+            return self.find_row_by_id(ObjectId(user_id), fields)
+            
+        except Exception as e:
+            raise Exception(f"Erro ao buscar usuário: {str(e)}")
+    
     def update_user(self, user_id: str, update_data: UserUpdate) -> Optional[UserResponse]:
         """Atualiza um usuário existente"""
         try:
             if not ObjectId.is_valid(user_id):
                 raise ValueError("ID de usuário inválido")
             
-            # Verificar se username já existe (se estiver sendo alterado)
-            if update_data.username:
-                existing_user = self.collection.find_one({
-                    "username": update_data.username,
-                    "_id": {"$ne": ObjectId(user_id)}
-                })
-                if existing_user:
-                    raise ValueError(f"Username {update_data.username} já está em uso")
-            
-            # Verificar se email já existe (se estiver sendo alterado)
-            if update_data.email:
-                existing_user = self.collection.find_one({
-                    "email": update_data.email,
-                    "_id": {"$ne": ObjectId(user_id)}
-                })
-                if existing_user:
-                    raise ValueError(f"Email {update_data.email} já está em uso")
-            
             # Preparar dados para atualização
             update_dict = update_data.dict(exclude_unset=True)
             update_dict["updated_at"] = datetime.utcnow()
             
-            # Atualizar no banco
-            result = self.collection.update_one(
-                {"_id": ObjectId(user_id)},
-                {"$set": update_dict}
-            )
-            
-            if result.matched_count == 0:
+            # Atualizar no banco em uma única ida: a versão anterior alimenta os
+            # contadores e a resposta é a versão anterior com o $set aplicado
+            try:
+                previous = self.collection.find_one_and_update(
+                    {"_id": ObjectId(user_id)},
+                    {"$set": update_dict},
+                    return_document=ReturnDocument.BEFORE
+                )
+            except DuplicateKeyError as e:
+                field = duplicate_user_field(e)
+                label = "Username" if field == "username" else "Email"
+                raise ValueError(f"{label} {update_dict[field]} já está em uso")
+            
+            if previous is None:
                 return None
             
-            # Buscar usuário atualizado
-            return self.get_user_by_id(user_id)
+            updated = {**previous, **update_dict}
+            self._after_write("update", previous, updated)
             
+            return user_to_response(updated)
+            
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Erro ao atualizar usuário: {str(e)}")
     
@@ -204,9 +254,17 @@ class UserService:
             if not ObjectId.is_valid(user_id):
                 raise ValueError("ID de usuário inválido")
             
-            result = self.collection.delete_one({"_id": ObjectId(user_id)})
+            deleted = self.collection.find_one_and_delete(
+                {"_id": ObjectId(user_id)},
+                projection=DASHBOARD_PROJECTION
+            )
+            
+            if deleted is None:
+                return False
+            
+            self._after_write("delete", deleted, None)
             
-            return result.deleted_count > 0
+            return True
             
         except Exception as e:
             raise Exception(f"Erro ao deletar usuário: {str(e)}")
@@ -272,7 +330,15 @@ class UserService:
             raise Exception(f"Erro ao alterar senha: {str(e)}")
     
     def get_dashboard_stats(self) -> Dict[str, Any]:
-        """Retorna estatísticas para o dashboard"""
+        """Retorna estatísticas para o dashboard a partir dos contadores incrementais"""
+        try:
+            return self.counters.get()
+            
+        except Exception as e:
+            raise Exception(f"Erro ao buscar estatísticas: {str(e)}")
+    
+    def compute_dashboard_stats(self) -> Dict[str, Any]:
+        """Recalcula as estatísticas do dashboard varrendo a coleção"""
         try:
             stats = {
                 "total_usuarios": self.collection.count_documents({}),
@@ -282,8 +348,7 @@ class UserService:
             }
             
             # Estatísticas por grupo
-            grupos = ['TI Infraestrutura', 'TI Sistemas', 'TI Vendas', 'TI Monitoramento', 'TI Dados', 'TI Segurança', 'TI Integração']
-            for grupo in grupos:
+            for grupo in DASHBOARD_GRUPOS:
                 stats["usuarios_por_grupo"][grupo] = self.collection.count_documents({"grupo": grupo})
             
             return stats
@@ -291,19 +356,11 @@ class UserService:
         except Exception as e:
             raise Exception(f"Erro ao buscar estatísticas: {str(e)}")
     
-    def get_user_count(self, filters: Optional[Dict[str, Any]] = None) -> int:
-        """Retorna o total de usuários com filtros"""
+    def get_user_count(self, filters: Optional[Dict[str, Any]] = None, mode: str = "exact",
+                       query: Optional[Dict[str, Any]] = None) -> int:
+        """Retorna o total de usuários com os mesmos filtros da listagem"""
         try:
-            query = {}
-            
-            if filters:
-                if "grupo" in filters:
-                    query["grupo"] = filters["grupo"]
-                
-                if "ativo" in filters:
-                    query["ativo"] = filters["ativo"]
-            
-            return self.collection.count_documents(query)
+            return self.count(self.resolve_query(filters, query), mode)
             
         except Exception as e:
             raise Exception(f"Erro ao contar usuários: {str(e)}")
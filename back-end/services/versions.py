@@ -0,0 +1,108 @@
+"""
+Versões por coleção usadas nas ETags das respostas GET (utils/conditional.py)
+
+Cada módulo tem um documento em stats_counters (ex: {"_id": "incidentes:versao"})
+com um contador incrementado a cada escrita feita pela API e um identificador
+aleatório gravado na criação do documento. O par identifica o estado da coleção
+sem consultá-la: um banco recriado (ex: em memória) gera novos identificadores,
+e as ETags emitidas antes deixam de coincidir.
+
+Escritas feitas fora da API (shell do MongoDB, importações) não incrementam as
+versões; nesses casos use `manage.py reconcile-stats`, que as incrementa.
+"""
+import threading
+import uuid
+from typing import Dict, Iterable, List, Optional
+from pymongo import UpdateOne
+from pymongo.database import Database
+from services.stats_cache import count_cache, stats_cache
+from services.stats_counters import STATS_COUNTERS_COLLECTION
+
+
+def version_id(key: str) -> str:
+    """_id do documento de versão do módulo, ao lado dos contadores"""
+    return f"{key}:versao"
+
+
+class CollectionVersion:
+    """Contador de versão de um módulo, incrementado com $inc a cada escrita"""
+
+    def __init__(self, db: Optional[Database], key: str):
+        self.db = db
+        self.collection = db[STATS_COUNTERS_COLLECTION] if db is not None else None
+        self.key = key
+
+    def bump(self) -> None:
+        """Registra uma escrita no módulo"""
+        if self.collection is None:
+            return
+        self.collection.bulk_write([self.operation()])
+
+    def operation(self) -> UpdateOne:
+        """$inc da versão, para o bulk_write dos contadores de uma escrita"""
+        return UpdateOne(
+            {"_id": version_id(self.key)},
+            {"$inc": {"versao": 1}, "$setOnInsert": {"origem": uuid.uuid4().hex}},
+            upsert=True
+        )
+
+    def current(self) -> Optional[str]:
+        """Versão atual (None sem banco)"""
+        return current_versions(self.db, [self.key]).get(self.key)
+
+
+def read_versions(db: Optional[Database], keys: Iterable[str]) -> Dict[str, str]:
+    """Versões dos módulos (origem.versao) em uma única consulta, criando as ausentes"""
+    keys = list(keys)
+    if db is None or not keys:
+        return {}
+    collection = db[STATS_COUNTERS_COLLECTION]
+    found = {document["_id"]: document
+             for document in collection.find({"_id": {"$in": [version_id(key) for key in keys]}})}
+    for key in keys:
+        if version_id(key) not in found:
+            # Primeira leitura: cria o documento sem alterar um concorrente já criado
+            collection.update_one(
+                {"_id": version_id(key)},
+                {"$setOnInsert": {"versao": 0, "origem": uuid.uuid4().hex}},
+                upsert=True
+            )
+            found[version_id(key)] = collection.find_one({"_id": version_id(key)})
+    versions = {key: found[version_id(key)] for key in keys}
+    return {key: f"{document['origem']}.{document['versao']}" for key, document in versions.items()}
+
+
+class VersionObserver:
+    """Última versão de cada módulo vista pelo processo
+
+    Os caches do processo (stats_cache, count_cache) só são invalidados pelas
+    escritas do próprio worker. Uma versão diferente da última vista indica uma
+    escrita em outro worker: sem invalidar os caches, a ETag nova seria emitida
+    com um snapshot anterior à escrita e mantida por 304 até a escrita seguinte.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen: Dict[str, str] = {}
+
+    def changed(self, versions: Dict[str, str]) -> List[str]:
+        """Módulos cuja versão mudou desde a última leitura"""
+        with self._lock:
+            changed = [key for key, version in versions.items() if self._seen.get(key) != version]
+            self._seen.update(versions)
+            return changed
+
+
+def current_versions(db: Optional[Database], keys: Iterable[str]) -> Dict[str, str]:
+    """Versões dos módulos para as ETags, invalidando os caches do processo dos que mudaram"""
+    versions = read_versions(db, keys)
+    changed = version_observer.changed(versions)
+    if changed:
+        stats_cache.invalidate(*changed)
+        # As chaves de count_cache são por coleção e filtro: descarta todas
+        count_cache.invalidate()
+    return versions
+
+
+# Instância global por processo
+version_observer = VersionObserver()
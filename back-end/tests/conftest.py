@@ -0,0 +1,40 @@
+"""
+Configuração compartilhada dos testes
+
+Os testes rodam sobre o banco em memória (utils/memory_store.py), sem MongoDB.
+As variáveis de ambiente são definidas antes de importar config.settings.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATA_BACKEND", "memory")
+os.environ.setdefault("MOCK_DATA_INCIDENTS", "40")
+os.environ.setdefault("MOCK_DATA_CHANGES", "20")
+os.environ.setdefault("MOCK_DATA_USERS", "10")
+os.environ.setdefault("DAILY_STATS_REFRESH_SECONDS", "0")
+os.environ.setdefault("STATS_CACHE_TTL_SECONDS", "0")
+
+import pytest
+
+
+@pytest.fixture
+def memory_db():
+    """Banco em memória vazio, com os índices declarados pelos serviços"""
+    from utils.memory_store import create_memory_database
+    return create_memory_database("testes")
+
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Aplicação com um banco em memória novo (app.log gravado no diretório temporário)"""
+    import extensions
+    from app import create_app
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(extensions, "memory_db", None)
+    app = create_app()
+    app.testing = True
+    return app.test_client()
@@ -0,0 +1,61 @@
+"""
+Caminho assíncrono do dashboard: cache compartilhado e fallback sem o Motor
+"""
+import asyncio
+
+import pytest
+from services.async_runtime import AsyncRuntime
+from services.async_services import cached_stats
+from services.stats_cache import stats_cache
+
+
+@pytest.fixture
+def runtime():
+    runtime = AsyncRuntime()
+    yield runtime
+    runtime.close()
+
+
+@pytest.fixture
+def cache_ttl(monkeypatch):
+    monkeypatch.setattr(stats_cache, "ttl_seconds", 60)
+    stats_cache.invalidate()
+    yield
+    stats_cache.invalidate()
+
+
+def test_cached_stats_shares_snapshots_with_the_sync_path(runtime, cache_ttl):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"total": 1}
+
+    async def concurrent():
+        return await asyncio.gather(*(cached_stats("incidentes", compute) for _ in range(3)))
+
+    # Leituras concorrentes no loop aguardam uma única consulta
+    assert runtime.run(concurrent()) == [{"total": 1}] * 3
+    assert len(calls) == 1
+    # O caminho síncrono encontra o snapshot gravado pelo assíncrono
+    assert stats_cache.get_or_compute("incidentes", lambda: {"total": 2}) == {"total": 1}
+
+
+def test_cached_stats_skips_store_after_invalidation(runtime, cache_ttl):
+    async def compute():
+        # Escrita concluída durante a leitura
+        stats_cache.invalidate("changes")
+        return {"total": 1}
+
+    runtime.run(cached_stats("changes", compute))
+    assert stats_cache.get_or_compute("changes", lambda: {"total": 2}) == {"total": 2}
+
+
+def test_overview_uses_thread_fanout_on_the_memory_backend(client):
+    from services.async_runtime import async_runtime
+
+    assert not async_runtime.available()
+    response = client.get("/api/dashboard/overview")
+    assert response.status_code == 200
+    assert async_runtime.max_pool_size == 0
@@ -0,0 +1,84 @@
+"""
+GET condicional: ETag, If-None-Match -> 304 e invalidação a cada escrita
+"""
+from services.versions import CollectionVersion
+
+
+INCIDENT = {
+    "numero": "",
+    "titulo": "Falha no PDV",
+    "descricao": "PDV não finaliza vendas",
+    "prioridade": "alta",
+    "status": "aberto",
+    "tipo_tarefa": "suporte",
+    "grupo_designado": "N2",
+    "local_problema": "fila_p2k"
+}
+
+
+def etag_of(response):
+    return response.headers["ETag"].strip('"')
+
+
+def test_matching_etag_returns_304_without_body(client):
+    first = client.get("/api/incidentes/?per_page=10")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"]
+
+    second = client.get("/api/incidentes/?per_page=10", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+    assert second.data == b""
+    assert etag_of(second) == etag_of(first)
+
+
+def test_query_order_does_not_change_etag(client):
+    first = client.get("/api/incidentes/?per_page=10&status=aberto")
+    second = client.get("/api/incidentes/?status=aberto&per_page=10")
+    assert etag_of(first) == etag_of(second)
+    assert etag_of(first) != etag_of(client.get("/api/incidentes/?per_page=20&status=aberto"))
+
+
+def test_create_invalidates_list_and_dashboard(client):
+    listing = client.get("/api/incidentes/?per_page=10")
+    overview = client.get("/api/dashboard/overview")
+
+    created = client.post("/api/incidentes/", json=INCIDENT)
+    assert created.status_code == 201
+
+    after = client.get("/api/incidentes/?per_page=10", headers={"If-None-Match": listing.headers["ETag"]})
+    assert after.status_code == 200
+    assert etag_of(after) != etag_of(listing)
+    assert client.get("/api/dashboard/overview",
+                      headers={"If-None-Match": overview.headers["ETag"]}).status_code == 200
+
+
+def test_update_invalidates_detail_only_after_the_write(client):
+    incident_id = client.post("/api/incidentes/", json=INCIDENT).json["data"]["id"]
+    detail = client.get(f"/api/incidentes/{incident_id}")
+    etag = detail.headers["ETag"]
+    assert client.get(f"/api/incidentes/{incident_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.put(f"/api/incidentes/{incident_id}", json={"status": "fechado"}).status_code == 200
+    updated = client.get(f"/api/incidentes/{incident_id}", headers={"If-None-Match": etag})
+    assert updated.status_code == 200
+    assert updated.json["data"]["status"] == "fechado"
+
+
+def test_write_in_another_module_keeps_etag(client):
+    import extensions
+
+    listing = client.get("/api/incidentes/?per_page=10")
+    CollectionVersion(extensions.get_db(), "changes").bump()
+    assert client.get("/api/incidentes/?per_page=10",
+                      headers={"If-None-Match": listing.headers["ETag"]}).status_code == 304
+
+
+def test_version_bump_from_another_worker_invalidates(client):
+    import extensions
+    overview = client.get("/api/dashboard/overview")
+
+    # Escrita atendida por outro processo: só a versão em stats_counters muda
+    CollectionVersion(extensions.get_db(), "incidentes").bump()
+    after = client.get("/api/dashboard/overview", headers={"If-None-Match": overview.headers["ETag"]})
+    assert after.status_code == 200
+    assert etag_of(after) != etag_of(overview)
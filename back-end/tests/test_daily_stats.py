@@ -0,0 +1,135 @@
+"""
+Marcação de closed_at nas mudanças de status e materialização de daily_stats
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from models.incident_model import IncidentCreate, IncidentUpdate
+from services.daily_stats import (
+    DAILY_STATS_COLLECTION,
+    DailyStats,
+    closed_moment,
+    daily_counts_from_documents,
+    day_start,
+    status_update
+)
+from services.incident_service import INCIDENT_CLOSED_STATUS, IncidentService
+
+
+NOW = datetime(2024, 3, 10, 15, 0)
+
+
+def incident_payload(**overrides):
+    data = {
+        "numero": "",
+        "titulo": "Falha no PDV",
+        "descricao": "PDV não finaliza vendas",
+        "prioridade": "alta",
+        "status": "aberto",
+        "tipo_tarefa": "suporte",
+        "grupo_designado": "N2",
+        "local_problema": "fila_p2k"
+    }
+    data.update(overrides)
+    return IncidentCreate(**data)
+
+
+@pytest.fixture
+def incidents(memory_db):
+    return IncidentService(memory_db)
+
+
+def closed_at_of(service, numero):
+    return service.collection.find_one({"numero": numero}).get("closed_at")
+
+
+def test_status_update_marks_closing():
+    update = status_update({"status": "fechado"}, INCIDENT_CLOSED_STATUS, NOW)
+    assert update == {"$set": {"status": "fechado"}, "$min": {"closed_at": NOW}}
+
+
+def test_status_update_unsets_on_reopen():
+    update = status_update({"status": "em_andamento"}, INCIDENT_CLOSED_STATUS, NOW)
+    assert update == {"$set": {"status": "em_andamento"}, "$unset": {"closed_at": ""}}
+
+
+def test_status_update_without_status_keeps_closed_at():
+    assert status_update({"titulo": "Outro"}, INCIDENT_CLOSED_STATUS, NOW) == {"$set": {"titulo": "Outro"}}
+
+
+def test_closed_at_transitions(incidents):
+    created = incidents.create_incident(incident_payload())
+    assert closed_at_of(incidents, created.numero) is None
+
+    incidents.update_incident(created.id, IncidentUpdate(status="resolvido"))
+    first = closed_at_of(incidents, created.numero)
+    assert isinstance(first, datetime)
+
+    # Fechado -> fechado mantém a data do primeiro fechamento
+    incidents.update_incident(created.id, IncidentUpdate(status="fechado"))
+    assert closed_at_of(incidents, created.numero) == first
+
+    # Outros campos não mexem em closed_at
+    incidents.update_incident(created.id, IncidentUpdate(titulo="Falha no PDV da loja 2"))
+    assert closed_at_of(incidents, created.numero) == first
+
+    # Reabertura remove closed_at
+    incidents.update_incident(created.id, IncidentUpdate(status="aberto"))
+    assert closed_at_of(incidents, created.numero) is None
+
+
+def test_created_closed_is_stamped_with_creation(incidents):
+    created = incidents.create_incident(incident_payload(status="fechado"))
+    document = incidents.collection.find_one({"numero": created.numero})
+    assert document["closed_at"] == document["created_at"]
+
+
+def test_closed_without_closed_at_falls_back_to_updated_at():
+    opened, updated = NOW - timedelta(days=3), NOW - timedelta(days=1)
+    assert closed_moment({"status": "fechado", "created_at": opened, "updated_at": updated},
+                         INCIDENT_CLOSED_STATUS) == updated
+    assert closed_moment({"status": "fechado", "created_at": opened}, INCIDENT_CLOSED_STATUS) == opened
+    assert closed_moment({"status": "aberto", "created_at": opened, "updated_at": updated},
+                         INCIDENT_CLOSED_STATUS) is None
+
+    days = daily_counts_from_documents(
+        [{"status": "fechado", "created_at": opened, "updated_at": updated}],
+        NOW - timedelta(days=7), INCIDENT_CLOSED_STATUS
+    )
+    assert days[day_start(opened)]["abertos"] == 1
+    assert days[day_start(updated)]["fechados"] == 1
+
+
+def test_refresh_counts_legacy_closed_documents(incidents):
+    opened, updated = NOW - timedelta(days=2), NOW - timedelta(days=1)
+    incidents.collection.insert_one({"numero": "INC-900", "status": "fechado", "created_at": opened,
+                                     "updated_at": updated})
+    incidents.daily_stats.refresh(now=NOW)
+    days = {day["dia"]: day for day in incidents.daily_stats.read_days(3, now=NOW)["dias"]}
+    assert days[day_start(updated)]["fechados"] == 1
+    assert days[day_start(opened)]["abertos"] == 1
+
+
+def test_refresh_lease_lets_one_worker_refresh(memory_db):
+    service = IncidentService(memory_db)
+    first = DailyStats(memory_db, "incidentes", service.collection, INCIDENT_CLOSED_STATUS)
+    second = DailyStats(memory_db, "incidentes", service.collection, INCIDENT_CLOSED_STATUS)
+
+    assert first.refresh_if_stale(60) is not None
+    assert second.refresh_if_stale(60) is None
+
+    # Meta vencido, mas reservado por outro worker: pula
+    memory_db[DAILY_STATS_COLLECTION].update_one(
+        {"_id": first.meta_id},
+        {"$set": {"atualizado_em": datetime.utcnow() - timedelta(hours=1),
+                  "reservado_ate": datetime.utcnow() + timedelta(minutes=5)}}
+    )
+    assert second.refresh_if_stale(60) is None
+
+    # Reserva expirada (worker morreu no meio): outro assume
+    memory_db[DAILY_STATS_COLLECTION].update_one(
+        {"_id": first.meta_id},
+        {"$set": {"reservado_ate": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+    assert second.refresh_if_stale(60) is not None
+    assert "reservado_ate" not in memory_db[DAILY_STATS_COLLECTION].find_one({"_id": first.meta_id})
@@ -0,0 +1,73 @@
+"""
+Canal de eventos: reset nas filas cheias e buffer das escritas durante a reconexão
+"""
+from services.events import ChangeFeed, EventBus
+
+
+def drain(subscription):
+    events = []
+    while True:
+        event = subscription.get(timeout=0)
+        if event is None:
+            return events
+        events.append(event)
+
+
+def incident_event(number):
+    return {"module": "incidentes", "operation": "insert", "id": str(number)}
+
+
+def test_full_queue_is_replaced_by_reset():
+    bus = EventBus(queue_size=2, max_subscribers=2)
+    slow = bus.subscribe(["incidentes"])
+    for number in range(3):
+        bus.publish("incidentes", incident_event(number))
+
+    events = drain(slow)
+    assert [event_type for _, event_type, _ in events] == ["reset"]
+    assert bus.stats()["resets"] == 1
+
+    # O assinante continua recebendo os eventos seguintes
+    bus.publish("incidentes", incident_event(4))
+    assert [data["id"] for _, _, data in drain(slow)] == ["4"]
+
+
+def feed_reconnecting(buffer_size=10):
+    bus = EventBus(queue_size=10, max_subscribers=2)
+    feed = ChangeFeed(bus, stats_interval=60, buffer_size=buffer_size)
+    feed.mode = "reconnecting"
+    return bus, feed
+
+
+def publish_writes(feed, count):
+    for number in range(count):
+        feed._emit("incidentes", incident_event(number))
+
+
+def test_writes_while_reconnecting_are_published_when_stream_opens_fresh():
+    bus, feed = feed_reconnecting()
+    subscription = bus.subscribe(["incidentes"])
+    publish_writes(feed, 3)
+    assert drain(subscription) == []
+
+    feed._leave_reconnecting("change_stream", replayed=False)
+    assert [data["id"] for _, _, data in drain(subscription)] == ["0", "1", "2"]
+
+
+def test_writes_while_reconnecting_are_dropped_when_stream_resumes():
+    bus, feed = feed_reconnecting()
+    subscription = bus.subscribe(["incidentes"])
+    publish_writes(feed, 3)
+
+    # O stream retomado pelo token reenvia as mesmas escritas
+    feed._leave_reconnecting("change_stream", replayed=True)
+    assert drain(subscription) == []
+
+
+def test_buffer_overflow_sends_reset():
+    bus, feed = feed_reconnecting(buffer_size=2)
+    subscription = bus.subscribe(["incidentes", "changes"])
+    publish_writes(feed, 5)
+
+    feed._leave_reconnecting("change_stream", replayed=True)
+    assert [event_type for _, event_type, _ in drain(subscription)] == ["reset"]
@@ -0,0 +1,46 @@
+"""
+Testes da exportação em streaming: datas em ISO 8601 no NDJSON e no CSV
+"""
+import json
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from utils.export import csv_chunks, ndjson_chunks
+from utils.json_provider import StdlibJSONProvider
+
+
+ROWS = [
+    {"numero": "INC0000001", "created_at": datetime(2024, 3, 5, 14, 30, 15), "closed_at": None},
+    {"numero": "INC0000002", "created_at": datetime(2024, 3, 6, 8, 0), "closed_at": datetime(2024, 3, 7, 9, 15)}
+]
+
+
+@pytest.fixture
+def http_dates_app():
+    """Aplicação com o formato de datas padrão das respostas (http)"""
+    app = Flask(__name__)
+    app.json = StdlibJSONProvider(app, "http")
+    with app.app_context():
+        yield app
+
+
+def test_ndjson_uses_iso_dates(http_dates_app):
+    lines = "".join(ndjson_chunks(ROWS)).splitlines()
+    documents = [json.loads(line) for line in lines]
+    assert documents[0]["created_at"] == "2024-03-05T14:30:15"
+    assert documents[0]["closed_at"] is None
+    assert documents[1]["closed_at"] == "2024-03-07T09:15:00"
+
+
+def test_ndjson_and_csv_dates_match(http_dates_app):
+    ndjson_dates = [json.loads(line)["created_at"] for line in "".join(ndjson_chunks(ROWS)).splitlines()]
+    csv_lines = "".join(csv_chunks(ROWS, ["numero", "created_at"])).splitlines()[1:]
+    assert [line.split(",")[1] for line in csv_lines] == ndjson_dates
+
+
+def test_ndjson_chunks_by_rows(http_dates_app):
+    chunks = list(ndjson_chunks(ROWS, chunk_rows=1))
+    assert len(chunks) == 2
+    assert all(chunk.endswith("\n") for chunk in chunks)
@@ -0,0 +1,22 @@
+"""
+Verificação dos índices únicos exigidos pelo health check
+"""
+from services.indexes import UniqueIndexCheck, missing_unique_indexes, sync_indexes
+
+
+def test_unique_indexes_reported_until_recreated(memory_db):
+    assert missing_unique_indexes(memory_db) == {}
+
+    memory_db.chamados.drop_index("numero_1")
+    check = UniqueIndexCheck(recheck_seconds=3600)
+    assert check.missing(memory_db) == {"chamados": ["numero_1"]}
+
+    # Pendente: verificado de novo a cada consulta
+    sync_indexes(memory_db)
+    assert check.missing(memory_db) == {}
+
+
+def test_non_unique_index_with_same_key_is_missing(memory_db):
+    memory_db.usuarios.drop_index("email_1")
+    memory_db.usuarios.create_index("email", name="email_1")
+    assert missing_unique_indexes(memory_db) == {"usuarios": ["email_1"]}
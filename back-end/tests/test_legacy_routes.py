@@ -0,0 +1,110 @@
+"""
+Rotas legadas do front-end (/api/legacy) servidas pela aplicação principal
+
+Os dashboards legados leem os snapshots de stats_counters, sem count_documents.
+"""
+import pytest
+from utils.memory_store import MemoryCollection
+
+
+CHANGE = {
+    "titulo": "Atualização do PDV",
+    "descricao": "Nova versão do PDV nas lojas",
+    "tipo": "atualizacao",
+    "prioridade": "alta",
+    "status": "execucao"
+}
+
+
+@pytest.fixture
+def count_calls(monkeypatch):
+    """Registra as chamadas a count_documents no banco em memória"""
+    calls = []
+    original = MemoryCollection.count_documents
+
+    def count_documents(self, filter, **kwargs):
+        calls.append(filter)
+        return original(self, filter, **kwargs)
+
+    monkeypatch.setattr(MemoryCollection, "count_documents", count_documents)
+    return calls
+
+
+def scan_count(collection, **filter):
+    return sum(1 for document in collection.find({}) if all(document.get(k) == v for k, v in filter.items()))
+
+
+def test_incident_dashboard_reads_counters(client, count_calls):
+    import extensions
+
+    response = client.get("/api/legacy/dashboard/incidentes")
+    assert response.status_code == 200
+    assert count_calls == []
+
+    chamados = extensions.get_db().chamados
+    data = response.json
+    assert data["incidentes_vendas"] == scan_count(chamados, incidente_vendas=True)
+    assert data["filas"]["fila_p2k"] == scan_count(chamados, local_problema="fila_p2k")
+    assert data["prioridades"]["critica"] == scan_count(chamados, prioridade="critica")
+    assert data["status"]["fechado"] == scan_count(chamados, status="fechado")
+
+
+def test_change_dashboard_reads_counters(client, count_calls):
+    before = client.get("/api/legacy/dashboard/changes").json
+
+    assert client.post("/api/legacy/changes", json=CHANGE).status_code == 201
+    after = client.get("/api/legacy/dashboard/changes").json
+    assert count_calls == []
+
+    assert after["changes_execucao"] == before["changes_execucao"] + 1
+    assert after["tipos"]["atualizacao"] == before["tipos"]["atualizacao"] + 1
+    assert after["prioridades"]["alta"] == before["prioridades"]["alta"] + 1
+
+
+def test_controle_counts_closings_by_closed_at(client, count_calls):
+    import extensions
+    from datetime import datetime, timedelta
+    from services.registry import incident_service
+
+    # Chamado aberto há três dias e fechado hoje pela rota legada
+    opened = datetime.utcnow() - timedelta(days=3)
+    chamado = {"titulo": "Falha no PDV", "descricao": "PDV não finaliza vendas", "local_problema": "fila_p2k",
+               "prioridade": "alta", "status": "aberto"}
+    chamado_id = extensions.get_db().chamados.insert_one(
+        {**chamado, "numero": 9001, "data_criacao": opened, "created_at": opened}
+    ).inserted_id
+    incident_service.counters.rebuild()
+    before = client.get("/api/legacy/dashboard/controle").json
+
+    assert client.put(f"/api/legacy/chamados/{chamado_id}", json={**chamado, "status": "fechado"}).status_code == 200
+    incident_service.daily_stats.refresh()
+    count_calls.clear()
+    after = client.get("/api/legacy/dashboard/controle").json
+
+    assert count_calls == []
+    assert after["fechados_hoje"] == before["fechados_hoje"] + 1
+    assert after["abertos_hoje"] == before["abertos_hoje"]
+    assert after["pendentes"] == before["pendentes"] - 1
+
+
+def test_list_without_limit_returns_the_full_array(client, monkeypatch):
+    import extensions
+    from config import settings
+
+    monkeypatch.setattr(settings, "LEGACY_LIST_DEFAULT_LIMIT", 5)
+    total = extensions.get_db().chamados.count_documents({})
+
+    response = client.get("/api/legacy/chamados")
+    assert response.status_code == 200
+    assert len(response.get_json()) == total > 5
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_list_with_limit_pages_by_cursor(client):
+    first = client.get("/api/legacy/chamados?limit=5")
+    assert len(first.json) == 5
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get(f"/api/legacy/chamados?limit=5&cursor={cursor}")
+    assert len(second.json) == 5
+    assert not {c["_id"] for c in first.json} & {c["_id"] for c in second.json}
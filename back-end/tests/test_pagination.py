@@ -0,0 +1,107 @@
+"""
+Cursores de paginação (keyset) e seus casos de borda
+"""
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from bson import ObjectId
+from utils.pagination import apply_keyset, decode_cursor, encode_cursor, keyset_filter, next_cursor_for, KEYSET_SORT
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2024, 1, 2, 3, 4, 5, 678901),
+    datetime(2024, 1, 2, tzinfo=timezone.utc),
+    None
+])
+def test_cursor_round_trip(created_at):
+    object_id = ObjectId()
+    cursor = encode_cursor(created_at, object_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, object_id)
+
+
+def test_cursor_accepts_string_ids():
+    object_id = ObjectId()
+    assert decode_cursor(encode_cursor(None, str(object_id)))[1] == object_id
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "!!!",
+    "bm90LWpzb24",
+    raw_cursor({"t": None}),
+    raw_cursor({"t": None, "i": "123"}),
+    raw_cursor({"t": "ontem", "i": str(ObjectId())}),
+    raw_cursor([1, 2])
+])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError, match="Cursor de paginação inválido"):
+        decode_cursor(cursor)
+
+
+def test_next_cursor_only_when_there_are_more_items():
+    object_id = ObjectId()
+    row = {"id": str(object_id), "created_at": datetime(2024, 1, 1)}
+    assert next_cursor_for([], True) is None
+    assert next_cursor_for([row], False) is None
+    assert decode_cursor(next_cursor_for([row], True)) == (datetime(2024, 1, 1), object_id)
+
+
+def test_apply_keyset_keeps_filters():
+    position = (datetime(2024, 1, 1), ObjectId())
+    assert apply_keyset({"status": "aberto"}, None) == {"status": "aberto"}
+    assert apply_keyset({}, position) == keyset_filter(position)
+    assert apply_keyset({"status": "aberto"}, position) == {"$and": [{"status": "aberto"}, keyset_filter(position)]}
+
+
+def walk(collection, page_size, query=None):
+    """Percorre a coleção página a página, como a listagem com cursor"""
+    seen, position = [], None
+    while True:
+        page = list(collection.find(apply_keyset(query or {}, position)).sort(KEYSET_SORT).limit(page_size))
+        seen.extend(document["_id"] for document in page)
+        if len(page) < page_size:
+            return seen
+        last = page[-1]
+        position = decode_cursor(encode_cursor(last.get("created_at"), last["_id"]))
+
+
+@pytest.mark.parametrize("page_size", [1, 3, 7, 50])
+def test_walk_visits_every_document_once(memory_db, page_size):
+    collection = memory_db["paginas"]
+    base = datetime(2024, 1, 1)
+    # Empates de created_at (mesmo instante) e documentos sem data
+    documents = [{"created_at": base + timedelta(minutes=index // 4), "status": "aberto" if index % 2 else "fechado"}
+                 for index in range(20)]
+    documents += [{"created_at": None, "status": "aberto"} for _ in range(3)]
+    documents += [{"status": "aberto"} for _ in range(2)]
+    collection.insert_many(documents)
+
+    expected = [document["_id"] for document in collection.find({}).sort(KEYSET_SORT)]
+    assert walk(collection, page_size) == expected
+    assert len(expected) == 25
+
+    opened = [document["_id"] for document in collection.find({"status": "aberto"}).sort(KEYSET_SORT)]
+    assert walk(collection, page_size, {"status": "aberto"}) == opened
+
+
+def test_keyset_filter_reaches_documents_without_date():
+    """Mesma semântica do MongoDB: $lt não casa com null, o cursor precisa do ramo próprio"""
+    from utils.memory_store import matches
+
+    position = (datetime(2024, 1, 1), ObjectId())
+    predicate = keyset_filter(position)
+    assert matches({"_id": ObjectId(), "created_at": datetime(2023, 12, 31)}, predicate)
+    assert not matches({"_id": ObjectId(), "created_at": datetime(2024, 1, 2)}, predicate)
+    assert matches({"_id": ObjectId(), "created_at": None}, predicate)
+    assert matches({"_id": ObjectId()}, predicate)
+
+    undated = keyset_filter((None, ObjectId("000000000000000000000005")))
+    assert matches({"_id": ObjectId("000000000000000000000004")}, undated)
+    assert not matches({"_id": ObjectId("000000000000000000000006")}, undated)
+    assert not matches({"_id": ObjectId("000000000000000000000004"), "created_at": datetime(2024, 1, 1)}, undated)
@@ -0,0 +1,45 @@
+"""
+Sequência de números INC- realinhada quando fica atrás dos dados
+"""
+import pytest
+from models.incident_model import IncidentCreate
+from services.incident_service import IncidentService
+
+
+def payload():
+    return IncidentCreate(numero="", titulo="Falha", descricao="Sem conexão", prioridade="media",
+                          status="aberto", tipo_tarefa="suporte", grupo_designado="N1")
+
+
+@pytest.fixture
+def incidents(memory_db):
+    return IncidentService(memory_db)
+
+
+def test_external_numbers_resync_single_create(incidents, memory_db):
+    assert incidents.create_incident(payload()).numero == "INC-001"
+    memory_db.chamados.insert_many([{"numero": f"INC-{number:03d}"} for number in range(2, 6)])
+    assert incidents.create_incident(payload()).numero == "INC-006"
+
+
+def test_deleted_counter_resyncs(incidents, memory_db):
+    incidents.create_incident(payload())
+    incidents.create_incident(payload())
+    memory_db.counters.delete_many({})
+    assert incidents.create_incident(payload()).numero == "INC-003"
+
+
+def test_external_numbers_resync_bulk_create(incidents, memory_db):
+    incidents.create_incident(payload())
+    memory_db.chamados.insert_many([{"numero": f"INC-{number:03d}"} for number in range(2, 4)])
+    results = incidents.create_incidents_bulk([payload() for _ in range(4)])
+    assert all(result["success"] for result in results)
+    assert sorted(result["numero"] for result in results) == ["INC-004", "INC-005", "INC-006", "INC-007"]
+
+
+def test_explicit_duplicate_number_is_rejected(incidents):
+    incidents.create_incident(payload())
+    duplicate = payload()
+    duplicate.numero = "INC-001"
+    with pytest.raises(ValueError, match="INC-001 já existe"):
+        incidents.create_incident(duplicate)
@@ -0,0 +1,163 @@
+"""
+Contadores incrementais (stats_counters) e rollups de tendência sem drift
+
+Depois de cada escrita, os contadores mantidos com $inc devem coincidir com a
+reconstrução a partir da coleção de origem (manage.py reconcile-stats).
+"""
+from datetime import datetime
+
+import pytest
+from models.incident_model import IncidentCreate, IncidentUpdate
+from models.user_model import UserCreate, UserUpdate
+from services.change_service import ChangeService
+from services.incident_service import IncidentService
+from services.stats_counters import STATS_COUNTERS_COLLECTION
+from services.trends import bucket_id, nested_value
+from services.user_service import UserService
+
+
+def incident_payload(**overrides):
+    data = {
+        "numero": "",
+        "titulo": "Falha no PDV",
+        "descricao": "PDV não finaliza vendas",
+        "prioridade": "alta",
+        "status": "aberto",
+        "tipo_tarefa": "suporte",
+        "grupo_designado": "N2",
+        "local_problema": "fila_p2k",
+        "incidente_vendas": True
+    }
+    data.update(overrides)
+    return IncidentCreate(**data)
+
+
+@pytest.fixture
+def incidents(memory_db):
+    service = IncidentService(memory_db)
+    service.counters.rebuild()
+    service.trends.rebuild()
+    return service
+
+
+def assert_no_drift(service):
+    assert service.counters.rebuild(dry_run=True)["drift"] == {}
+
+
+def test_create_update_delete_keep_counters_exact(incidents):
+    created = incidents.create_incident(incident_payload())
+    assert incidents.counters.read()["filas"]["fila_p2k"] == 1
+    assert_no_drift(incidents)
+
+    incidents.update_incident(created.id, IncidentUpdate(local_problema="fila_crivo", prioridade="baixa"))
+    stats = incidents.counters.read()
+    assert stats["filas"]["fila_p2k"] == 0
+    assert stats["filas"]["fila_crivo"] == 1
+    assert_no_drift(incidents)
+
+    incidents.update_incident(created.id, IncidentUpdate(status="fechado"))
+    assert_no_drift(incidents)
+
+    assert incidents.delete_incident(created.id)
+    assert incidents.counters.read()["incidentes_vendas"] == 0
+    assert_no_drift(incidents)
+
+
+def test_bulk_writes_keep_counters_exact(incidents):
+    results = incidents.create_incidents_bulk([incident_payload(), incident_payload(status="fechado"),
+                                               incident_payload(local_problema="sr")])
+    assert all(result["success"] for result in results)
+    assert_no_drift(incidents)
+
+    updates = [(result["id"], IncidentUpdate(status="em_andamento", local_problema="alarmes")) for result in results]
+    assert all(result["success"] for result in incidents.update_incidents_bulk(updates))
+    assert incidents.counters.read()["filas"]["alarmes"] == 3
+    assert_no_drift(incidents)
+
+
+def test_trend_backlog_matches_rebuild(incidents):
+    created = incidents.create_incident(incident_payload())
+    incidents.create_incident(incident_payload(status="fechado"))
+    incidents.update_incident(created.id, IncidentUpdate(local_problema="sr"))
+    assert incidents.trends.read_backlog()["total"] == incidents.trends.rebuild(dry_run=True)["backlog"]
+
+    incidents.update_incident(created.id, IncidentUpdate(status="fechado"))
+    assert incidents.trends.read_backlog()["total"] == incidents.trends.rebuild(dry_run=True)["backlog"] == 0
+
+
+def test_trend_backlog_is_empty_until_backfill(memory_db):
+    service = IncidentService(memory_db)
+    service.create_incident(incident_payload())
+    assert service.trends.read_backlog() == {}
+    assert memory_db[STATS_COUNTERS_COLLECTION].find_one({"_id": service.trends.backlog_id}) is None
+
+    service.trends.rebuild()
+    assert service.trends.read_backlog()["total"] == 1
+
+
+def test_trend_rebuild_replaces_buckets_and_drops_stale(incidents):
+    incidents.create_incident(incident_payload())
+    stats = incidents.db[STATS_COUNTERS_COLLECTION]
+    stale = bucket_id("incidentes", "day", datetime(2000, 1, 1))
+    stats.insert_one({"_id": stale, "chave": "incidentes", "granularidade": "day",
+                      "inicio": datetime(2000, 1, 1), "abertos": {"total": 5}})
+
+    report = incidents.trends.rebuild()
+    assert stats.find_one({"_id": stale}) is None
+    # Mesmos buckets da reconstrução anterior, substituídos e não duplicados
+    rebuilt = list(stats.find({"_id": {"$regex": "^incidentes:day:"}}))
+    assert len(rebuilt) == report["buckets"]["day"]
+    assert len({document["reconstrucao"] for document in rebuilt}) == 1
+    assert sum(nested_value(document, "abertos.total") for document in rebuilt) == report["documents"]
+
+
+def test_version_bumps_once_per_write(incidents):
+    first = incidents.version.current()
+    incidents.create_incidents_bulk([incident_payload(), incident_payload()])
+    second = incidents.version.current()
+    assert first.split(".")[0] == second.split(".")[0]
+    assert int(second.split(".")[1]) == int(first.split(".")[1]) + 1
+
+
+def test_side_effect_failure_does_not_fail_the_write(incidents, monkeypatch):
+    def broken(changes):
+        raise RuntimeError("stats_counters indisponível")
+
+    monkeypatch.setattr(incidents.counters, "operations", broken)
+    created = incidents.create_incident(incident_payload())
+    assert incidents.collection.find_one({"numero": created.numero}) is not None
+
+    # O drift fica para a reconciliação
+    monkeypatch.undo()
+    assert incidents.counters.rebuild(dry_run=True)["drift"] != {}
+    incidents.counters.rebuild()
+    assert_no_drift(incidents)
+
+
+def test_user_counters_follow_updates_and_deletes(memory_db):
+    users = UserService(memory_db)
+    users.counters.rebuild()
+    created = users.create_user(UserCreate(username="maria", email="maria@example.com", nome_completo="Maria",
+                                           grupo="TI Vendas", password="segredo1"))
+    users.update_user(created.id, UserUpdate(grupo="TI Dados", ativo=False))
+    stats = users.counters.read()
+    assert stats["usuarios_inativos"] == 1
+    assert stats["usuarios_por_grupo"]["TI Dados"] == 1
+    assert users.counters.rebuild(dry_run=True)["drift"] == {}
+    users.delete_user(created.id)
+    assert users.counters.rebuild(dry_run=True)["drift"] == {}
+
+
+def test_change_counters_follow_legacy_writes(memory_db):
+    changes = ChangeService(memory_db)
+    changes.counters.rebuild()
+    created = changes.create_legacy_change({"titulo": "Atualização do PDV", "descricao": "Nova versão",
+                                            "tipo": "atualizacao", "prioridade": "alta", "status": "pendente"})
+    changes.update_legacy_change(str(created["_id"]), {"status": "execucao", "prioridade": "critica"})
+    stats = changes.counters.read()
+    assert stats["changes_execucao"] == 1
+    assert stats["tipos"]["atualizacao"] == 1
+    assert stats["prioridades"] == {"critica": 1, "alta": 0, "media": 0, "baixa": 0}
+    assert changes.counters.rebuild(dry_run=True)["drift"] == {}
+    changes.delete_change(str(created["_id"]))
+    assert changes.counters.rebuild(dry_run=True)["drift"] == {}
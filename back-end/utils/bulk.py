@@ -0,0 +1,71 @@
+"""
+Utilitários das rotas de operações em lote
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config import settings
+from utils.error_handler import ValidationError
+
+
+def parse_bulk_items(data: Optional[Dict[str, Any]], key: str = "items") -> List[Any]:
+    """Extrai a lista de itens do corpo da requisição e aplica o limite por lote"""
+    items = data.get(key) if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValidationError(f"Lista '{key}' é obrigatória e não pode estar vazia")
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise ValidationError(f"Máximo de {settings.BULK_MAX_ITEMS} itens por lote")
+    return items
+
+
+def parse_bulk_status(data: Optional[Dict[str, Any]]) -> List[Any]:
+    """Itens de uma alteração de status em lote
+
+    Aceita {"items": [{"id": ..., "status": ...}]} ou, para aplicar o mesmo status
+    a vários registros, {"ids": [...], "status": ...}.
+    """
+    if isinstance(data, dict) and "ids" in data and "items" not in data:
+        ids = parse_bulk_items(data, "ids")
+        return [{"id": item_id, "status": data.get("status")} for item_id in ids]
+    return parse_bulk_items(data)
+
+
+def status_item(item: Any) -> Tuple[str, str]:
+    """Valida o formato de um item de status em lote e retorna (id, status)"""
+    if not isinstance(item, dict) or not isinstance(item.get("id"), str) or not isinstance(item.get("status"), str):
+        raise ValueError("Campos 'id' e 'status' são obrigatórios")
+    return item["id"], item["status"]
+
+
+def validate_bulk_items(items: List[Any], build: Callable[[Any], Any]) -> Tuple[List[Optional[Dict[str, Any]]], List[Tuple[int, Any]]]:
+    """Valida todos os itens em uma passada
+
+    Retorna os resultados já preenchidos para os itens inválidos e a lista
+    (posição, modelo) dos itens válidos a serem gravados.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    valid: List[Tuple[int, Any]] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, build(item)))
+        except (ValueError, TypeError) as e:
+            results[index] = {"index": index, "success": False, "error": str(e)}
+    return results, valid
+
+
+def merge_bulk_results(results: List[Optional[Dict[str, Any]]], valid: List[Tuple[int, Any]],
+                       written: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combina os erros de validação com o resultado da escrita e monta o resumo"""
+    for (index, _), result in zip(valid, written):
+        results[index] = {"index": index, **result}
+
+    succeeded = sum(1 for result in results if result["success"])
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    }
+
+
+def bulk_status_code(summary: Dict[str, Any], success_code: int = 200) -> int:
+    """Código HTTP do lote: sucesso total ou 207 quando algum item falhou"""
+    return success_code if summary["failed"] == 0 else 207
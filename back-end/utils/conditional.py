@@ -0,0 +1,95 @@
+"""
+GET condicional: ETag forte, If-None-Match -> 304 e Cache-Control por rota
+
+Nas rotas com validadores (versões das coleções, instante da última
+materialização...), a ETag é calculada antes da view a partir do caminho, da
+query string normalizada, do formato do JSON e dos validadores; se o cliente
+já tem essa ETag, a resposta 304 sai sem executar as consultas da rota. Nas
+rotas sem validadores (dados ao vivo), a ETag é o hash do corpo da resposta e
+o 304 economiza apenas a transferência.
+"""
+import hashlib
+import logging
+from functools import wraps
+from typing import Any, Callable, Optional, Sequence
+from urllib.parse import urlencode
+from flask import Response, current_app, make_response, request
+from config import settings
+
+
+# Valores que identificam o estado dos dados de uma resposta (None: desconhecido)
+ETagValidators = Callable[[], Optional[Sequence[Any]]]
+
+
+def normalized_query() -> str:
+    """Query string ordenada por parâmetro (valores repetidos mantêm a ordem recebida)"""
+    return urlencode(sorted(request.args.items(multi=True), key=lambda item: item[0]))
+
+
+def cache_control_for(rule: Optional[str]) -> str:
+    """Cache-Control configurado para a regra da rota (CACHE_CONTROL_ROUTES)"""
+    return settings.CACHE_CONTROL_ROUTES.get(rule, settings.CACHE_CONTROL_DEFAULT)
+
+
+def resource_etag(validators: Sequence[Any]) -> str:
+    """ETag forte da resposta da requisição atual para o estado dos validadores
+
+    O formato do JSON entra no cálculo: trocar o codificador ou o formato das
+    datas muda os bytes da resposta e, portanto, a ETag.
+    """
+    provider = current_app.json
+    parts = [
+        request.path,
+        normalized_query(),
+        f"{getattr(provider, 'name', type(provider).__name__)}:{getattr(provider, 'datetime_format', '')}:"
+        f"{provider.sort_keys}:{current_app.debug}",
+        *(str(value) for value in validators)
+    ]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:32]
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Resposta 304 sem corpo"""
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def conditional_get(validators: Optional[ETagValidators] = None):
+    """Decorador de rotas GET com ETag, If-None-Match e Cache-Control
+
+    validators: função sem argumentos com os valores que mudam sempre que a
+    resposta muda; deve ser bem mais barata que a própria rota. Se ela falhar
+    ou retornar None (ex: sem banco), a ETag passa a ser o hash do corpo.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not settings.CONDITIONAL_GET_ENABLED:
+                return view(*args, **kwargs)
+
+            cache_control = cache_control_for(request.url_rule.rule if request.url_rule else None)
+            etag = None
+            if validators is not None:
+                try:
+                    values = validators()
+                except Exception as e:
+                    logging.warning(f"⚠️ Aviso ao calcular a ETag de {request.path}: {e}")
+                    values = None
+                if values is not None and all(value is not None for value in values):
+                    etag = resource_etag(values)
+                    if request.if_none_match.contains_weak(etag):
+                        return not_modified(etag, cache_control)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            if etag is not None:
+                response.set_etag(etag)
+            else:
+                response.add_etag()
+            response.headers["Cache-Control"] = cache_control
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
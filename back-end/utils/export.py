@@ -0,0 +1,109 @@
+"""
+Exportação em streaming (NDJSON e CSV)
+
+As linhas vêm de um gerador (cursor em lotes) e são enviadas em blocos, sem
+montar o resultado inteiro em memória.
+"""
+import csv
+import io
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from flask import Response, current_app, stream_with_context
+
+
+# Formatos aceitos em ?format=
+EXPORT_FORMATS = ("ndjson", "csv")
+
+EXPORT_MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Linhas por bloco enviado ao cliente
+EXPORT_CHUNK_ROWS = 500
+
+
+def parse_export_format(value: Optional[str]) -> str:
+    """Valida o formato da exportação (ndjson por padrão)"""
+    export_format = (value or "ndjson").lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação deve ser um dos seguintes: {', '.join(EXPORT_FORMATS)}")
+    return export_format
+
+
+def iso_value(value: Any) -> Any:
+    """Datas em ISO 8601; os demais valores inalterados"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def ndjson_chunks(rows: Iterable[Dict[str, Any]], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[str]:
+    """Um objeto JSON por linha, com o provedor JSON da aplicação
+
+    As datas saem em ISO 8601, como no CSV, independente de JSON_DATETIME_FORMAT.
+    """
+    dumps = current_app.json.dumps
+    lines: List[str] = []
+    for row in rows:
+        lines.append(dumps({key: iso_value(value) for key, value in row.items()}))
+        if len(lines) >= chunk_rows:
+            lines.append("")
+            yield "\n".join(lines)
+            lines = []
+    if lines:
+        lines.append("")
+        yield "\n".join(lines)
+
+
+def csv_value(value: Any) -> Any:
+    """Valor de uma célula: datas em ISO 8601 e vazio para None"""
+    if value is None:
+        return ""
+    return iso_value(value)
+
+
+def csv_chunks(rows: Iterable[Dict[str, Any]], columns: List[str],
+               chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[str]:
+    """Cabeçalho com as colunas e uma linha por documento"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    pending = 0
+    for row in rows:
+        writer.writerow([csv_value(row.get(column)) for column in columns])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def export_response(rows: Iterable[Dict[str, Any]], export_format: str, columns: List[str],
+                    name: str) -> Response:
+    """Resposta em streaming com as linhas no formato pedido"""
+    chunks = ndjson_chunks(rows) if export_format == "ndjson" else csv_chunks(rows, columns)
+
+    # O primeiro bloco é lido antes de responder: falhas na consulta ainda viram erro HTTP
+    first = next(chunks, "")
+
+    def generate() -> Iterator[str]:
+        # Depois do primeiro bloco o status já foi enviado; erros só podem ser registrados
+        try:
+            yield first
+            yield from chunks
+        except Exception as e:
+            logging.error(f"Erro durante a exportação de {name}: {str(e)}")
+            raise
+
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
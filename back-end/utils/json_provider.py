@@ -0,0 +1,127 @@
+"""
+Provedores JSON das respostas da API
+
+O Flask serializa com o módulo json da biblioteca padrão. Aqui ficam dois
+provedores com o mesmo comportamento para datetime, ObjectId e modelos
+Pydantic: um baseado no orjson (bem mais rápido nas listagens grandes) e o da
+biblioteca padrão, usado quando o orjson não está instalado ou JSON_ENCODER=stdlib.
+"""
+import dataclasses
+import decimal
+import logging
+import uuid
+from datetime import date
+from typing import Any, Callable
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel
+from werkzeug.http import http_date
+from config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Formatos de data aceitos em JSON_DATETIME_FORMAT
+DATETIME_FORMATS = ("http", "iso")
+
+
+def make_default(datetime_format: str = "http") -> Callable[[Any], Any]:
+    """Função de conversão dos tipos que o codificador não serializa sozinho"""
+    if datetime_format not in DATETIME_FORMATS:
+        raise ValueError(f"JSON_DATETIME_FORMAT deve ser um dos seguintes: {', '.join(DATETIME_FORMATS)}")
+    use_http_date = datetime_format == "http"
+
+    def default(value: Any) -> Any:
+        # datetime é subclasse de date
+        if isinstance(value, date):
+            return http_date(value) if use_http_date else value.isoformat()
+        if isinstance(value, ObjectId):
+            return str(value)
+        if isinstance(value, BaseModel):
+            return value.model_dump()
+        if isinstance(value, (decimal.Decimal, uuid.UUID)):
+            return str(value)
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            return dataclasses.asdict(value)
+        if hasattr(value, "__html__"):
+            return str(value.__html__())
+        raise TypeError(f"Objeto do tipo {type(value).__name__} não é serializável em JSON")
+
+    return default
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Provedor padrão do Flask com suporte a ObjectId, Pydantic e datas ISO"""
+
+    name = "stdlib"
+
+    def __init__(self, app: Flask, datetime_format: str = "http"):
+        super().__init__(app)
+        self.datetime_format = datetime_format
+        self.default = make_default(datetime_format)
+
+
+class OrjsonJSONProvider(StdlibJSONProvider):
+    """Provedor baseado no orjson
+
+    Com datas ISO, datetime é serializado pelo próprio orjson; no formato http
+    as datas passam pela mesma função default do provedor da biblioteca padrão.
+    Chamadas com argumentos extras do json (ex: cls, indent) usam a biblioteca padrão.
+    """
+
+    name = "orjson"
+
+    def __init__(self, app: Flask, datetime_format: str = "http"):
+        if orjson is None:
+            raise RuntimeError("Pacote orjson não instalado")
+        super().__init__(app, datetime_format)
+        self._options = orjson.OPT_NON_STR_KEYS
+        if datetime_format == "http":
+            self._options |= orjson.OPT_PASSTHROUGH_DATETIME
+
+    def _encode(self, obj: Any, indent: bool = False) -> bytes:
+        options = self._options
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=options)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Mesmo critério do Flask: JSON indentado apenas em modo debug
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self._encode(obj, indent) + b"\n", mimetype=self.mimetype)
+
+
+def create_json_provider(app: Flask) -> StdlibJSONProvider:
+    """Escolhe o provedor conforme JSON_ENCODER, com fallback para a biblioteca padrão"""
+    encoder = settings.JSON_ENCODER.lower()
+    if encoder not in ("auto", "orjson", "stdlib"):
+        raise ValueError("JSON_ENCODER deve ser um dos seguintes: auto, orjson, stdlib")
+
+    provider_class = StdlibJSONProvider
+    if encoder != "stdlib":
+        if orjson is not None:
+            provider_class = OrjsonJSONProvider
+        elif encoder == "orjson":
+            logging.warning("⚠️ JSON_ENCODER=orjson, mas o pacote orjson não está instalado; usando json da biblioteca padrão")
+
+    provider = provider_class(app, settings.JSON_DATETIME_FORMAT.lower())
+    provider.sort_keys = settings.JSON_SORT_KEYS
+    return provider
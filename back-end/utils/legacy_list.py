@@ -0,0 +1,68 @@
+"""
+Paginação e streaming das listagens legadas (/api/legacy/chamados e /api/legacy/changes)
+
+O front-end (useFetchIncidentes) espera o array JSON completo: sem limit nem
+cursor, a listagem é enviada inteira em blocos, lida do cursor em lotes (o mesmo
+que stream=true). Com limit ou cursor, a página continua sendo um array e o
+cursor da próxima página vai nos cabeçalhos X-Next-Cursor e Link.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from config import settings
+
+
+# Objetos por bloco no modo stream
+STREAM_CHUNK_ROWS = 500
+
+
+def parse_legacy_list_args() -> Tuple[int, Optional[str], bool]:
+    """limit (com teto de configuração), cursor e stream da query string
+
+    Sem limit nem cursor, stream é verdadeiro: o contrato antigo devolvia todos os itens.
+    """
+    paginated = "limit" in request.args or bool(request.args.get("cursor"))
+    try:
+        limit = int(request.args.get("limit", settings.LEGACY_LIST_DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError("limit deve ser um número inteiro")
+    if limit < 1:
+        raise ValueError("limit deve ser maior que zero")
+    limit = min(limit, settings.LEGACY_LIST_MAX_LIMIT)
+
+    stream = request.args.get("stream", "false").lower() in ("1", "true") or not paginated
+    return limit, request.args.get("cursor") or None, stream
+
+
+def legacy_page_response(items: List[Dict[str, Any]], next_cursor: Optional[str]) -> Response:
+    """Página como array JSON, com o cursor da próxima página nos cabeçalhos"""
+    response = jsonify(items)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        args = request.args.to_dict()
+        args["cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+    return response
+
+
+def json_array_chunks(rows: Iterable[Dict[str, Any]], chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[str]:
+    """Array JSON enviado em blocos de chunk_rows objetos"""
+    dumps = current_app.json.dumps
+    separator = "["
+    pending: List[str] = []
+    for row in rows:
+        pending.append(dumps(row))
+        if len(pending) >= chunk_rows:
+            yield separator + ",".join(pending)
+            separator = ","
+            pending = []
+    if pending:
+        yield separator + ",".join(pending)
+        separator = ","
+    yield "[]" if separator == "[" else "]"
+
+
+def legacy_stream_response(rows: Iterable[Dict[str, Any]]) -> Response:
+    """Array JSON completo em streaming (mesmo formato da listagem sem paginação)"""
+    return Response(stream_with_context(json_array_chunks(rows)), mimetype=current_app.json.mimetype)
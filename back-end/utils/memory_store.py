@@ -0,0 +1,999 @@
+"""
+Banco de dados em memória compatível com o subconjunto da API do PyMongo usado
+pelos serviços
+
+Usado quando o MongoDB não está disponível (máquinas de desenvolvimento, testes
+de carga): os serviços recebem um MemoryDatabase no lugar do Database do PyMongo
+e funcionam sem alterações. Cada coleção mantém:
+
+- um dicionário por _id;
+- índices hash por campo (igualdade e $in), criados para o primeiro campo de
+  cada índice declarado e para os campos informados em hash_fields;
+- um índice ordenado por (created_at, _id), percorrido com bisect na ordem das
+  listagens (KEYSET_SORT), inclusive a partir da posição de um cursor.
+
+Agregações não são suportadas (levantam OperationFailure); os serviços já
+possuem caminhos alternativos sem pipeline.
+"""
+import bisect
+import heapq
+import random
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Campos com índice hash em todas as coleções, além dos declarados pelos serviços
+DEFAULT_HASH_FIELDS = ("status", "prioridade", "local_problema", "grupo_designado")
+
+# Campo do índice ordenado usado pelas listagens
+SORTED_FIELD = "created_at"
+
+_MISSING = object()
+
+
+# ---------------------------------------------------------------------------
+# Comparação e casamento de documentos
+# ---------------------------------------------------------------------------
+
+def sort_key(value: Any) -> Tuple:
+    """Chave de ordenação entre tipos diferentes, na ordem de comparação do MongoDB"""
+    if value is None or value is _MISSING:
+        return (0,)
+    if isinstance(value, bool):
+        return (5, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, dict):
+        return (3, tuple(sorted((k, sort_key(v)) for k, v in value.items())))
+    if isinstance(value, ObjectId):
+        return (4, value.binary)
+    if isinstance(value, datetime):
+        return (6, value)
+    return (7, repr(value))
+
+
+def get_path(document: Dict[str, Any], path: str) -> Any:
+    """Valor de um campo (com notação de ponto) ou _MISSING"""
+    if "." not in path:
+        return document.get(path, _MISSING)
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _comparable(left: Any, right: Any) -> bool:
+    return sort_key(left)[0] == sort_key(right)[0]
+
+
+def _equals(value: Any, expected: Any) -> bool:
+    if expected is None:
+        return value is None or value is _MISSING
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value is not _MISSING and value == expected and isinstance(value, bool) == isinstance(expected, bool)
+
+
+def _match_operators(value: Any, conditions: Dict[str, Any]) -> bool:
+    for operator, operand in conditions.items():
+        if operator == "$eq":
+            ok = _equals(value, operand)
+        elif operator == "$ne":
+            ok = not _equals(value, operand)
+        elif operator == "$in":
+            ok = any(_equals(value, item) for item in operand)
+        elif operator == "$nin":
+            ok = not any(_equals(value, item) for item in operand)
+        elif operator in ("$lt", "$lte", "$gt", "$gte"):
+            if value is _MISSING or not _comparable(value, operand):
+                ok = False
+            elif operator == "$lt":
+                ok = sort_key(value) < sort_key(operand)
+            elif operator == "$lte":
+                ok = sort_key(value) <= sort_key(operand)
+            elif operator == "$gt":
+                ok = sort_key(value) > sort_key(operand)
+            else:
+                ok = sort_key(value) >= sort_key(operand)
+        elif operator == "$exists":
+            ok = (value is not _MISSING) == bool(operand)
+        elif operator == "$regex":
+            pattern = re.compile(operand, _regex_flags(conditions.get("$options", "")))
+            ok = isinstance(value, str) and pattern.search(value) is not None
+        elif operator == "$options":
+            ok = True
+        elif operator == "$type":
+            ok = _matches_type(value, operand)
+        elif operator == "$not":
+            ok = not _match_operators(value, operand)
+        else:
+            raise OperationFailure(f"Operador não suportado pelo banco em memória: {operator}")
+        if not ok:
+            return False
+    return True
+
+
+def _regex_flags(options: str) -> int:
+    flags = 0
+    if "i" in options:
+        flags |= re.IGNORECASE
+    if "m" in options:
+        flags |= re.MULTILINE
+    return flags
+
+
+def _matches_type(value: Any, expected: Any) -> bool:
+    types = {
+        "number": (int, float), "int": int, "long": int, "double": float, "string": str,
+        "date": datetime, "objectId": ObjectId, "bool": bool, "object": dict, "array": list
+    }
+    if expected == "null":
+        return value is None
+    python_type = types.get(expected)
+    if python_type is None or value is _MISSING:
+        return False
+    if isinstance(value, bool) and expected != "bool":
+        return False
+    return isinstance(value, python_type)
+
+
+def matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Indica se o documento satisfaz o filtro (subconjunto da linguagem de consulta)"""
+    for field, condition in query.items():
+        if field == "$and":
+            if not all(matches(document, sub) for sub in condition):
+                return False
+        elif field == "$or":
+            if not any(matches(document, sub) for sub in condition):
+                return False
+        elif field == "$nor":
+            if any(matches(document, sub) for sub in condition):
+                return False
+        else:
+            value = get_path(document, field)
+            if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+                if not _match_operators(value, condition):
+                    return False
+            elif isinstance(condition, re.Pattern):
+                if not (isinstance(value, str) and condition.search(value)):
+                    return False
+            elif not _equals(value, condition):
+                return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Cópia, projeção e atualização de documentos
+# ---------------------------------------------------------------------------
+
+def copy_document(value: Any) -> Any:
+    """Cópia dos dicionários e listas aninhados (os demais valores são imutáveis)"""
+    if isinstance(value, dict):
+        return {key: copy_document(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_document(item) for item in value]
+    return value
+
+
+def project(document: Dict[str, Any], projection: Optional[Any]) -> Dict[str, Any]:
+    """Aplica uma projeção de inclusão ou exclusão de campos de primeiro nível"""
+    if not projection:
+        return copy_document(document)
+    if not isinstance(projection, dict):
+        projection = {field: 1 for field in projection}
+
+    include_id = bool(projection.get("_id", 1))
+    fields = {field: flag for field, flag in projection.items() if field != "_id"}
+    inclusion = any(fields.values()) if fields else "_id" in projection and include_id
+    if inclusion:
+        result = {field: copy_document(document[field]) for field in fields if fields[field] and field in document}
+    else:
+        result = {field: copy_document(value) for field, value in document.items() if field not in fields}
+    if include_id and "_id" in document:
+        result["_id"] = document["_id"]
+    elif not include_id:
+        result.pop("_id", None)
+    return result
+
+
+def _set_path(document: Dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        document = document.setdefault(part, {})
+    document[parts[-1]] = value
+
+
+def _unset_path(document: Dict[str, Any], path: str) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        document = document.get(part)
+        if not isinstance(document, dict):
+            return
+    document.pop(parts[-1], None)
+
+
+def apply_update(document: Dict[str, Any], update: Dict[str, Any], inserting: bool = False) -> None:
+    """Aplica operadores de atualização ($set, $unset, $inc, $max, $min, $setOnInsert)"""
+    for operator, fields in update.items():
+        for path, value in fields.items():
+            current = get_path(document, path)
+            if operator == "$set" or (operator == "$setOnInsert" and inserting):
+                _set_path(document, path, copy_document(value))
+            elif operator == "$setOnInsert":
+                continue
+            elif operator == "$unset":
+                _unset_path(document, path)
+            elif operator == "$inc":
+                _set_path(document, path, (0 if current is _MISSING or current is None else current) + value)
+            elif operator == "$max":
+                if current is _MISSING or current is None or sort_key(value) > sort_key(current):
+                    _set_path(document, path, value)
+            elif operator == "$min":
+                if current is _MISSING or current is None or sort_key(value) < sort_key(current):
+                    _set_path(document, path, value)
+            else:
+                raise OperationFailure(f"Operador de atualização não suportado pelo banco em memória: {operator}")
+
+
+def _equality_fields(query: Dict[str, Any]) -> Dict[str, Any]:
+    """Campos com igualdade simples no filtro (usados como base de um upsert)"""
+    fields = {}
+    for field, condition in query.items():
+        if field.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+            if "$eq" in condition:
+                fields[field] = condition["$eq"]
+            continue
+        fields[field] = condition
+    return fields
+
+
+def _normalize_sort(key_or_list: Any, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction if direction is not None else 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return [(field, int(order)) for field, order in key_or_list]
+
+
+# ---------------------------------------------------------------------------
+# Índices
+# ---------------------------------------------------------------------------
+
+class HashIndex:
+    """Índice de igualdade valor -> conjunto de _ids"""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.entries: Dict[Any, Set[Any]] = {}
+        # Documentos com valores não hasheáveis (listas, dicionários) ficam sempre entre os candidatos
+        self.unhashable: Set[Any] = set()
+
+    @staticmethod
+    def key(value: Any) -> Any:
+        if value is _MISSING:
+            return None
+        # True == 1 em Python, mas são valores distintos para o MongoDB
+        return ("bool", value) if isinstance(value, bool) else value
+
+    def add(self, document: Dict[str, Any]) -> None:
+        try:
+            self.entries.setdefault(self.key(get_path(document, self.field)), set()).add(document["_id"])
+        except TypeError:
+            self.unhashable.add(document["_id"])
+
+    def remove(self, document: Dict[str, Any]) -> None:
+        try:
+            ids = self.entries.get(self.key(get_path(document, self.field)))
+        except TypeError:
+            self.unhashable.discard(document["_id"])
+            return
+        if ids is not None:
+            ids.discard(document["_id"])
+
+    def lookup(self, value: Any) -> Optional[Set[Any]]:
+        """_ids cujo campo é igual ao valor (None se o valor não pode usar o índice)"""
+        try:
+            ids = self.entries.get(self.key(value), set())
+        except TypeError:
+            return None
+        return ids | self.unhashable if self.unhashable else ids
+
+
+class SortedIndex:
+    """Índice ordenado por (campo, _id) para percorrer as listagens sem ordenar
+
+    Cada entrada é (chave do campo, chave do _id, _id); como o _id é único, as
+    comparações nunca chegam ao terceiro elemento.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.keys: List[Tuple[Tuple, Tuple, Any]] = []
+        self.by_id: Dict[Any, Tuple[Tuple, Tuple, Any]] = {}
+
+    def entry(self, document: Dict[str, Any]) -> Tuple[Tuple, Tuple, Any]:
+        return (sort_key(get_path(document, self.field)), sort_key(document["_id"]), document["_id"])
+
+    def add(self, document: Dict[str, Any]) -> None:
+        entry = self.entry(document)
+        bisect.insort(self.keys, entry)
+        self.by_id[entry[2]] = entry
+
+    def extend(self, documents: Iterable[Dict[str, Any]]) -> None:
+        entries = [self.entry(document) for document in documents]
+        self.keys.extend(entries)
+        self.keys.sort()
+        self.by_id.update((entry[2], entry) for entry in entries)
+
+    def remove(self, document: Dict[str, Any]) -> None:
+        entry = self.by_id.pop(document["_id"], None)
+        if entry is None:
+            return
+        position = bisect.bisect_left(self.keys, entry)
+        if position < len(self.keys) and self.keys[position][:2] == entry[:2]:
+            del self.keys[position]
+
+    def ids(self, descending: bool, upper: Optional[Tuple] = None) -> Iterator[Any]:
+        """_ids na ordem do índice, opcionalmente restritos aos anteriores a upper (campo, _id)"""
+        end = len(self.keys) if upper is None else bisect.bisect_left(self.keys, upper)
+        positions = range(end - 1, -1, -1) if descending else range(end)
+        for position in positions:
+            yield self.keys[position][2]
+
+
+# ---------------------------------------------------------------------------
+# Coleção, cursor e banco
+# ---------------------------------------------------------------------------
+
+class _Result:
+    """Resultado de escrita com os atributos usados pelos chamadores"""
+
+    def __init__(self, **fields):
+        self.acknowledged = True
+        self.__dict__.update(fields)
+
+
+class MemoryCursor:
+    """Cursor preguiçoso com sort/skip/limit encadeáveis"""
+
+    def __init__(self, collection: "MemoryCollection", query: Dict[str, Any], projection: Optional[Any] = None,
+                 sort: Optional[Any] = None, skip: int = 0, limit: int = 0):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort = _normalize_sort(sort) if sort else []
+        self._skip = skip
+        self._limit = limit
+        self._batch_size = 0
+
+    def sort(self, key_or_list: Any, direction: Optional[int] = None) -> "MemoryCursor":
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int) -> "MemoryCursor":
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> "MemoryCursor":
+        self._limit = limit
+        return self
+
+    def batch_size(self, size: int) -> "MemoryCursor":
+        self._batch_size = size
+        return self
+
+    def hint(self, index: Any) -> "MemoryCursor":
+        return self
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        documents = self._collection._select(self._query, self._sort, self._skip, self._limit)
+        if self._batch_size:
+            return self._iter_batches(documents)
+        return iter([project(document, self._projection) for document in documents])
+
+    def _iter_batches(self, documents: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Copia os documentos em lotes, como os getMore de um cursor do MongoDB"""
+        for start in range(0, len(documents), self._batch_size):
+            with self._collection._lock:
+                batch = [project(document, self._projection)
+                         for document in documents[start:start + self._batch_size]]
+            yield from batch
+
+    def close(self) -> None:
+        pass
+
+    def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        documents = list(self)
+        return documents if length is None else documents[:length]
+
+
+class MemoryCollection:
+    """Coleção em memória com índices hash e ordenado"""
+
+    def __init__(self, database: "MemoryDatabase", name: str, hash_fields: Iterable[str] = DEFAULT_HASH_FIELDS):
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        self._lock = threading.RLock()
+        self._documents: Dict[Any, Dict[str, Any]] = {}
+        self._hash: Dict[str, HashIndex] = {field: HashIndex(field) for field in hash_fields}
+        self._sorted = SortedIndex(SORTED_FIELD)
+        self._unique: Set[str] = set()
+        self._index_specs: Dict[str, Dict[str, Any]] = {"_id_": {"key": [("_id", 1)], "v": 2}}
+
+    # Índices
+    def create_index(self, keys: Any, **kwargs) -> str:
+        keys = _normalize_sort(keys, 1)
+        name = kwargs.get("name") or "_".join(f"{field}_{direction}" for field, direction in keys)
+        with self._lock:
+            spec = {"key": keys, "v": 2}
+            spec.update({option: value for option, value in kwargs.items() if option not in ("name", "background")})
+            self._index_specs[name] = spec
+            field = keys[0][0]
+            if field != "_id" and field != SORTED_FIELD:
+                self._ensure_hash(field)
+            if kwargs.get("unique") and len(keys) == 1:
+                self._check_unique_existing(field)
+                self._unique.add(field)
+        return name
+
+    def create_indexes(self, models: Iterable[Any]) -> List[str]:
+        names = []
+        for model in models:
+            spec = dict(model.document)
+            names.append(self.create_index(list(spec.pop("key").items()), **spec))
+        return names
+
+    def drop_index(self, name: str) -> None:
+        with self._lock:
+            spec = self._index_specs.pop(name, None)
+            if spec is None:
+                raise OperationFailure(f"index not found with name [{name}]")
+            if spec.get("unique") and len(spec["key"]) == 1:
+                self._unique.discard(spec["key"][0][0])
+
+    def index_information(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(spec) for name, spec in self._index_specs.items()}
+
+    def _ensure_hash(self, field: str) -> None:
+        if field not in self._hash:
+            index = HashIndex(field)
+            for document in self._documents.values():
+                index.add(document)
+            self._hash[field] = index
+
+    def _check_unique_existing(self, field: str) -> None:
+        self._ensure_hash(field)
+        for value, ids in self._hash[field].entries.items():
+            if len(ids) > 1:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} index: {field}_1",
+                                        DUPLICATE_KEY_ERROR)
+
+    def _unique_conflict(self, document: Dict[str, Any], ignore_id: Any = _MISSING) -> Optional[str]:
+        if document["_id"] in self._documents and document["_id"] != ignore_id:
+            return "_id"
+        for field in self._unique:
+            value = get_path(document, field)
+            ids = self._hash[field].lookup(value) or set()
+            if any(existing != ignore_id for existing in ids):
+                return field
+        return None
+
+    def _duplicate_error(self, document: Dict[str, Any], field: str) -> DuplicateKeyError:
+        value = get_path(document, field)
+        return DuplicateKeyError(
+            f"E11000 duplicate key error collection: {self.full_name} index: {field}_1 dup key: {{ {field}: {value!r} }}",
+            DUPLICATE_KEY_ERROR,
+            {"code": DUPLICATE_KEY_ERROR, "keyPattern": {field: 1}, "keyValue": {field: value}}
+        )
+
+    def _index_add(self, document: Dict[str, Any]) -> None:
+        for index in self._hash.values():
+            index.add(document)
+        self._sorted.add(document)
+
+    def _index_remove(self, document: Dict[str, Any]) -> None:
+        for index in self._hash.values():
+            index.remove(document)
+        self._sorted.remove(document)
+
+    # Planejamento de consultas
+    def _candidates(self, query: Dict[str, Any]) -> Optional[Set[Any]]:
+        """_ids que podem satisfazer o filtro, a partir dos índices (None = todos)"""
+        candidates: Optional[Set[Any]] = None
+        for field, condition in query.items():
+            ids: Optional[Set[Any]] = None
+            if field == "$and":
+                for sub in condition:
+                    sub_ids = self._candidates(sub)
+                    if sub_ids is not None:
+                        candidates = sub_ids if candidates is None else candidates & sub_ids
+                continue
+            if field.startswith("$"):
+                continue
+            is_operator = isinstance(condition, dict) and any(key.startswith("$") for key in condition)
+            values = None
+            if not is_operator:
+                values = [condition]
+            elif "$eq" in condition:
+                values = [condition["$eq"]]
+            elif "$in" in condition:
+                values = list(condition["$in"])
+            if values is None or any(isinstance(value, (dict, list, re.Pattern)) for value in values):
+                continue
+
+            if field == "_id":
+                ids = {value for value in values if value in self._documents}
+            elif field in self._hash:
+                ids = set()
+                for value in values:
+                    found = self._hash[field].lookup(value)
+                    if found is None:
+                        ids = None
+                        break
+                    ids |= found
+            if ids is not None:
+                candidates = ids if candidates is None else candidates & ids
+        return candidates
+
+    def _residual(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        """Parte do filtro que os índices hash não resolvem sozinhos"""
+        return {
+            field: condition for field, condition in query.items()
+            if field.startswith("$")
+            or isinstance(condition, (dict, list, re.Pattern))
+            or not (field == "_id" or (field in self._hash and not self._hash[field].unhashable))
+        }
+
+    @staticmethod
+    def _keyset_bound(query: Dict[str, Any]) -> Optional[Tuple]:
+        """Limite (created_at, _id) de um predicado gerado por utils.pagination.keyset_filter"""
+        branches = query.get("$or")
+        if len(query) == 1 and branches and len(branches) == 3 and branches[2] == {SORTED_FIELD: None}:
+            first, second, _ = branches
+            created = first.get(SORTED_FIELD)
+            object_id = second.get("_id")
+            if (isinstance(created, dict) and list(created) == ["$lt"] and isinstance(object_id, dict)
+                    and list(object_id) == ["$lt"] and second.get(SORTED_FIELD) == created["$lt"]):
+                return (sort_key(created["$lt"]), sort_key(object_id["$lt"]))
+        object_id = query.get("_id")
+        if (len(query) == 2 and SORTED_FIELD in query and query[SORTED_FIELD] is None
+                and isinstance(object_id, dict) and list(object_id) == ["$lt"]):
+            return (sort_key(None), sort_key(object_id["$lt"]))
+        return None
+
+    def _split_keyset(self, query: Dict[str, Any]) -> Tuple[Optional[Tuple], Dict[str, Any]]:
+        """Separa o predicado de cursor (resolvido pelo índice ordenado) do restante do filtro"""
+        bound = self._keyset_bound(query)
+        if bound is not None:
+            return bound, {}
+        parts = query.get("$and")
+        if len(query) == 1 and parts and len(parts) == 2:
+            bound = self._keyset_bound(parts[1])
+            if bound is not None:
+                return bound, parts[0]
+        return None, query
+
+    def _select(self, query: Dict[str, Any], sort: List[Tuple[str, int]], skip: int = 0, limit: int = 0) -> List[Dict[str, Any]]:
+        """Documentos (sem cópia) que satisfazem o filtro, já ordenados e paginados"""
+        wanted = skip + limit if limit else None
+        with self._lock:
+            keyset_order = (
+                [field for field, _ in sort] in ([SORTED_FIELD], [SORTED_FIELD, "_id"])
+                and len({direction for _, direction in sort}) == 1
+            )
+            descending = keyset_order and sort[0][1] < 0
+            upper, query = self._split_keyset(query) if descending else (None, query)
+            candidates = self._candidates(query)
+            residual = self._residual(query) if candidates is not None else query
+
+            if keyset_order:
+                if candidates is None or len(candidates) * 8 > len(self._documents):
+                    # Percorre o índice ordenado a partir do cursor, descartando os não candidatos
+                    ids = self._sorted.ids(descending, upper=upper)
+                    if candidates is not None:
+                        ids = (object_id for object_id in ids if object_id in candidates)
+                else:
+                    # Poucos candidatos: mais barato ordenar as entradas deles do que percorrer o índice
+                    entries = [self._sorted.by_id[object_id] for object_id in candidates]
+                    if upper is not None:
+                        entries = [entry for entry in entries if entry < upper]
+                    if not residual and wanted is not None and wanted < len(entries):
+                        entries = (heapq.nlargest if descending else heapq.nsmallest)(wanted, entries)
+                    else:
+                        entries.sort(reverse=descending)
+                    ids = (entry[2] for entry in entries)
+
+                selected = []
+                for object_id in ids:
+                    document = self._documents[object_id]
+                    if not residual or matches(document, residual):
+                        selected.append(document)
+                        if wanted is not None and len(selected) >= wanted:
+                            break
+            else:
+                pool = self._documents.values() if candidates is None else (
+                    self._documents[object_id] for object_id in candidates if object_id in self._documents
+                )
+                selected = [document for document in pool if not residual or matches(document, residual)]
+                if sort and len({direction for _, direction in sort}) == 1:
+                    fields = [field for field, _ in sort]
+                    key = lambda document: tuple(sort_key(get_path(document, field)) for field in fields)
+                    if wanted is not None and wanted < len(selected) // 4:
+                        # Apenas os primeiros itens da ordenação são necessários
+                        select = heapq.nlargest if sort[0][1] < 0 else heapq.nsmallest
+                        selected = select(wanted, selected, key=key)
+                    else:
+                        selected.sort(key=key, reverse=sort[0][1] < 0)
+                else:
+                    for field, direction in reversed(sort):
+                        selected.sort(key=lambda document: sort_key(get_path(document, field)), reverse=direction < 0)
+
+        return selected[skip:wanted] if (skip or wanted is not None) else selected
+
+    def _find_first(self, query: Dict[str, Any], sort: Optional[Any] = None) -> Optional[Dict[str, Any]]:
+        found = self._select(query or {}, _normalize_sort(sort) if sort else [], 0, 1)
+        return found[0] if found else None
+
+    # Leitura
+    def find(self, filter: Optional[Dict[str, Any]] = None, projection: Optional[Any] = None, **kwargs) -> MemoryCursor:
+        return MemoryCursor(self, filter or {}, projection or kwargs.get("projection"), kwargs.get("sort"),
+                            kwargs.get("skip", 0), kwargs.get("limit", 0))
+
+    def find_one(self, filter: Optional[Any] = None, projection: Optional[Any] = None, **kwargs) -> Optional[Dict[str, Any]]:
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        with self._lock:
+            document = self._find_first(filter or {}, kwargs.get("sort"))
+            return project(document, projection or kwargs.get("projection")) if document is not None else None
+
+    def count_documents(self, filter: Dict[str, Any], **kwargs) -> int:
+        with self._lock:
+            if not filter:
+                total = len(self._documents)
+            else:
+                candidates = self._candidates(filter)
+                residual = self._residual(filter) if candidates is not None else filter
+                if candidates is not None and not residual:
+                    total = len(candidates)
+                else:
+                    pool = self._documents.values() if candidates is None else (
+                        self._documents[object_id] for object_id in candidates
+                    )
+                    total = sum(1 for document in pool if matches(document, residual))
+        skip, limit = kwargs.get("skip", 0), kwargs.get("limit", 0)
+        total = max(total - skip, 0)
+        return min(total, limit) if limit else total
+
+    def estimated_document_count(self, **kwargs) -> int:
+        return len(self._documents)
+
+    def distinct(self, key: str, filter: Optional[Dict[str, Any]] = None) -> List[Any]:
+        values = []
+        for document in self._select(filter or {}, []):
+            value = get_path(document, key)
+            if value is not _MISSING and value not in values:
+                values.append(value)
+        return values
+
+    def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs):
+        raise OperationFailure("Agregações não são suportadas pelo banco em memória")
+
+    # Escrita
+    def _insert(self, document: Dict[str, Any]) -> None:
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        stored = copy_document(document)
+        conflict = self._unique_conflict(stored)
+        if conflict:
+            raise self._duplicate_error(stored, conflict)
+        self._documents[stored["_id"]] = stored
+        self._index_add(stored)
+
+    def insert_one(self, document: Dict[str, Any], **kwargs) -> _Result:
+        with self._lock:
+            self._insert(document)
+        return _Result(inserted_id=document["_id"])
+
+    def insert_many(self, documents: Iterable[Dict[str, Any]], ordered: bool = True, **kwargs) -> _Result:
+        documents = list(documents)
+        inserted, errors = [], []
+        with self._lock:
+            for index, document in enumerate(documents):
+                try:
+                    self._insert(document)
+                    inserted.append(document["_id"])
+                except DuplicateKeyError as e:
+                    errors.append({"index": index, "code": DUPLICATE_KEY_ERROR, "errmsg": str(e),
+                                   "keyValue": (e.details or {}).get("keyValue"), "op": document})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": [], "nInserted": len(inserted),
+                                  "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []})
+        return _Result(inserted_ids=inserted)
+
+    def _update(self, query: Dict[str, Any], update: Any, upsert: bool, replace: bool = False,
+                 sort: Optional[Any] = None) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], Any]:
+        """Atualiza o primeiro documento; retorna (antes, depois, _id inserido por upsert)"""
+        current = self._find_first(query, sort)
+        if current is None:
+            if not upsert:
+                return None, None, None
+            document = {} if replace else copy_document(_equality_fields(query))
+            if replace:
+                document.update(copy_document(update))
+                if "_id" in query and "_id" not in document:
+                    document["_id"] = query["_id"]
+            else:
+                apply_update(document, update, inserting=True)
+            self._insert(document)
+            return None, self._documents[document["_id"]], document["_id"]
+
+        updated = copy_document(current)
+        if replace:
+            updated = {"_id": current["_id"], **copy_document(update)}
+        else:
+            apply_update(updated, update)
+        conflict = self._unique_conflict(updated, ignore_id=current["_id"])
+        if conflict and conflict != "_id":
+            raise self._duplicate_error(updated, conflict)
+        self._index_remove(current)
+        self._documents[current["_id"]] = updated
+        self._index_add(updated)
+        return current, updated, None
+
+    def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False, **kwargs) -> _Result:
+        with self._lock:
+            before, after, upserted_id = self._update(filter, update, upsert)
+        matched = 1 if before is not None else 0
+        return _Result(matched_count=matched, modified_count=int(matched and before != after), upserted_id=upserted_id)
+
+    def update_many(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False, **kwargs) -> _Result:
+        with self._lock:
+            targets = [document["_id"] for document in self._select(filter, [])]
+            modified = 0
+            for object_id in targets:
+                before, after, _ = self._update({"_id": object_id}, update, False)
+                modified += int(before != after)
+            if not targets and upsert:
+                _, _, upserted_id = self._update(filter, update, True)
+                return _Result(matched_count=0, modified_count=0, upserted_id=upserted_id)
+        return _Result(matched_count=len(targets), modified_count=modified, upserted_id=None)
+
+    def replace_one(self, filter: Dict[str, Any], replacement: Dict[str, Any], upsert: bool = False, **kwargs) -> _Result:
+        with self._lock:
+            before, after, upserted_id = self._update(filter, replacement, upsert, replace=True)
+        matched = 1 if before is not None else 0
+        return _Result(matched_count=matched, modified_count=matched, upserted_id=upserted_id)
+
+    def find_one_and_update(self, filter: Dict[str, Any], update: Dict[str, Any], projection: Optional[Any] = None,
+                            sort: Optional[Any] = None, upsert: bool = False,
+                            return_document: bool = ReturnDocument.BEFORE, **kwargs) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            before, after, _ = self._update(filter, update, upsert, sort=sort)
+            result = after if return_document == ReturnDocument.AFTER else before
+            return project(result, projection) if result is not None else None
+
+    def find_one_and_delete(self, filter: Dict[str, Any], projection: Optional[Any] = None,
+                            sort: Optional[Any] = None, **kwargs) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            document = self._find_first(filter, sort)
+            if document is None:
+                return None
+            self._index_remove(document)
+            del self._documents[document["_id"]]
+            return project(document, projection)
+
+    def delete_one(self, filter: Dict[str, Any], **kwargs) -> _Result:
+        deleted = self.find_one_and_delete(filter, {"_id": 1})
+        return _Result(deleted_count=1 if deleted is not None else 0)
+
+    def delete_many(self, filter: Dict[str, Any], **kwargs) -> _Result:
+        with self._lock:
+            targets = self._select(filter, [])
+            for document in targets:
+                self._index_remove(document)
+                del self._documents[document["_id"]]
+        return _Result(deleted_count=len(targets))
+
+    def bulk_write(self, requests: List[Any], ordered: bool = True, **kwargs) -> _Result:
+        """Executa UpdateOne/UpdateMany/ReplaceOne/InsertOne/DeleteOne do PyMongo"""
+        errors, matched, modified = [], 0, 0
+        with self._lock:
+            for index, request in enumerate(requests):
+                kind = type(request).__name__
+                try:
+                    if kind == "InsertOne":
+                        self._insert(request._doc)
+                    elif kind in ("UpdateOne", "ReplaceOne"):
+                        before, after, _ = self._update(request._filter, request._doc, bool(request._upsert),
+                                                        replace=kind == "ReplaceOne")
+                        matched += int(before is not None)
+                        modified += int(before is not None and before != after)
+                    elif kind == "UpdateMany":
+                        result = self.update_many(request._filter, request._doc, bool(request._upsert))
+                        matched += result.matched_count
+                        modified += result.modified_count
+                    elif kind in ("DeleteOne", "DeleteMany"):
+                        (self.delete_one if kind == "DeleteOne" else self.delete_many)(request._filter)
+                    else:
+                        raise OperationFailure(f"Operação não suportada pelo banco em memória: {kind}")
+                except DuplicateKeyError as e:
+                    errors.append({"index": index, "code": DUPLICATE_KEY_ERROR, "errmsg": str(e),
+                                   "keyValue": (e.details or {}).get("keyValue")})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": [], "nMatched": matched,
+                                  "nModified": modified, "nInserted": 0, "nUpserted": 0, "nRemoved": 0, "upserted": []})
+        return _Result(matched_count=matched, modified_count=modified)
+
+    def drop(self) -> None:
+        self.database.drop_collection(self.name)
+
+    def load(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Carga inicial sem checagem de unicidade, ordenando o índice uma única vez"""
+        count = 0
+        with self._lock:
+            added = []
+            for document in documents:
+                document.setdefault("_id", ObjectId())
+                self._documents[document["_id"]] = document
+                for index in self._hash.values():
+                    index.add(document)
+                added.append(document)
+                count += 1
+            if len(added) > len(self._sorted.keys):
+                self._sorted.extend(added)
+            else:
+                for document in added:
+                    self._sorted.add(document)
+        return count
+
+
+class MemoryClient:
+    """Cliente fictício, apenas para a identidade usada por get_sequence_generator"""
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryDatabase:
+    """Banco em memória; as coleções são criadas no primeiro acesso"""
+
+    def __init__(self, name: str, hash_fields: Iterable[str] = DEFAULT_HASH_FIELDS):
+        self.name = name
+        self.client = MemoryClient()
+        self._hash_fields = tuple(hash_fields)
+        self._collections: Dict[str, MemoryCollection] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = MemoryCollection(self, name, self._hash_fields)
+                self._collections[name] = collection
+            return collection
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str) -> MemoryCollection:
+        return self[name]
+
+    def list_collection_names(self) -> List[str]:
+        return list(self._collections)
+
+    def drop_collection(self, name: str) -> None:
+        with self._lock:
+            self._collections.pop(name, None)
+
+    def command(self, command: Any, *args, **kwargs) -> Dict[str, Any]:
+        if command == "ping":
+            return {"ok": 1.0}
+        raise OperationFailure(f"Comando não suportado pelo banco em memória: {command}")
+
+
+# ---------------------------------------------------------------------------
+# Dados sintéticos
+# ---------------------------------------------------------------------------
+
+FILAS = ["fila_p2k", "fila_crivo", "sg5_ura", "alarmes", "tsk_vendas", "sr", "rit"]
+PRIORIDADES = ["critica", "alta", "media", "baixa"]
+STATUS_INCIDENTE = ["em_andamento", "em_espera", "tks_remoto", "aberto", "resolvido", "fechado"]
+TIPOS_TAREFA = ["manutencao", "suporte", "configuracao", "atualizacao", "investigacao"]
+TIPOS_CHANGE = ["manutencao", "atualizacao", "configuracao", "migracao", "correcao"]
+STATUS_CHANGE = ["pendente", "aprovada", "em_execucao", "concluida", "cancelada"]
+IMPACTOS = ["baixo", "medio", "alto", "critico"]
+GRUPOS = ["TI Infraestrutura", "TI Sistemas", "TI Vendas", "TI Monitoramento", "TI Dados", "TI Segurança", "TI Integração"]
+
+
+def seed_synthetic_data(db: MemoryDatabase, incidents: int = 0, changes: int = 0, users: int = 0,
+                        seed: int = 42) -> Dict[str, int]:
+    """Popula o banco em memória com registros sintéticos (numerados INC-/CHG- a partir de 1)"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    def created(index: int, total: int) -> datetime:
+        return now - timedelta(seconds=(total - index) * 60)
+
+    db.chamados.load(
+        {
+            "numero": f"INC-{index + 1:03d}",
+            "titulo": f"Incidente sintético {index + 1}",
+            "descricao": f"Incidente gerado para desenvolvimento na fila {fila}",
+            "prioridade": rng.choice(PRIORIDADES),
+            "status": rng.choice(STATUS_INCIDENTE),
+            "atribuido": f"analista{rng.randint(1, 50)}",
+            "tipo_tarefa": rng.choice(TIPOS_TAREFA),
+            "grupo_designado": rng.choice(GRUPOS),
+            "local_problema": fila,
+            "incidente_vendas": rng.random() < 0.2,
+            "created_at": created(index, incidents),
+            "updated_at": None
+        }
+        for index in range(incidents)
+        for fila in (rng.choice(FILAS),)
+    )
+
+    db.changes.load(
+        {
+            "numero": f"CHG-{index + 1:03d}",
+            "titulo": f"Change sintética {index + 1}",
+            "descricao": "Change gerada para desenvolvimento",
+            "tipo": rng.choice(TIPOS_CHANGE),
+            "prioridade": rng.choice(PRIORIDADES),
+            "status": rng.choice(STATUS_CHANGE),
+            "data_programada": now + timedelta(hours=rng.randint(-240, 240)),
+            "grupo_responsavel": rng.choice(GRUPOS),
+            "impacto": rng.choice(IMPACTOS),
+            "created_at": created(index, changes),
+            "updated_at": None
+        }
+        for index in range(changes)
+    )
+
+    db.usuarios.load(
+        {
+            "username": f"usuario{index + 1}",
+            "email": f"usuario{index + 1}@empresa.com",
+            "nome_completo": f"Usuário Sintético {index + 1}",
+            "grupo": rng.choice(GRUPOS),
+            "ativo": rng.random() < 0.9,
+            "password": "senha123",
+            "created_at": created(index, users),
+            "updated_at": None,
+            "last_login": None
+        }
+        for index in range(users)
+    )
+
+    return {"incidentes": incidents, "changes": changes, "usuarios": users}
+
+
+def create_memory_database(name: str, incidents: int = 0, changes: int = 0, users: int = 0) -> MemoryDatabase:
+    """Cria o banco em memória com os índices declarados pelos serviços e dados sintéticos"""
+    from services.indexes import sync_indexes
+
+    db = MemoryDatabase(name)
+    seed_synthetic_data(db, incidents, changes, users)
+    sync_indexes(db)
+    return db
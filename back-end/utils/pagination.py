@@ -0,0 +1,100 @@
+"""
+Paginação por cursor (keyset) baseada em (created_at, _id)
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from bson import ObjectId
+
+
+# Ordenação estável usada por todas as listagens
+KEYSET_SORT = [("created_at", -1), ("_id", -1)]
+
+# Modos de contagem do total nas listagens
+COUNT_MODES = ("exact", "estimated", "none")
+
+# Posição decodificada de um cursor: (created_at, _id)
+KeysetPosition = Tuple[Optional[datetime], ObjectId]
+
+
+def encode_cursor(created_at: Optional[datetime], object_id: Any) -> str:
+    """Gera um cursor opaco a partir da posição do último item da página"""
+    payload = {
+        "t": created_at.isoformat() if created_at else None,
+        "i": str(object_id)
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> KeysetPosition:
+    """Decodifica um cursor gerado por encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(payload["t"]) if payload["t"] else None
+        if not ObjectId.is_valid(payload["i"]):
+            raise ValueError
+        return created_at, ObjectId(payload["i"])
+    except Exception:
+        raise ValueError("Cursor de paginação inválido")
+
+
+def keyset_filter(position: KeysetPosition, field: str = "created_at") -> Dict[str, Any]:
+    """Predicado de intervalo que retorna os itens posteriores à posição (ordem decrescente)"""
+    created_at, object_id = position
+
+    # Documentos sem a data ficam no final da ordenação decrescente
+    if created_at is None:
+        return {field: None, "_id": {"$lt": object_id}}
+
+    # $lt não casa com null: os documentos sem a data entram por uma condição própria
+    return {"$or": [
+        {field: {"$lt": created_at}},
+        {field: created_at, "_id": {"$lt": object_id}},
+        {field: None}
+    ]}
+
+
+def apply_keyset(query: Dict[str, Any], position: Optional[KeysetPosition]) -> Dict[str, Any]:
+    """Combina os filtros da listagem com o predicado do cursor"""
+    if position is None:
+        return query
+    if not query:
+        return keyset_filter(position)
+    return {"$and": [query, keyset_filter(position)]}
+
+
+def next_cursor_for(items: list, has_more: bool) -> Optional[str]:
+    """Cursor da próxima página, ou None quando não há mais itens"""
+    if not items or not has_more:
+        return None
+    last = items[-1]
+    # Itens da listagem rápida são dicionários; os demais, modelos de resposta
+    if isinstance(last, dict):
+        return encode_cursor(last["created_at"], last["id"])
+    return encode_cursor(last.created_at, last.id)
+
+
+def parse_count_mode(value: Optional[str]) -> str:
+    """Valida o modo de contagem do total (exact, estimated ou none)"""
+    mode = (value or "exact").lower()
+    if mode not in COUNT_MODES:
+        raise ValueError(f"Modo de contagem deve ser um dos seguintes: {', '.join(COUNT_MODES)}")
+    return mode
+
+
+def build_pagination(page: int, per_page: int, total: Optional[int], count_mode: str,
+                     has_more: bool, cursor: Optional[str], next_cursor: Optional[str]) -> Dict[str, Any]:
+    """Monta os metadados de paginação das listagens"""
+    return {
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "pages": (total + per_page - 1) // per_page if total is not None else None,
+        "count_mode": count_mode,
+        "has_more": has_more,
+        "cursor": cursor,
+        "next_cursor": next_cursor
+    }
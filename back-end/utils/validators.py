@@ -3,7 +3,7 @@ Funções de validação úteis para a aplicação
 """
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from bson import ObjectId
 
 
@@ -162,6 +162,26 @@ class Validators:
         
         return page, per_page
     
+    @staticmethod
+    def validate_fields(fields: Optional[str], allowed: Iterable[str],
+                        required: Tuple[str, ...] = ("id",)) -> Optional[List[str]]:
+        """Valida o parâmetro fields (campos separados por vírgula) contra os campos do modelo
+        
+        Retorna None quando não informado; senão os campos obrigatórios seguidos dos
+        pedidos, sem repetição.
+        """
+        if fields is None or not fields.strip():
+            return None
+        
+        allowed = set(allowed)
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        invalid = [field for field in requested if field not in allowed]
+        if invalid:
+            raise ValueError(f"Campos inválidos em fields: {', '.join(invalid)}. "
+                             f"Campos disponíveis: {', '.join(sorted(allowed))}")
+        
+        return list(dict.fromkeys([*required, *requested]))
+    
     @staticmethod
     def validate_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
         """Valida e sanitiza filtros de busca"""
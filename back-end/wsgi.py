@@ -0,0 +1,15 @@
+"""
+Ponto de entrada WSGI para produção
+
+Uso:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import atexit
+from app import create_app
+from extensions import close_mongodb
+
+# Cada worker importa este módulo depois do fork e cria o próprio MongoClient
+app = create_app()
+
+# Servidores WSGI sem hook de encerramento (waitress, uWSGI) fecham o pool ao sair
+atexit.register(close_mongodb)
@@ -59,31 +59,31 @@ export const incidentesAPI = {
   }),
 };
 
-// API para Changes
+// API para Changes (contrato legado: /api/legacy/changes devolve um array JSON)
 export const changesAPI = {
   // Buscar todas as changes
   getAll: (filters = {}) => {
     const params = new URLSearchParams(filters);
-    return apiRequest(`/changes?${params}`);
+    return apiRequest(`/legacy/changes?${params}`);
   },
   
   // Buscar change por ID
-  getById: (id) => apiRequest(`/changes/${id}`),
+  getById: (id) => apiRequest(`/legacy/changes/${id}`),
   
   // Criar nova change
-  create: (data) => apiRequest('/changes', {
+  create: (data) => apiRequest('/legacy/changes', {
     method: 'POST',
     body: JSON.stringify(data),
   }),
   
   // Atualizar change
-  update: (id, data) => apiRequest(`/changes/${id}`, {
+  update: (id, data) => apiRequest(`/legacy/changes/${id}`, {
     method: 'PUT',
     body: JSON.stringify(data),
   }),
   
   // Deletar change
-  delete: (id) => apiRequest(`/changes/${id}`, {
+  delete: (id) => apiRequest(`/legacy/changes/${id}`, {
     method: 'DELETE',
   }),
   
@@ -100,31 +100,31 @@ export const changesAPI = {
   }),
 };
 
-// API para Chamados
+// API para Chamados (contrato legado em /api/legacy/chamados)
 export const chamadosAPI = {
   // Buscar todos os chamados
   getAll: (filters = {}) => {
     const params = new URLSearchParams(filters);
-    return apiRequest(`/chamados?${params}`);
+    return apiRequest(`/legacy/chamados?${params}`);
   },
   
   // Buscar chamado por ID
-  getById: (id) => apiRequest(`/chamados/${id}`),
+  getById: (id) => apiRequest(`/legacy/chamados/${id}`),
   
   // Criar novo chamado
-  create: (data) => apiRequest('/chamados', {
+  create: (data) => apiRequest('/legacy/chamados', {
     method: 'POST',
     body: JSON.stringify(data),
   }),
   
   // Atualizar chamado
-  update: (id, data) => apiRequest(`/chamados/${id}`, {
+  update: (id, data) => apiRequest(`/legacy/chamados/${id}`, {
     method: 'PUT',
     body: JSON.stringify(data),
   }),
   
   // Deletar chamado
-  delete: (id) => apiRequest(`/chamados/${id}`, {
+  delete: (id) => apiRequest(`/legacy/chamados/${id}`, {
     method: 'DELETE',
   }),
   